@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from util.metrics import metrics
+
+
+class BrowserPoolConfig:
+    headless: bool
+    tabs: int
+
+    def __repr__(self) -> str:
+        return f"<BrowserPoolConfig: headless={self.headless}, tabs={self.tabs}>"
+
+    def __init__(self, headless=True, tabs=4):
+        self.headless = headless
+        self.tabs = tabs
+
+
+class BrowserPool:
+    """
+    长期存活的浏览器池
+
+    整个收集过程只启动一个浏览器，预先分配固定数量的标签页（crawl4ai session），
+    每次抓取页面时借出一个标签页，抓取完成后归还，避免每个页面都启动和关闭浏览器。
+    """
+
+    def __init__(self, config: BrowserPoolConfig = None):
+        self.config = config or BrowserPoolConfig()
+        self.browser_config = BrowserConfig(headless=self.config.headless)
+        self.crawler = None
+        self.tabs = None
+
+    async def start(self):
+        if self.crawler:
+            return
+        self.crawler = AsyncWebCrawler(config=self.browser_config)
+        with metrics.timer("browser_start_seconds"):
+            await self.crawler.start()
+        self.tabs = asyncio.Queue()
+        for idx in range(self.config.tabs):
+            self.tabs.put_nowait(f"openeyes_tab_{idx}")
+
+    async def close(self):
+        if not self.crawler:
+            return
+        await self.crawler.close()
+        self.crawler = None
+        self.tabs = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def tab(self):
+        """
+        借出一个标签页，退出上下文时归还
+        """
+        session_id = await self.tabs.get()
+        try:
+            yield session_id
+        finally:
+            self.tabs.put_nowait(session_id)
+
+    async def arun(self, url, config):
+        """
+        在借出的标签页中抓取页面
+
+        Args:
+            url (str): 页面地址
+            config (CrawlerRunConfig): 抓取配置
+
+        Returns:
+            CrawlResult: 抓取结果
+        """
+        async with self.tab() as session_id:
+            return await self.crawler.arun(url=url, config=config.clone(session_id=session_id))
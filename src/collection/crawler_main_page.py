@@ -3,20 +3,41 @@ from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, LLMConfig, BrowserConfig
 from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
 from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
 from pydantic import BaseModel, Field
+import json
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from collection.crawler_record import build_llm_config, check_fetch_result
+from collection.extraction_strategy import CachedExtractionStrategy
+from collection.link_extractor import extract_article_links
+from collection.retry import CrawlError, ERROR_LLM
+from util.trace_util import tracer
+
+# 链接抽取方式：heuristic只用规则，llm只用LLM，auto在规则置信度不足时回退到LLM
+LINK_EXTRACTORS = ("heuristic", "llm", "auto")
 
 
 class MainPageCrawlerConfig:
     source: str
     type: str
     url: str
+    link_extractor: str
+    min_confidence: float
 
     def __repr__(self) -> str:
-        return f"<MainPageCrawlerConfig: source={self.source}, type={self.type}, url={self.url}>"
+        return f"<MainPageCrawlerConfig: source={self.source}, type={self.type}, url={self.url}, link_extractor={self.link_extractor}>"
 
-    def __init__(self, source, type, url):
+    def __init__(self, source, type, url, link_extractor="auto", min_confidence=0.6, politeness=None):
+        if link_extractor not in LINK_EXTRACTORS:
+            raise ValueError(f"link_extractor must be one of {LINK_EXTRACTORS}: {link_extractor}")
         self.source = source
         self.type = type
         self.url = url
+        self.link_extractor = link_extractor
+        self.min_confidence = min_confidence
+        # 该来源所在域名的并发数和请求间隔，None时使用全局配置
+        self.politeness = politeness
 
 
 class MainPageModelFee(BaseModel):
@@ -25,17 +46,20 @@ class MainPageModelFee(BaseModel):
 
 
 class MainPageCrawler:
-    def __init__(self, config: MainPageCrawlerConfig):
+    def __init__(self, config: MainPageCrawlerConfig, browser_pool=None, extraction_cache=None, llm=None):
         self.config = config
+        self.browser_pool = browser_pool
+        # 最近一次规则抽取的置信度，以及是否回退到了LLM
+        self.confidence = None
+        self.used_llm = False
 
         extra_args = {"temperature": 0, "top_p": 0.9, "max_tokens": 10000}
-        llm_config = LLMConfig(provider="ollama/qwen3:8b",
-                               base_url="http://localhost:11434")
+        llm_config = build_llm_config(llm)
         self.crawler_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             verbose=True,
             page_timeout=80000,
-            extraction_strategy=LLMExtractionStrategy(
+            extraction_strategy=CachedExtractionStrategy(LLMExtractionStrategy(
                 llm_config=llm_config,
                 schema=MainPageModelFee.model_json_schema(),
                 extraction_type="schema",
@@ -48,12 +72,52 @@ class MainPageCrawler:
                     }
                 """,
                 extra_args=extra_args,
-            ),
+            ), extraction_cache),
             delay_before_return_html=5,
         )
+        # 只抓取页面、不做LLM抽取，用于规则抽取链接
+        self.fetch_config = self.crawler_config.clone(extraction_strategy=None)
         self.browser_config = BrowserConfig(headless=False)
 
+    async def __fetch(self, config):
+        if self.browser_pool:
+            result = await self.browser_pool.arun(self.config.url, config)
+        else:
+            async with AsyncWebCrawler(config=self.browser_config) as crawler:
+                result = await crawler.arun(url=self.config.url, config=config)
+        check_fetch_result(result)
+        return result
+
     async def Run(self):
-        async with AsyncWebCrawler(confg=self.browser_config) as crawler:
-            results = await crawler.arun(url=self.config.url, config=self.crawler_config)
+        """
+        获取主页中的文章链接
+
+        Returns:
+            str: [{"url", "title"}]格式的json字符串，LLM调用失败且规则没有抽取到链接时抛出CrawlError
+        """
+        if self.config.link_extractor == "llm":
+            self.used_llm = True
+            with tracer.span("homepage_fetch_llm", source=self.config.source):
+                results = await self.__fetch(self.crawler_config)
             return results.extracted_content
+
+        with tracer.span("homepage_fetch", source=self.config.source):
+            results = await self.__fetch(self.fetch_config)
+        items, self.confidence = extract_article_links(results.links, self.config.url)
+        if self.config.link_extractor == "heuristic" or self.confidence >= self.config.min_confidence:
+            return json.dumps(items, ensure_ascii=False)
+
+        # 置信度不足，用已抓取的页面内容调用LLM，无需重新加载页面
+        self.used_llm = True
+        with tracer.span("homepage_llm_extract", source=self.config.source):
+            sections = self.crawler_config.chunking_strategy.chunk(results.markdown.raw_markdown)
+            extracted = await self.crawler_config.extraction_strategy.arun(self.config.url, sections)
+        # 去掉crawl4ai在LLM调用失败时返回的错误块
+        errors = [block for block in extracted if isinstance(block, dict) and block.get("error")]
+        extracted = [block for block in extracted if not (isinstance(block, dict) and block.get("error"))]
+        if extracted or not errors:
+            return json.dumps(extracted, ensure_ascii=False)
+        # LLM调用失败时退回规则抽取的链接，规则也没有抽取到链接时交给调度器重试
+        if items:
+            return json.dumps(items, ensure_ascii=False)
+        raise CrawlError(ERROR_LLM, f"LLM抽取失败：{errors[0].get('content')}")
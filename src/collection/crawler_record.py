@@ -1,11 +1,22 @@
 import asyncio
+import json
 from crawl4ai import LLMExtractionStrategy
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, LLMConfig, BrowserConfig, CacheMode, DefaultMarkdownGenerator
 from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
 from crawl4ai.deep_crawling import BFSDeepCrawlStrategy
 from pydantic import BaseModel, Field
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from collection.extraction_strategy import CachedExtractionStrategy
+from collection.retry import CrawlError, ERROR_FETCH, ERROR_LLM, ERROR_TIMEOUT
+from collection.scheduler import THROTTLE_STATUS_CODES
 
 DEBUG = False
+# 默认使用本机ollama服务，可以通过配置文件的llm块修改（如指向基准测试的模拟服务）
+DEFAULT_LLM_PROVIDER = "ollama/qwen3:8b"
+DEFAULT_LLM_BASE_URL = "http://localhost:11434"
 
 class RecordCrawlerConfig:
     urls: list
@@ -14,6 +25,36 @@ class RecordCrawlerConfig:
         self.urls = urls
 
 
+def check_fetch_result(result):
+    """
+    抓取失败或被限流（429/503）时抛出CrawlError，携带状态码和Retry-After供调度器退避
+    """
+    status_code = result.status_code
+    if result.success and status_code not in THROTTLE_STATUS_CODES:
+        return
+    message = result.error_message or f"status {status_code}"
+    kind = ERROR_TIMEOUT if "timeout" in message.lower() else ERROR_FETCH
+    retry_after = None
+    headers = {k.lower(): v for k, v in (result.response_headers or {}).items()}
+    if str(headers.get("retry-after", "")).isdigit():
+        retry_after = int(headers["retry-after"])
+    raise CrawlError(kind, f"页面抓取失败：{message}", status_code, retry_after)
+
+
+def build_llm_config(llm=None):
+    """
+    Args:
+        llm (dict): 配置文件中的llm块，包含provider、base_url、api_token，为None时使用默认值
+
+    Returns:
+        LLMConfig
+    """
+    llm = llm or {}
+    return LLMConfig(provider=llm.get("provider", DEFAULT_LLM_PROVIDER),
+                     base_url=llm.get("base_url", DEFAULT_LLM_BASE_URL),
+                     api_token=llm.get("api_token"))
+
+
 class RecordModelFee(BaseModel):
     content: str = Field(..., description="文章内容摘要（300~500字）")
     tags: str = Field(..., description="把文章打个标签")
@@ -22,17 +63,17 @@ class RecordModelFee(BaseModel):
 
 
 class RecordCrawler:
-    def __init__(self, config: RecordCrawlerConfig):
+    def __init__(self, config: RecordCrawlerConfig, browser_pool=None, extraction_cache=None, llm=None):
         self.config = config
+        self.browser_pool = browser_pool
         extra_args = {"temperature": 0, "top_p": 0.9, "max_tokens": 10000}
-        llm_config = LLMConfig(provider="ollama/qwen3:8b",
-                               base_url="http://localhost:11434")
+        llm_config = build_llm_config(llm)
         markdown_generator = DefaultMarkdownGenerator(content_source="fit_html")
         self.crawler_config = CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
             verbose=True,
             page_timeout=80000,
-            extraction_strategy=LLMExtractionStrategy(
+            extraction_strategy=CachedExtractionStrategy(LLMExtractionStrategy(
                 llm_config=llm_config,
                 schema=RecordModelFee.model_json_schema(),
                 extraction_type="schema",
@@ -46,7 +87,7 @@ class RecordCrawler:
                     }
                 """,
                 extra_args=extra_args,
-            ),
+            ), extraction_cache),
             delay_before_return_html=5,
             mean_delay=0.5,
             max_range=1.5,
@@ -58,10 +99,43 @@ class RecordCrawler:
             log_console=True,
             markdown_generator=markdown_generator
         )
+        # 只抓取页面、不做LLM抽取，抓取和抽取分阶段执行时使用
+        self.fetch_config = self.crawler_config.clone(extraction_strategy=None)
         self.browser_config = BrowserConfig(headless=True)
 
+    async def fetch(self, url):
+        """
+        只抓取页面，不做LLM抽取
+
+        Returns:
+            CrawlResult: 抓取结果，抓取失败时抛出CrawlError
+        """
+        if self.browser_pool:
+            result = await self.browser_pool.arun(url, self.fetch_config)
+        else:
+            async with AsyncWebCrawler(config=self.browser_config) as crawler:
+                result = await crawler.arun(url=url, config=self.fetch_config)
+        check_fetch_result(result)
+        return result
+
+    async def extract(self, url, markdown):
+        """
+        对fetch得到的页面markdown做LLM抽取
+
+        Returns:
+            str: 与CrawlResult.extracted_content格式相同的json字符串，LLM调用失败时抛出CrawlError
+        """
+        sections = self.crawler_config.chunking_strategy.chunk(markdown)
+        extracted = await self.crawler_config.extraction_strategy.arun(url, sections)
+        errors = [block for block in extracted if isinstance(block, dict) and block.get("error")]
+        if errors:
+            raise CrawlError(ERROR_LLM, f"LLM抽取失败：{errors[0].get('content')}")
+        return json.dumps(extracted, indent=4, default=str, ensure_ascii=False)
+
     async def __get_one_page(self, url):
-        async with AsyncWebCrawler(confg=self.browser_config) as crawler:
+        if self.browser_pool:
+            return await self.browser_pool.arun(url, self.crawler_config)
+        async with AsyncWebCrawler(config=self.browser_config) as crawler:
             results = await crawler.arun(
                 url=url,
                 config=self.crawler_config)
@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from util.text_util import SIMHASH_BITS, simhash, hamming_distance
+
+
+class NearDuplicateIndex:
+    """
+    SimHash近似重复索引
+
+    把64位指纹分成threshold+1段，汉明距离不超过threshold的两个指纹至少有一段完全相同（抽屉原理），
+    查找时只需比较与待查指纹有相同分段的候选，不用遍历全部指纹。
+    """
+
+    def __init__(self, threshold=6, min_length=200):
+        """
+        Args:
+            threshold (int): 汉明距离不超过该值视为近似重复
+            min_length (int): 正文短于该字符数时不做判断，避免短文本误判
+        """
+        self.threshold = threshold
+        self.min_length = min_length
+        self.bands = threshold + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+        # 每一段：分段值 -> key集合
+        self.tables = [{} for _ in range(self.bands)]
+        # key -> 指纹
+        self.fingerprints = {}
+
+    def __repr__(self) -> str:
+        return f"<NearDuplicateIndex: threshold={self.threshold}, size={len(self.fingerprints)}>"
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def fingerprint(self, text):
+        """
+        Returns:
+            int: 文本的SimHash，文本过短时返回None
+        """
+        if not text or len(text) < self.min_length:
+            return None
+        return simhash(text)
+
+    def _band_values(self, fingerprint):
+        values = []
+        for i in range(self.bands):
+            # 最后一段包含除不尽的剩余位
+            bits = self.band_bits if i < self.bands - 1 else SIMHASH_BITS - self.band_bits * i
+            values.append((fingerprint >> (i * self.band_bits)) & ((1 << bits) - 1))
+        return values
+
+    def add(self, key, fingerprint):
+        if key in self.fingerprints:
+            self.remove(key)
+        self.fingerprints[key] = fingerprint
+        for table, value in zip(self.tables, self._band_values(fingerprint)):
+            table.setdefault(value, set()).add(key)
+
+    def remove(self, key):
+        fingerprint = self.fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for table, value in zip(self.tables, self._band_values(fingerprint)):
+            keys = table.get(value)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del table[value]
+
+    def find(self, fingerprint, exclude=None):
+        """
+        查找与指纹最相近且距离不超过threshold的key
+
+        Args:
+            exclude: 不参与比较的key（文章自身）
+
+        Returns:
+            key，没有近似重复时返回None
+        """
+        best, best_distance = None, self.threshold + 1
+        for table, value in zip(self.tables, self._band_values(fingerprint)):
+            for key in table.get(value, ()):
+                if key == exclude:
+                    continue
+                distance = hamming_distance(fingerprint, self.fingerprints[key])
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import re
+from crawl4ai.extraction_strategy import ExtractionStrategy
+
+
+def _normalize_content(sections) -> str:
+    # 合并连续空白，避免页面排版细节变化导致缓存失效
+    return re.sub(r"\s+", " ", "\n".join(sections)).strip()
+
+
+class CachedExtractionStrategy(ExtractionStrategy):
+    """
+    带磁盘缓存的LLM抽取策略，包装一个LLMExtractionStrategy
+
+    缓存键由(规范化后的页面内容摘要, schema, instruction, 模型)组成，页面内容未变化时直接复用
+    上次的extracted_content，跳过LLM调用。抽取出错的结果不会写入缓存。
+    """
+
+    def __init__(self, strategy, cache=None):
+        """
+        Args:
+            strategy (LLMExtractionStrategy): 实际执行抽取的策略
+            cache (DiskCache): 抽取结果缓存，为None时直接调用strategy
+        """
+        super().__init__(input_format=strategy.input_format, verbose=strategy.verbose)
+        self.strategy = strategy
+        self.cache = cache
+
+    def cache_key(self, sections) -> str:
+        content_hash = hashlib.sha256(_normalize_content(sections).encode("utf-8")).hexdigest()
+        key = json.dumps({
+            "content": content_hash,
+            "schema": self.strategy.schema,
+            "instruction": self.strategy.instruction,
+            "model": self.strategy.llm_config.provider,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _load(self, sections):
+        if not self.cache:
+            return None, None
+        key = self.cache_key(sections)
+        value = self.cache.get(key)
+        return key, (json.loads(value) if value is not None else None)
+
+    def _store(self, key, extracted):
+        if not self.cache or not extracted:
+            return
+        if any(isinstance(block, dict) and block.get("error") for block in extracted):
+            return
+        self.cache.set(key, json.dumps(extracted, ensure_ascii=False, default=str))
+
+    def extract(self, url, html, *q, **kwargs):
+        return self.strategy.extract(url, 0, html)
+
+    def run(self, url, sections, *q, **kwargs):
+        key, extracted = self._load(sections)
+        if extracted is not None:
+            return extracted
+        extracted = self.strategy.run(url, sections)
+        self._store(key, extracted)
+        return extracted
+
+    async def arun(self, url, sections, *q, **kwargs):
+        key, extracted = self._load(sections)
+        if extracted is not None:
+            return extracted
+        extracted = await self.strategy.arun(url, sections)
+        self._store(key, extracted)
+        return extracted
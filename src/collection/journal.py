@@ -0,0 +1,99 @@
+import json
+import os
+import time
+
+# URL状态，按处理顺序排列
+STATE_DISCOVERED = "discovered"
+STATE_FETCHED = "fetched"
+STATE_EXTRACTED = "extracted"
+STATE_STORED = "stored"
+STATE_FAILED = "failed"
+
+
+class CrawlJournal:
+    """
+    记录URL处理状态的日志文件，用于中断后恢复
+
+    每次状态变化追加一行json并立即flush，进程被中断时最多丢失正在写入的一行。
+    主页处理完成时记录来源筛选出的全部URL（discovered），之后每篇文章按
+    fetched -> extracted -> stored推进，fetched状态保存页面markdown，extracted状态保存LLM抽取结果，恢复时无需重新抓取或抽取。
+    收集正常结束后调用reset清空。
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # source -> 主页筛选后的文章URL列表
+        self.sources = {}
+        # url -> {"source", "state", "data"}
+        self.urls = {}
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def __repr__(self) -> str:
+        return f"<CrawlJournal: path={self.path}, sources={len(self.sources)}, urls={len(self.urls)}>"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 中断时写了一半的行
+                    continue
+                if "urls" in entry:
+                    self.sources[entry["source"]] = entry["urls"]
+                else:
+                    self.urls[entry["url"]] = entry
+
+    def _write(self, entry):
+        entry["ts"] = time.time()
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record_source(self, source, urls):
+        """
+        记录来源主页已处理完成，以及筛选出的文章URL
+        """
+        self.sources[source] = urls
+        self._write({"source": source, "urls": urls})
+
+    def get_source_urls(self, source):
+        """
+        Returns:
+            list: 上次运行中该来源筛选出的文章URL，未记录时返回None
+        """
+        return self.sources.get(source)
+
+    def record(self, url, source, state, data=None):
+        entry = {"url": url, "source": source, "state": state, "data": data}
+        self.urls[url] = entry
+        self._write(entry)
+
+    def get(self, url):
+        """
+        Returns:
+            tuple: (状态, 数据)，未记录时返回(None, None)
+        """
+        entry = self.urls.get(url)
+        if entry:
+            return entry.get("state"), entry.get("data")
+        if any(url in urls for urls in self.sources.values()):
+            return STATE_DISCOVERED, None
+        return None, None
+
+    def reset(self):
+        """
+        清空日志，收集正常结束后调用
+        """
+        self._file.close()
+        self.sources = {}
+        self.urls = {}
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def close(self):
+        self._file.close()
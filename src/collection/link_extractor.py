@@ -0,0 +1,125 @@
+import re
+from urllib.parse import urlsplit
+
+# 文章链接中常见的日期格式：/2025/09/05/、/20250905/、2025-09-05、story20250906
+_DATE_PATTERN = re.compile(r"(?:19|20)\d{2}(?:[/_-]?)(?:0[1-9]|1[0-2])(?:[/_-]?)(?:0[1-9]|[12]\d|3[01])")
+# 文章ID：较长的纯数字，或BBC这类字母数字混合的ID
+_ID_PATTERN = re.compile(r"/(?:\d{5,}|[a-z0-9]*\d[a-z0-9]{7,})(?:[/._-]|$)")
+_ARTICLE_PATH_PATTERN = re.compile(r"/(?:article|articles|story|stories|news|detail|content|a|p|post)/", re.I)
+_PAGE_SUFFIX_PATTERN = re.compile(r"\.s?html?$", re.I)
+
+# 栏目、标签、翻页等列表页
+_LIST_PATH_PATTERN = re.compile(r"/(?:category|tag|tags|topic|topics|author|authors|column|page|search|video|live)(?:/|$)", re.I)
+# 中英文、繁简切换
+_LANGUAGE_PATTERN = re.compile(r"(?:[?&](?:lang|hl|locale)=)|/(?:en|zh|zh-hans|zh-hant|zh-cn|zh-tw|trad|simp|hant|hans)/?$", re.I)
+_SKIP_SUFFIX_PATTERN = re.compile(r"\.(?:jpg|jpeg|png|gif|svg|webp|pdf|zip|mp4|mp3|xml|rss)$", re.I)
+_NAV_TEXTS = {
+    "首页", "更多", "登录", "注册", "订阅", "搜索", "返回顶部", "联系我们", "关于我们", "隐私政策", "English", "中文",
+    "简体", "繁體", "繁体", "简", "繁", "下一页", "上一页", "more", "home", "login", "log in", "sign in", "sign up",
+    "subscribe", "search", "about", "about us", "contact", "contact us", "privacy", "privacy policy", "terms of use",
+}
+_SECOND_LEVEL_SUFFIXES = {"com", "net", "org", "gov", "edu", "co", "ac"}
+
+# 文章链接的最低得分
+ARTICLE_SCORE_THRESHOLD = 3
+# URL模式得分达到该值视为强特征
+STRONG_URL_SCORE = 2
+# 收集到的文章链接少于该数量时置信度按比例降低
+MIN_ARTICLE_LINKS = 10
+# 页面开头、结尾这一比例内的链接视为导航区
+NAV_REGION_RATIO = 0.05
+
+
+def _site_domain(host: str) -> str:
+    # 近似的注册域名：example.com、example.com.cn
+    labels = host.lower().split(":")[0].split(".")
+    if len(labels) >= 3 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _url_score(url: str) -> float:
+    path = urlsplit(url).path
+    score = 0
+    if _DATE_PATTERN.search(url):
+        score += 2
+    if _ID_PATTERN.search(path.lower()):
+        score += 2
+    if _ARTICLE_PATH_PATTERN.search(path):
+        score += 1
+    if _PAGE_SUFFIX_PATTERN.search(path):
+        score += 1
+    if len([part for part in path.split("/") if part]) >= 2:
+        score += 0.5
+    return score
+
+
+def _text_score(text: str) -> float:
+    length = len(text)
+    if length < 6:
+        return -2
+    if length > 150:
+        return -1
+    if length >= 12:
+        return 2
+    return 0.5
+
+
+def _is_candidate(url: str, text: str, page_url: str, site: str) -> bool:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return False
+    if _site_domain(parts.netloc) != site:
+        return False
+    if url.split("#")[0].rstrip("/") == page_url.split("#")[0].rstrip("/"):
+        return False
+    if parts.path in ("", "/"):
+        return False
+    if _LIST_PATH_PATTERN.search(parts.path) or _LANGUAGE_PATTERN.search(url) or _SKIP_SUFFIX_PATTERN.search(parts.path):
+        return False
+    if text.lower() in _NAV_TEXTS:
+        return False
+    return True
+
+
+def extract_article_links(links: dict, page_url: str):
+    """
+    根据URL模式、链接文字长度和所在位置，从主页链接中挑选文章链接
+
+    Args:
+        links (dict): crawl4ai抓取结果中的links，包括internal和external两组，每组按页面顺序排列
+        page_url (str): 主页地址
+
+    Returns:
+        tuple: (与LLM抽取结果格式相同的[{"url", "title"}]列表, 0~1之间的置信度)
+    """
+    anchors = (links or {}).get("internal", []) + (links or {}).get("external", [])
+    site = _site_domain(urlsplit(page_url).netloc)
+    total = len(anchors)
+
+    best = {}
+    for position, anchor in enumerate(anchors):
+        url = (anchor.get("href") or "").strip()
+        text = re.sub(r"\s+", " ", anchor.get("text") or anchor.get("title") or "").strip()
+        if not url or not _is_candidate(url, text, page_url, site):
+            continue
+
+        url_score = _url_score(url)
+        score = url_score + _text_score(text)
+        if total and (position < total * NAV_REGION_RATIO or position > total * (1 - NAV_REGION_RATIO)):
+            score -= 1
+        if score < ARTICLE_SCORE_THRESHOLD:
+            continue
+
+        key = url.split("#")[0]
+        # 同一文章有多个链接（图片+标题）时保留文字最长的一个
+        if key not in best or len(text) > len(best[key]["title"]):
+            best[key] = {"url": key, "title": text, "strong": url_score >= STRONG_URL_SCORE, "position": position}
+
+    items = sorted(best.values(), key=lambda x: x["position"])
+    if not items:
+        return [], 0.0
+
+    strong_ratio = sum(1 for item in items if item["strong"]) / len(items)
+    confidence = strong_ratio * min(1.0, len(items) / MIN_ARTICLE_LINKS)
+    return [{"url": item["url"], "title": item["title"]} for item in items], confidence
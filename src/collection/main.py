@@ -1,18 +1,28 @@
 import time
 import argparse
+import logging
+from datetime import datetime, timedelta
 import json
 import asyncio
-from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from collection.browser_pool import BrowserPool, BrowserPoolConfig
 from collection.crawler_main_page import MainPageCrawler, MainPageCrawlerConfig
-from collection.crawler_record import RecordCrawler, RecordCrawlerConfig
-from util.logger import get_logger
-from util.store_util import Record, StoreUtil
+from collection.dedup import NearDuplicateIndex
+from collection.journal import CrawlJournal
+from collection.pipeline import CollectionPipeline
+from collection.preprocess import ContentPreprocessor
+from collection.retry import RetryPolicy, classify_error, ERROR_TIMEOUT
+from collection.scheduler import HostPolicy, HostScheduler
+from util.async_store_util import AsyncStoreUtil
+from util.cache_util import DiskCache
+from util.logger import configure_logging, get_logger
+from util.metrics import metrics
+from util.trace_util import tracer, SamplingProfiler
+from util.store_util import StoreUtil
 
-RETRY_TIMES = 3
 MAX_URL_NUM = 50
 
 logger = get_logger("collection.log")
@@ -20,7 +30,6 @@ logger = get_logger("collection.log")
 
 class CollectionImpl(object):
     store_util = None
-    crawler_configs = []
 
     def __init__(self, config_file_path=None):
         logger.info(
@@ -31,126 +40,340 @@ class CollectionImpl(object):
         with open(config_file_path, 'r', encoding='utf-8') as f:
             config_str = f.read()
             self.config = json.loads(config_str)
+            configure_logging(self.config.get("logging"))
             logger.info("文件内容：\n%s" % config_str)
 
+        self.crawler_configs = []
+        self.concurrency = self.config.get("concurrency") or {}
         self.store_util = StoreUtil(self.config.get("storage"))
         self.store_util.PrintStoreConfig()
+        # 配置了async_driver时（如"aiomysql"，需另行安装对应驱动），流水线使用异步存储，不占用线程；默认使用同步存储
+        self.async_store = None
+        if (self.config.get("storage") or {}).get("async_driver"):
+            self.async_store = AsyncStoreUtil(self.config.get("storage"), self.store_util.url_filter)
+
+        self.extraction_cache = None
+        cache_config = self.config.get("extraction_cache")
+        if cache_config:
+            self.extraction_cache = DiskCache(
+                cache_config.get("path", "data/extraction_cache.db"),
+                max_size=cache_config.get("max_size_mb", 512) * 1024 * 1024,
+                max_age=cache_config.get("max_age_days", 7) * 24 * 3600)
+            logger.info("抽取缓存：%s" % self.extraction_cache)
+
+        retry_config = self.config.get("retry") or {}
+        self.retry_policy = RetryPolicy(
+            base_delay=retry_config.get("base_delay", 2),
+            max_delay=retry_config.get("max_delay", 60),
+            max_attempts=retry_config.get("max_attempts"))
+        logger.info("重试策略：%s" % self.retry_policy)
+
+        self.journal = None
+        journal_config = self.config.get("journal")
+        if journal_config:
+            self.journal = CrawlJournal(journal_config.get("path", "data/crawl_journal.jsonl"))
+            logger.info("抓取日志：%s" % self.journal)
+
+        self.dedup = None
+        dedup_config = self.config.get("dedup")
+        if dedup_config:
+            self.dedup = NearDuplicateIndex(
+                threshold=dedup_config.get("threshold", 6),
+                min_length=dedup_config.get("min_length", 200))
+            since = datetime.now() - timedelta(days=dedup_config.get("max_age_days", 30))
+            for key, fingerprint in self.store_util.get_fingerprints(since):
+                self.dedup.add(key, fingerprint)
+            logger.info("近似重复索引：%s" % self.dedup)
+
+        self.preprocessor = None
+        preprocess_config = self.config.get("preprocess")
+        if preprocess_config:
+            self.preprocessor = ContentPreprocessor(
+                token_budget=preprocess_config.get("token_budget", 3000),
+                max_link_density=preprocess_config.get("max_link_density", 0.5),
+                boilerplate_min_pages=preprocess_config.get("boilerplate_min_pages", 3),
+                snapshot=preprocess_config.get("snapshot"))
+            logger.info("正文预处理：%s" % self.preprocessor)
+
+        # LLM服务，未配置时使用本机ollama
+        self.llm = self.config.get("llm")
+
+        politeness = self.config.get("politeness") or {}
+        self.scheduler = HostScheduler(
+            HostPolicy(politeness.get("max_concurrency", 2), politeness.get("min_interval", 1.0)),
+            max_backoff=politeness.get("max_backoff", 300),
+            base_backoff=politeness.get("base_backoff", 5))
+
         for idx, crawl_config in enumerate(self.config.get("crawls")):
             logger.info("%d crawl：%s" % (idx, crawl_config))
             main_page_config = MainPageCrawlerConfig(**crawl_config)
             self.crawler_configs.append(main_page_config)
+            if main_page_config.politeness:
+                self.scheduler.register(main_page_config.url, HostPolicy(
+                    main_page_config.politeness.get("max_concurrency", self.scheduler.default_policy.max_concurrency),
+                    main_page_config.politeness.get("min_interval", self.scheduler.default_policy.min_interval)))
 
     def Run(self):
-        url_status = {}
-        for main_page_config in self.crawler_configs:
-            for idx in range(RETRY_TIMES):
-                try:
-                    # 主页
-                    logger.info(f"------ 从主页获取URL({idx}) ------")
-                    logger.info(main_page_config)
-                    main_page_crawler = MainPageCrawler(main_page_config)
-                    result = json.loads(asyncio.run(main_page_crawler.Run()))
-                    logger.info(
-                        f">>>>>>>>>>>>>>>>>>> 主页收集到 {len(result)} 个页面：")
-                    for item in result:
-                        logger.info("{%s -> %s}" %
-                                    (item.get("title"), item.get("url")))
-
-                    # 文章
-                    logger.info("------ 从URL获取文章 ------")
-                    urls = self.__filter_urls(result)
-                    logger.info(f">>>>>>>>>>>>>>>>>>> 获取 {len(urls)} 个URL")
-
-                    crawler_config = RecordCrawlerConfig(urls)
-                    record_crawler = RecordCrawler(crawler_config)
-                    crawl_result = record_crawler.Run()
-                    logger.info(
-                        f">>>>>>>>>>>>>>>>>>> 收集到 {len(crawl_result)} 篇文章：\n {crawl_result}")
-
-                    success_num, failed_num = self.__convert_and_store(
-                        crawl_result, main_page_config)
-                    logger.info(">>>>>>>>>>>>>>>>>>> 存储 %d 条数据成功, %d 条失败" %
-                                (success_num, failed_num))
-                    url_status[main_page_config.source] = (
-                        True, len(result), len(crawl_result), success_num)
-                except Exception as e:
-                    logger.error("主程序运行异常：%s" % str(e))
-                    continue
-                if main_page_config.source in url_status:
-                    break
-            if main_page_config.source not in url_status:
-                url_status[main_page_config.source] = False
+        with self.store_util.unit_of_work():
+            return asyncio.run(self.RunAsync())
+
+    def create_browser_pool(self):
+        """
+        按browser配置创建浏览器池（未启动），标签页数量默认与全局并发相同
+        """
+        browser_config = self.config.get("browser") or {}
+        pool_config = BrowserPoolConfig(
+            headless=browser_config.get("headless", True),
+            tabs=browser_config.get("tabs", self.concurrency.get("global_limit", 1)))
+        logger.info("浏览器池：%s" % pool_config)
+        return BrowserPool(pool_config)
+
+    async def close(self):
+        """
+        关闭常驻运行时保留的异步数据库连接
+        """
+        if self.async_store:
+            await self.async_store.close()
+
+    async def RunAsync(self, browser_pool=None):
+        """
+        并发收集所有来源
+
+        全局并发限制所有来源同时进行的页面抓取数量，来源并发限制单个来源同时进行的页面抓取数量，
+        两者均为1时退化为逐个来源、逐篇文章的顺序收集。文章的抓取、抽取、存储由CollectionPipeline分阶段并行处理。
 
+        Args:
+            browser_pool (BrowserPool): 已启动的浏览器池，常驻运行时在多轮收集之间复用，由调用方负责关闭，
+                异步数据库连接同样保留到调用close()；为None时在本次运行内创建并关闭
+
+        Returns:
+            dict: source -> (True, 主页URL数, 文章数, 存储成功数) 或 False
+        """
+        if self.async_store:
+            await self.async_store.init()
+        if browser_pool is not None:
+            return await self.__run(browser_pool)
+        try:
+            async with self.create_browser_pool() as browser_pool:
+                return await self.__run(browser_pool)
+        finally:
+            await self.close()
+
+    async def __run(self, browser_pool):
+        global_limit = self.concurrency.get("global_limit", 1)
+        source_limit = self.concurrency.get("source_limit", 1)
+        logger.info("并发限制：全局 %d，来源 %d" % (global_limit, source_limit))
+
+        global_semaphore = asyncio.Semaphore(global_limit)
+        pipeline_config = self.config.get("pipeline") or {}
+        pipeline = CollectionPipeline(
+            self.store_util, browser_pool, global_semaphore, self.extraction_cache,
+            fetch_workers=global_limit,
+            extract_workers=pipeline_config.get("extract_workers", 1),
+            store_workers=pipeline_config.get("store_workers", 1),
+            queue_size=pipeline_config.get("queue_size", 10),
+            retry_policy=self.retry_policy,
+            journal=self.journal,
+            scheduler=self.scheduler,
+            async_store=self.async_store,
+            dedup=self.dedup,
+            preprocessor=self.preprocessor,
+            llm=self.llm)
+        async with pipeline:
+            statuses = await asyncio.gather(*[
+                self.__collect_source(main_page_config, asyncio.Semaphore(source_limit), global_semaphore,
+                                      browser_pool, pipeline)
+                for main_page_config in self.crawler_configs])
+
+        for host, backoff in self.scheduler.throttled_hosts().items():
+            logger.info("域名 %s 仍处于限流退避中，额外间隔 %.1f 秒" % (host, backoff))
+        if self.extraction_cache:
+            logger.info("抽取缓存命中 %d 次，未命中 %d 次" %
+                        (self.extraction_cache.hits, self.extraction_cache.misses))
+            metrics.set("extraction_cache_hits", self.extraction_cache.hits)
+            metrics.set("extraction_cache_misses", self.extraction_cache.misses)
+        if self.dedup is not None:
+            logger.info("近似重复文章跳过LLM抽取 %d 次" % pipeline.llm_saved)
+            metrics.set("llm_saved", pipeline.llm_saved)
+
+        # 全部来源处理完成，下次运行无需恢复
+        if self.journal:
+            self.journal.reset()
+
+        url_status = {}
+        for main_page_config, status in zip(self.crawler_configs, statuses):
+            url_status[main_page_config.source] = status
         return url_status
 
-    def __filter_urls(self, result):
-        seen_urls = set()
-        urls = []
-        idx = 0
-        for item in result:
-            url = item.get("url")
-            if url not in seen_urls:
-                seen_urls.add(url)
-                if not self.store_util.judge_url_contains(url):
-                    urls.append(url)
-                    idx += 1
-                    if idx >= MAX_URL_NUM:
-                        break
-        return urls
-
-    def __convert_and_store(self, results, config):
-        logger.info("------ 转换存储数据 ------")
-        store_list = []
-        for url in results:
-            item = results[url]
-            data = ""
-            article_time = ""
+    async def __collect_source(self, main_page_config, source_semaphore, global_semaphore, browser_pool, pipeline):
+        with tracer.span("source", source=main_page_config.source):
+            return await self.__collect_source_traced(
+                main_page_config, source_semaphore, global_semaphore, browser_pool, pipeline)
+
+    async def __collect_source_traced(self, main_page_config, source_semaphore, global_semaphore, browser_pool,
+                                      pipeline):
+        urls = self.journal.get_source_urls(main_page_config.source) if self.journal else None
+        if urls is not None:
+            logger.info(f">>>>>>>>>>>>>>>>>>> {main_page_config.source} 从抓取日志恢复 {len(urls)} 个URL")
+            page_num = len(urls)
+        else:
+            result = await self.__collect_main_page(main_page_config, source_semaphore, global_semaphore, browser_pool)
+            if result is None:
+                return False
+            page_num = len(result)
+
+            # 文章：交给流水线抓取、抽取、存储
+            logger.info(f"------ {main_page_config.source} 从URL获取文章 ------")
+            urls = await self.__filter_urls(result)
+            logger.info(f">>>>>>>>>>>>>>>>>>> {main_page_config.source} 获取 {len(urls)} 个URL")
+            if self.journal:
+                self.journal.record_source(main_page_config.source, urls)
+
+        stats = await pipeline.submit(urls, main_page_config, source_semaphore)
+        success_num = stats.get("stored", 0)
+        skipped_num = stats.get("skipped", 0)
+        failed_num = stats.get("store_failed", 0)
+        extracted_num = success_num + skipped_num + failed_num
+        logger.info(">>>>>>>>>>>>>>>>>>> %s 收集到 %d 篇文章，近似重复 %d 篇，抓取失败 %d 篇，抽取失败 %d 篇" %
+                    (main_page_config.source, extracted_num, stats.get("duplicate", 0),
+                     stats.get("fetch_failed", 0), stats.get("extract_failed", 0)))
+        logger.info(">>>>>>>>>>>>>>>>>>> %s 存储 %d 条数据成功, %d 条重复跳过, %d 条失败" %
+                    (main_page_config.source, success_num, skipped_num, failed_num))
+        preprocess_stats = self.preprocessor.stats.get(main_page_config.source) if self.preprocessor else None
+        if preprocess_stats and preprocess_stats.pages:
+            logger.info(">>>>>>>>>>>>>>>>>>> %s 预处理 %d 篇文章，token %d -> %d（%.0f%%）" % (
+                main_page_config.source, preprocess_stats.pages, preprocess_stats.tokens_before,
+                preprocess_stats.tokens_after,
+                100.0 * preprocess_stats.tokens_after / max(1, preprocess_stats.tokens_before)))
+        return (True, page_num, extracted_num, success_num)
+
+    async def __collect_main_page(self, main_page_config, source_semaphore, global_semaphore, browser_pool):
+        """
+        获取主页中的文章链接，失败时按错误类型退避重试
+
+        Returns:
+            list: [{"url", "title"}]，重试后仍失败时返回None
+        """
+        attempt = 0
+        while True:
             try:
-                data = json.loads(item)[0]
-                article_time = datetime.strptime(data.get("time"), "%Y-%m-%d")
-            except ValueError as e:
-                logger.error("时间转换失败：%s %s %s" % (str(e), url, item))
-                article_time = datetime.today()
+                logger.info(f"------ {main_page_config.source} 从主页获取URL({attempt}) ------")
+                logger.info(main_page_config)
+                main_page_crawler = MainPageCrawler(main_page_config, browser_pool, self.extraction_cache, self.llm)
+                async with self.scheduler.slot(main_page_config.url), source_semaphore, global_semaphore:
+                    with metrics.timer("homepage_fetch_seconds", source=main_page_config.source), \
+                            tracer.span("homepage", source=main_page_config.source, attempt=attempt):
+                        extracted_content = await main_page_crawler.Run()
+                self.scheduler.feedback(main_page_config.url)
+                result = json.loads(extracted_content)
+                break
             except Exception as e:
-                logger.error("转换数据失败：%s %s %s" % (str(e), url, item))
-                continue
-
-            record = Record(
-                content=data.get("content"),
-                tags=data.get("tags"),
-                time=article_time,
-                title=data.get("title"),
-                type=config.type,
-                source=config.source,
-                url=url)
-            store_list.append(record)
-        ans = self.store_util.save_records(store_list)
-        return ans.get("success"), ans.get("failed")
+                kind = classify_error(e)
+                self.scheduler.feedback(main_page_config.url, getattr(e, "status_code", None),
+                                        kind == ERROR_TIMEOUT, getattr(e, "retry_after", None))
+                attempt += 1
+                logger.error("%s 主页运行异常（%s）：%s" % (main_page_config.source, kind, str(e)))
+                if not self.retry_policy.should_retry(kind, attempt):
+                    return None
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+        if main_page_crawler.confidence is not None:
+            logger.info("%s 规则抽取置信度 %.2f，%s" % (
+                main_page_config.source, main_page_crawler.confidence,
+                "回退到LLM抽取" if main_page_crawler.used_llm else "跳过LLM抽取"))
+        logger.info(
+            f">>>>>>>>>>>>>>>>>>> {main_page_config.source} 主页收集到 {len(result)} 个页面：")
+        if logger.isEnabledFor(logging.DEBUG):
+            for item in result:
+                logger.debug("{%s -> %s}" %
+                             (item.get("title"), item.get("url")))
+        return result
+
+    async def __filter_urls(self, result):
+        candidate_urls = list(dict.fromkeys(
+            item.get("url") for item in result if item.get("url")))
+        if self.async_store:
+            exist_urls = await self.async_store.get_exist_urls(candidate_urls)
+        else:
+            exist_urls = await asyncio.to_thread(self.store_util.get_exist_urls, candidate_urls)
+        urls = [url for url in candidate_urls if url not in exist_urls]
+        return urls[:MAX_URL_NUM]
+
+
+def serve_metrics(config):
+    """
+    配置了metrics.port时启动指标HTTP端点
+    """
+    metrics_config = config.get("metrics") or {}
+    if metrics_config.get("port"):
+        metrics.serve(metrics_config["port"], metrics_config.get("host", "127.0.0.1"))
+        logger.info("指标端点：http://%s:%d/metrics" % (metrics_config.get("host", "127.0.0.1"), metrics_config["port"]))
+
+
+def log_run_result(impl, url_status, elapsed):
+    """
+    一轮收集结束后保存URL过滤器和预处理段落计数的快照，记录吞吐指标和各来源的结果
+
+    Args:
+        impl (CollectionImpl): 完成收集的实例
+        url_status (dict): Run/RunAsync的返回值
+        elapsed (float): 本轮耗时秒数
+    """
+    impl.store_util.save_url_filter()
+    if impl.preprocessor and impl.preprocessor.snapshot:
+        try:
+            impl.preprocessor.save()
+            logger.info("预处理段落计数已保存：%s %s" % (impl.preprocessor.snapshot, impl.preprocessor))
+        except Exception as e:
+            logger.error("预处理段落计数保存失败: %s" % str(e))
+    impl.store_util.PrintPoolStatus()
+
+    stored = sum(status[3] for status in url_status.values() if status)
+    metrics.set("run_seconds", elapsed)
+    metrics.set("records_per_second", stored / elapsed if elapsed else 0)
+
+    for source, status in url_status.items():
+        if status is False:
+            logger.info("%s\t❌" % source)
+        else:
+            logger.info("%s:\t%d -> %d -> %d\t✅" %
+                        (source, status[1], status[2], status[3]))
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description='数据收集程序')
     parser.add_argument('--config', '-c', help='配置文件路径')
+    parser.add_argument('--profile', action='store_true', help='记录各阶段耗时，输出Chrome trace文件到日志目录')
+    parser.add_argument('--profile-sample', action='store_true', help='同时采样调用栈，输出CPU热点的folded文件')
     return parser.parse_args()
 
 
 def main():
     args = parse_args()
+    profiler = None
+    if args.profile:
+        tracer.enable()
+    if args.profile_sample:
+        profiler = SamplingProfiler()
+        profiler.start()
 
     logger.info(
         "================================ 初始化 ================================")
     impl = CollectionImpl(args.config)
+    serve_metrics(impl.config)
 
     logger.info(
         "================================ 开始收集 ================================")
+    start = time.time()
     url_status = impl.Run()
-
-    for source, status in url_status.items():
-        if status is False:
-            logger.info("%s\t❌" % source)
-        else:
-            logger.info("%s:\t%d -> %d -> %d\t✅" %
-                        (source, status[1], status[2], status[3]))
+    log_run_result(impl, url_status, time.time() - start)
+    logger.info("指标快照：%s %s" % metrics.write_snapshot("collection"))
+    metrics.shutdown()
+    if args.profile:
+        logger.info("trace文件：%s" % tracer.write("collection"))
+    if profiler:
+        profiler.stop()
+        logger.info("采样结果：%s" % profiler.write("collection"))
 
     logger.info(
         "================================ 完成任务，爬虫结束 ================================")
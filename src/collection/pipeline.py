@@ -0,0 +1,328 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from collection.crawler_record import RecordCrawler, RecordCrawlerConfig
+from collection.journal import STATE_FETCHED, STATE_EXTRACTED, STATE_STORED, STATE_FAILED
+from collection.retry import CrawlError, RetryPolicy, classify_error, ERROR_FETCH, ERROR_LLM, ERROR_PARSE, ERROR_STORE, ERROR_TIMEOUT
+from collection.scheduler import HostScheduler
+from util.logger import abbreviate, get_logger
+from util.metrics import metrics, TOKEN_BUCKETS
+from util.text_util import estimate_tokens
+from util.trace_util import tracer
+from util.store_util import Record, url_hash
+
+logger = get_logger("collection.log")
+
+
+def convert_record(url, item, config):
+    """
+    将文章的LLM抽取结果转换为Record
+
+    Args:
+        url (str): 文章链接
+        item (str): extracted_content
+        config (MainPageCrawlerConfig): 文章所属来源的配置
+
+    Returns:
+        Record: 抽取结果无法解析时抛出CrawlError
+    """
+    try:
+        data = json.loads(item)[0]
+    except Exception as e:
+        raise CrawlError(ERROR_PARSE, "转换数据失败：%s %s %s" % (str(e), url, abbreviate(item)))
+
+    try:
+        article_time = datetime.strptime(data.get("time"), "%Y-%m-%d")
+    except Exception as e:
+        logger.error("时间转换失败：%s %s %s" % (str(e), url, abbreviate(item)))
+        article_time = datetime.today()
+
+    return Record(
+        content=data.get("content"),
+        tags=data.get("tags"),
+        time=article_time,
+        title=data.get("title"),
+        type=config.type,
+        source=config.source,
+        url=url)
+
+
+class PipelineJob:
+    """
+    流水线中的一篇文章，依次经过抓取、抽取、存储三个阶段
+    """
+
+    def __init__(self, url, config, source_semaphore):
+        self.url = url
+        self.config = config
+        self.source_semaphore = source_semaphore
+        self.markdown = None
+        self.extracted_content = None
+        self.record = None
+        # 正文的SimHash指纹，做过近似重复判断后设置
+        self.fingerprint = None
+        # 近似重复时为已有文章的url_hash，跳过抽取，存储阶段记录为该文章的另一个来源
+        self.duplicate_of = None
+        # 各阶段已失败的次数
+        self.attempts = {}
+        # 最终状态：stored/skipped/duplicate/fetch_failed/extract_failed/store_failed
+        self.future = asyncio.get_running_loop().create_future()
+
+    def __repr__(self) -> str:
+        return f"<PipelineJob: source={self.config.source}, url={self.url}>"
+
+    def finish(self, status):
+        if not self.future.done():
+            self.future.set_result(status)
+
+
+class CollectionPipeline:
+    """
+    抓取 -> 抽取 -> 存储 的流水线
+
+    三个阶段各有独立的worker，阶段之间用有界队列连接：下游处理不过来时上游的put会等待，
+    浏览器抓取与LLM抽取可以同时进行，每篇文章抽取完成后立即存储。
+    抓取阶段由HostScheduler控制每个域名的并发和请求间隔。
+    每个阶段失败时按错误类型单独重试这一篇文章，配置了journal时记录每篇文章的状态，
+    中断后再次运行可以从上次完成的阶段继续。
+    配置了预处理时，抽取前先提取正文并截断到token预算以内；
+    配置了近似重复索引时，抽取前先计算正文指纹，与已收集的文章近似重复时跳过LLM抽取，
+    存储阶段把它记录为已有文章的另一个来源，之后的运行不再抓取。
+    """
+
+    def __init__(self, store_util, browser_pool, global_semaphore, extraction_cache=None,
+                 fetch_workers=1, extract_workers=1, store_workers=1, queue_size=10,
+                 retry_policy=None, journal=None, scheduler=None, async_store=None, dedup=None,
+                 preprocessor=None, llm=None):
+        self.store_util = store_util
+        # 配置了异步存储时直接await写入，否则在线程中调用同步StoreUtil
+        self.async_store = async_store
+        self.global_semaphore = global_semaphore
+        self.record_crawler = RecordCrawler(RecordCrawlerConfig([]), browser_pool, extraction_cache, llm)
+        self.fetch_workers = fetch_workers
+        self.extract_workers = extract_workers
+        self.store_workers = store_workers
+        self.queue_size = queue_size
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.journal = journal
+        self.scheduler = scheduler or HostScheduler()
+        self.dedup = dedup
+        self.preprocessor = preprocessor
+        # 因近似重复而省去的LLM抽取次数
+        self.llm_saved = 0
+        self.fetch_queue = None
+        self.extract_queue = None
+        self.store_queue = None
+        self.workers = []
+        self.retries = set()
+
+    async def start(self):
+        self.fetch_queue = asyncio.Queue(self.queue_size)
+        self.extract_queue = asyncio.Queue(self.queue_size)
+        self.store_queue = asyncio.Queue(self.queue_size)
+        self.workers = (
+            [asyncio.create_task(self.__fetch_worker()) for _ in range(self.fetch_workers)] +
+            [asyncio.create_task(self.__extract_worker()) for _ in range(self.extract_workers)] +
+            [asyncio.create_task(self.__store_worker()) for _ in range(self.store_workers)])
+
+    async def close(self):
+        tasks = self.workers + list(self.retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.workers = []
+        self.retries = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def submit(self, urls, config, source_semaphore):
+        """
+        提交一个来源的文章URL，等待全部处理完成
+
+        来源信号量在提交前获取、抓取完成后释放，限制单个来源同时抓取的页面数量。
+        journal中已有进度的URL从上次完成的阶段继续。
+
+        Returns:
+            dict: 状态 -> 数量
+        """
+        jobs = []
+        for url in urls:
+            job = PipelineJob(url, config, source_semaphore)
+            jobs.append(job)
+            state, data = self.journal.get(url) if self.journal else (None, None)
+            if state == STATE_STORED:
+                job.finish("skipped")
+            elif state == STATE_EXTRACTED:
+                job.extracted_content = data
+                try:
+                    job.record = convert_record(url, data, config)
+                    await self.store_queue.put(job)
+                except CrawlError:
+                    await self.__enqueue_fetch(job)
+            elif state == STATE_FETCHED:
+                job.markdown = data
+                await self.extract_queue.put(job)
+            else:
+                await self.__enqueue_fetch(job)
+
+        statuses = await asyncio.gather(*[job.future for job in jobs])
+        stats = {}
+        for status in statuses:
+            stats[status] = stats.get(status, 0) + 1
+            metrics.inc("articles_total", source=config.source, status=status)
+        return stats
+
+    async def __enqueue_fetch(self, job):
+        await job.source_semaphore.acquire()
+        await self.fetch_queue.put(job)
+
+    def __record(self, job, state, data=None):
+        if self.journal:
+            self.journal.record(job.url, job.config.source, state, data)
+
+    def __handle_error(self, job, stage, e, default_kind, enqueue):
+        """
+        失败时按错误类型决定是否在退避后重新放回队列
+        """
+        kind = classify_error(e, default_kind)
+        attempt = job.attempts.get(stage, 0) + 1
+        job.attempts[stage] = attempt
+        if self.retry_policy.should_retry(kind, attempt):
+            delay = self.retry_policy.delay(attempt)
+            logger.warning("文章%s失败（%s，第%d次），%.1f秒后重试：%s %s" % (stage, kind, attempt, delay, job.url, str(e)))
+            task = asyncio.create_task(self.__retry_later(job, delay, enqueue))
+            self.retries.add(task)
+            task.add_done_callback(self.retries.discard)
+        else:
+            logger.error("文章%s失败（%s，第%d次），放弃：%s %s" % (stage, kind, attempt, job.url, str(e)))
+            if self.dedup is not None and job.fingerprint is not None:
+                # 没有收集成功的文章不能作为判断重复的依据
+                self.dedup.remove(url_hash(job.url))
+            self.__record(job, STATE_FAILED, kind)
+            job.finish(f"{stage}_failed")
+
+    async def __retry_later(self, job, delay, enqueue):
+        await asyncio.sleep(delay)
+        await enqueue(job)
+
+    async def __fetch_worker(self):
+        while True:
+            job = await self.fetch_queue.get()
+            try:
+                async with self.scheduler.slot(job.url), self.global_semaphore:
+                    with metrics.timer("page_fetch_seconds", source=job.config.source), \
+                            tracer.span("article_fetch", source=job.config.source, url=job.url):
+                        page = await self.record_crawler.fetch(job.url)
+                self.scheduler.feedback(job.url, page.status_code)
+                job.markdown = page.markdown.raw_markdown
+            except Exception as e:
+                self.scheduler.feedback(job.url, getattr(e, "status_code", None),
+                                        classify_error(e) == ERROR_TIMEOUT, getattr(e, "retry_after", None))
+                self.__handle_error(job, "fetch", e, ERROR_FETCH, self.__enqueue_fetch)
+                continue
+            finally:
+                job.source_semaphore.release()
+                self.fetch_queue.task_done()
+            self.__record(job, STATE_FETCHED, job.markdown)
+            await self.extract_queue.put(job)
+
+    async def __is_duplicate(self, job):
+        """
+        计算正文指纹并查找近似重复的文章，重复时设置job.duplicate_of，不重复时把指纹加入索引
+        """
+        with tracer.span("dedup", source=job.config.source, url=job.url):
+            fingerprint = await asyncio.to_thread(self.dedup.fingerprint, job.markdown)
+        if fingerprint is None:
+            return False
+        key = url_hash(job.url)
+        duplicate = self.dedup.find(fingerprint, exclude=key)
+        if duplicate:
+            job.duplicate_of = duplicate
+            self.llm_saved += 1
+            metrics.inc("dedup_hits_total", source=job.config.source)
+            logger.info("文章与已收集的文章（url_hash=%s）近似重复，跳过LLM抽取：%s" % (duplicate, job.url))
+            return True
+        job.fingerprint = fingerprint
+        self.dedup.add(key, fingerprint)
+        return False
+
+    async def __extract_worker(self):
+        while True:
+            job = await self.extract_queue.get()
+            try:
+                # 重试时job.markdown已经是处理后的正文
+                if self.preprocessor and not job.attempts.get("extract"):
+                    with tracer.span("preprocess", source=job.config.source, url=job.url):
+                        job.markdown = await asyncio.to_thread(
+                            self.preprocessor.process, job.url, job.markdown, job.config.source)
+                if self.dedup is not None and not job.attempts.get("extract"):
+                    await self.__is_duplicate(job)
+                if not job.duplicate_of:
+                    tokens = estimate_tokens(job.markdown)
+                    metrics.observe("llm_prompt_tokens", tokens, TOKEN_BUCKETS, source=job.config.source)
+                    metrics.inc("llm_prompt_tokens_total", tokens, source=job.config.source)
+                    with metrics.timer("llm_extract_seconds", source=job.config.source), \
+                            tracer.span("article_llm_extract", source=job.config.source, url=job.url, tokens=tokens):
+                        job.extracted_content = await self.record_crawler.extract(job.url, job.markdown)
+                    job.record = convert_record(job.url, job.extracted_content, job.config)
+            except Exception as e:
+                self.__handle_error(job, "extract", e, ERROR_LLM, self.extract_queue.put)
+                continue
+            finally:
+                self.extract_queue.task_done()
+            job.markdown = None
+            if job.duplicate_of:
+                await self.store_queue.put(job)
+                continue
+            logger.info("收集到文章：%s %s" % (job.url, job.record.title))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("文章抽取结果：%s\n %s" % (job.url, job.extracted_content))
+            self.__record(job, STATE_EXTRACTED, job.extracted_content)
+            await self.store_queue.put(job)
+
+    async def __save_duplicate(self, job) -> bool:
+        duplicates = [(job.url, job.config.source, job.duplicate_of)]
+        if self.async_store:
+            return await self.async_store.save_duplicates(duplicates)
+        return await asyncio.to_thread(self.store_util.save_duplicates, duplicates)
+
+    async def __store_worker(self):
+        while True:
+            job = await self.store_queue.get()
+            try:
+                with tracer.span("store", source=job.config.source, url=job.url):
+                    if job.duplicate_of:
+                        ans = {"failed": 0 if await self.__save_duplicate(job) else 1}
+                    elif self.async_store:
+                        ans = await self.async_store.save_records([job.record])
+                    else:
+                        ans = await asyncio.to_thread(self.store_util.save_records, [job.record])
+                if ans.get("failed"):
+                    raise CrawlError(ERROR_STORE, "数据库写入失败")
+            except Exception as e:
+                self.__handle_error(job, "store", e, ERROR_STORE, self.store_queue.put)
+                continue
+            finally:
+                self.store_queue.task_done()
+            if job.duplicate_of:
+                self.__record(job, STATE_STORED, "duplicate")
+                job.finish("duplicate")
+                continue
+            if job.fingerprint is not None:
+                fingerprints = [(url_hash(job.url), job.fingerprint)]
+                if self.async_store:
+                    await self.async_store.save_fingerprints(fingerprints)
+                else:
+                    await asyncio.to_thread(self.store_util.save_fingerprints, fingerprints)
+            self.__record(job, STATE_STORED)
+            job.finish("stored" if ans.get("success") else "skipped")
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import re
+import threading
+from urllib.parse import urlsplit
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from util.text_util import estimate_tokens, truncate_tokens
+
+# markdown图片和链接
+_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_URL_PATTERN = re.compile(r"<?https?://\S+>?")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+# 每个域名最多记录的段落数量，超过时丢弃只出现过一次的段落
+MAX_DOMAIN_BLOCKS = 20000
+# 每个域名最多记录的已计数页面数量，超过时丢弃最早记录的页面
+MAX_DOMAIN_URLS = 50000
+
+
+class PreprocessStats:
+    """
+    一个来源的预处理统计：页面数，处理前后的token数
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def __repr__(self) -> str:
+        return f"<PreprocessStats: pages={self.pages}, tokens_before={self.tokens_before}, tokens_after={self.tokens_after}>"
+
+    def add(self, before, after):
+        self.pages += 1
+        self.tokens_before += before
+        self.tokens_after += after
+
+
+class _DomainBoilerplate:
+    def __init__(self):
+        # 段落摘要 -> 出现过的页面数
+        self.counts = {}
+        # 已计数页面地址的摘要，按记录顺序保存，用于避免同一页面重复计数
+        self.urls = {}
+
+    def add_url(self, url_key):
+        """
+        记录页面地址摘要，已记录过时返回False
+        """
+        if url_key in self.urls:
+            return False
+        self.urls[url_key] = None
+        if len(self.urls) > MAX_DOMAIN_URLS:
+            del self.urls[next(iter(self.urls))]
+        return True
+
+
+class ContentPreprocessor:
+    """
+    LLM抽取前的正文预处理
+
+    按空行把页面markdown切成段落，去掉图片和链接密度过高的段落（导航、相关文章列表、分享按钮等），
+    去掉同一域名下在多个页面重复出现的段落（页头页尾、版权声明、推荐阅读），
+    其余段落中的链接只保留文字，最后截断到token预算以内。
+    各域名的段落计数可以保存为快照，重启后继续使用，同一页面的处理结果（抽取缓存的key、SimHash指纹）
+    不会因为计数从零开始而变化。
+    """
+
+    def __init__(self, token_budget=3000, max_link_density=0.5, boilerplate_min_pages=3, snapshot=None):
+        """
+        Args:
+            token_budget (int): 处理后正文的token上限
+            max_link_density (float): 链接文字占比超过该值的段落视为导航
+            boilerplate_min_pages (int): 同一域名下在这么多个页面出现过的段落视为模板内容
+            snapshot (str): 段落计数快照的路径，存在时在创建时加载，为None时不保存
+        """
+        self.token_budget = token_budget
+        self.max_link_density = max_link_density
+        self.boilerplate_min_pages = boilerplate_min_pages
+        # 域名 -> _DomainBoilerplate
+        self.domains = {}
+        # 来源 -> PreprocessStats
+        self.stats = {}
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+        if snapshot:
+            self.load(snapshot)
+
+    def __repr__(self) -> str:
+        return (f"<ContentPreprocessor: token_budget={self.token_budget}, max_link_density={self.max_link_density}, "
+                f"boilerplate_min_pages={self.boilerplate_min_pages}, domains={len(self.domains)}>")
+
+    def load(self, file_path):
+        """
+        读取段落计数快照，快照不存在或已损坏时保持当前计数
+
+        Returns:
+            bool: 是否加载成功
+        """
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            for name, item in data.get("domains", {}).items():
+                domain = self.domains.setdefault(name, _DomainBoilerplate())
+                domain.counts = dict(item.get("counts", {}))
+                domain.urls = dict.fromkeys(item.get("urls", [])[-MAX_DOMAIN_URLS:])
+        return True
+
+    def save(self, file_path=None):
+        """
+        保存段落计数快照，先写临时文件再替换，避免中断时留下不完整的快照
+
+        已计数页面地址的摘要一起保存，重启后再次处理同一页面时不会重复计数。
+        """
+        file_path = file_path or self.snapshot
+        if not file_path:
+            return
+        with self._lock:
+            data = {"domains": {name: {"counts": dict(domain.counts), "urls": list(domain.urls)}
+                                for name, domain in self.domains.items()}}
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def _block_key(text):
+        return hashlib.md5(re.sub(r"\s+", "", text).encode("utf-8")).hexdigest()
+
+    def _learn(self, url, keys):
+        """
+        记录页面中出现的段落，返回其中已被判定为模板内容的段落
+        """
+        with self._lock:
+            domain = self.domains.setdefault(urlsplit(url).netloc.lower(), _DomainBoilerplate())
+            # 同一页面重试或重启后再次处理时不重复计数
+            if domain.add_url(hashlib.md5(url.encode("utf-8")).hexdigest()[:16]):
+                for key in set(keys):
+                    domain.counts[key] = domain.counts.get(key, 0) + 1
+                if len(domain.counts) > MAX_DOMAIN_BLOCKS:
+                    domain.counts = {k: v for k, v in domain.counts.items() if v > 1}
+            return set(key for key in keys if domain.counts.get(key, 0) >= self.boilerplate_min_pages)
+
+    def process(self, url, markdown, source=None):
+        """
+        Args:
+            url (str): 页面地址，用于区分域名
+            markdown (str): 页面markdown
+            source (str): 来源名称，用于统计
+
+        Returns:
+            str: 处理后的正文
+        """
+        markdown = markdown or ""
+        blocks = []
+        for block in _BLANK_LINES.split(markdown):
+            block = _IMAGE_PATTERN.sub("", block).strip()
+            if not block:
+                continue
+            link_chars = sum(len(m.group(1)) for m in _LINK_PATTERN.finditer(block))
+            text = _URL_PATTERN.sub("", _LINK_PATTERN.sub(r"\1", block)).strip()
+            if not text:
+                continue
+            blocks.append((text, link_chars / len(text)))
+
+        keys = [self._block_key(text) for text, _ in blocks]
+        boilerplate = self._learn(url, keys)
+        body = "\n\n".join(text for (text, density), key in zip(blocks, keys)
+                           if density <= self.max_link_density and key not in boilerplate)
+        body = truncate_tokens(body, self.token_budget)
+
+        with self._lock:
+            self.stats.setdefault(source, PreprocessStats()).add(estimate_tokens(markdown), estimate_tokens(body))
+        return body
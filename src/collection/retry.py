@@ -0,0 +1,70 @@
+import asyncio
+import random
+
+# 错误分类
+ERROR_TIMEOUT = "timeout"
+ERROR_FETCH = "fetch"
+ERROR_LLM = "llm"
+ERROR_PARSE = "parse"
+ERROR_STORE = "store"
+
+# 各类错误的默认最大尝试次数（含第一次）
+DEFAULT_MAX_ATTEMPTS = {
+    ERROR_TIMEOUT: 3,
+    ERROR_FETCH: 2,
+    ERROR_LLM: 2,
+    ERROR_PARSE: 2,
+    ERROR_STORE: 2,
+}
+
+
+class CrawlError(Exception):
+    """
+    已分类的抓取错误
+    """
+
+    def __init__(self, kind, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.kind = kind
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def classify_error(e: Exception, default=ERROR_FETCH) -> str:
+    """
+    判断错误类型：超时、页面抓取失败、LLM调用失败、结果解析失败、存储失败
+    """
+    if isinstance(e, CrawlError):
+        return e.kind
+    if isinstance(e, (asyncio.TimeoutError, TimeoutError)) or "timeout" in str(e).lower():
+        return ERROR_TIMEOUT
+    if isinstance(e, (ValueError, KeyError, IndexError, TypeError)):
+        return ERROR_PARSE
+    return default
+
+
+class RetryPolicy:
+    """
+    按错误类型决定是否重试，重试间隔指数增长并带随机抖动
+    """
+
+    def __init__(self, base_delay=2, max_delay=60, max_attempts=None):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = dict(DEFAULT_MAX_ATTEMPTS)
+        self.max_attempts.update(max_attempts or {})
+
+    def __repr__(self) -> str:
+        return f"<RetryPolicy: base_delay={self.base_delay}, max_delay={self.max_delay}, max_attempts={self.max_attempts}>"
+
+    def should_retry(self, kind, attempt) -> bool:
+        """
+        Args:
+            kind (str): 错误类型
+            attempt (int): 已经失败的次数
+        """
+        return attempt < self.max_attempts.get(kind, 1)
+
+    def delay(self, attempt) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+# 表示被限流或服务暂不可用的状态码
+THROTTLE_STATUS_CODES = (429, 503)
+# 连续超时达到该次数时视为被限流
+TIMEOUT_THRESHOLD = 2
+
+
+class HostPolicy:
+    max_concurrency: int
+    min_interval: float
+
+    def __repr__(self) -> str:
+        return f"<HostPolicy: max_concurrency={self.max_concurrency}, min_interval={self.min_interval}>"
+
+    def __init__(self, max_concurrency=2, min_interval=1.0):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+
+    def merge(self, other):
+        """
+        多个来源共用一个域名时取更保守的配置
+        """
+        return HostPolicy(min(self.max_concurrency, other.max_concurrency),
+                          max(self.min_interval, other.min_interval))
+
+
+class _HostState:
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.semaphore = asyncio.Semaphore(policy.max_concurrency)
+        self.next_time = 0.0
+        # 被限流后额外增加的请求间隔
+        self.backoff = 0.0
+        self.timeouts = 0
+        self.lock = asyncio.Lock()
+
+
+class HostScheduler:
+    """
+    按域名限制并发数和请求间隔
+
+    同一域名同时进行的请求不超过max_concurrency，相邻两次请求的开始时间至少间隔min_interval，
+    遇到429/503或连续超时时加倍额外间隔，请求成功后逐步恢复。
+    """
+
+    def __init__(self, default_policy: HostPolicy = None, max_backoff=300, base_backoff=5):
+        self.default_policy = default_policy or HostPolicy()
+        self.max_backoff = max_backoff
+        self.base_backoff = base_backoff
+        self.policies = {}
+        self.hosts = {}
+
+    @staticmethod
+    def host(url) -> str:
+        return urlsplit(url).netloc.lower()
+
+    def register(self, url, policy: HostPolicy):
+        """
+        为url所在域名设置策略，需要在该域名的第一次请求之前调用
+        """
+        host = self.host(url)
+        self.policies[host] = self.policies[host].merge(policy) if host in self.policies else policy
+
+    def _state(self, host) -> _HostState:
+        if host not in self.hosts:
+            self.hosts[host] = _HostState(self.policies.get(host, self.default_policy))
+        return self.hosts[host]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """
+        等待url所在域名空出并发名额并满足请求间隔
+        """
+        state = self._state(self.host(url))
+        async with state.semaphore:
+            async with state.lock:
+                wait = state.next_time - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                state.next_time = time.monotonic() + state.policy.min_interval + state.backoff
+            yield
+
+    def feedback(self, url, status_code=None, timeout=False, retry_after=None):
+        """
+        根据请求结果调整该域名的额外间隔
+
+        Args:
+            url (str): 请求地址
+            status_code (int): 响应状态码
+            timeout (bool): 是否超时
+            retry_after (float): 服务端要求的等待秒数
+        """
+        state = self._state(self.host(url))
+        state.timeouts = state.timeouts + 1 if timeout else 0
+        if status_code in THROTTLE_STATUS_CODES or state.timeouts >= TIMEOUT_THRESHOLD:
+            state.backoff = min(self.max_backoff, max(self.base_backoff, state.backoff * 2))
+            if retry_after:
+                state.backoff = min(self.max_backoff, max(state.backoff, retry_after))
+            state.next_time = max(state.next_time, time.monotonic() + state.backoff)
+        elif state.backoff:
+            state.backoff = state.backoff / 2 if state.backoff > 1 else 0.0
+
+    def throttled_hosts(self) -> dict:
+        """
+        Returns:
+            dict: 当前仍处于退避中的域名 -> 额外间隔秒数
+        """
+        return {host: state.backoff for host, state in self.hosts.items() if state.backoff}
@@ -5,84 +5,145 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from display.summarizer import Summarizer
+from util.cache_util import DiskCache
 from util.store_util import Record, StoreUtil
-from util.logger import get_logger
-from ollama import ChatResponse
-from ollama import chat
+from util.logger import configure_logging, get_logger
+from util.metrics import metrics
+from util.trace_util import tracer, SamplingProfiler
 
 TYPES = set(["时政", "财经", "科技", "AI", "智驾"])
 
 logger = get_logger("display.log")
 store_util = None
+summarizer = None
 
 
-def display(records: list, summary: list=None, output_type="html"):
-    if output_type == "html":
-        from util.html_util import generate_html_report
-        generate_html_report(records, "report.html", summary)
+def display(start_time: datetime, end_time: datetime, type, summary: list=None, output_type="html",
+            incremental=False):
+    """
+    查询记录并生成报告
+
+    Args:
+        incremental (bool): 分页报告只查询上次生成之后新增的记录并合并到已有分片，
+            单页报告不支持增量，总是全量生成
+    """
+    with metrics.timer("report_seconds", output=output_type), tracer.span("report", output=output_type):
+        if output_type == "html":
+            from util.html_util import generate_html_report
+            generate_html_report(get_record_list(start_time, end_time, type), "report.html", summary)
+        elif output_type == "paged":
+            from util.report_util import open_paged_report
+            writer = open_paged_report("report", summary, incremental, {"types": sorted(type)}, start_time, end_time)
+            if writer.watermark:
+                logger.info(f"增量生成报告，上次已生成到记录 {writer.watermark}")
+            writer.write_records(get_record_list(start_time, end_time, type, writer.watermark))
+            writer.prune(start_time)
+            writer.close()
 
     return
 
 
-def summary_by_ai(records: list) -> str:
-    logger.info("======================= 开始生成报告 =======================")
-    
-    # 如果没有记录，直接返回空字符串
-    if not records:
-        logger.info("没有记录可供分析")
-        return ""
-    
-    # 构造提供给AI的记录信息
-    record_info = ""
-    for i, record in enumerate(records[:20]):  # 限制在前20条记录以避免token超限
-        record_info += f"{i+1}. 标题: {record.title}\n"
-        record_info += f"   类型: {record.type}\n"
-        record_info += f"   内容摘要: {record.content}\n"
-    
-    # 构造提示词
-    prompt = f"""
-    你是一个专业的新闻分析师，请根据以下新闻记录分析并总结合并出当前的热点话题和趋势 3-5条。请直接以列表的形式输出结果，不要包含任何分析过程或解释性文字，只输出最终的热点总结。
-
-    新闻记录:
-    {record_info}
-
-    并以json格式返回，格式如下：
-        "topic": [
-            "热点话题1（20字以内）：内容概要（100字以内）",
-            "热点话题2：内容概要",
-            ...
-        ]
-    ...
+def summary_by_ai(records) -> list:
     """
-    
-    try:
-        response: ChatResponse = chat(model='qwen3:8b', messages=[
-            {
-                'role': 'user',
-                'content': prompt,
-            }], 
-            format="json"
-        )
-        
-        summary = json.loads(response['message']['content']).get("topic")
-        logger.info("AI生成的总结:")
-        logger.info(summary)
-        return summary
-    except Exception as e:
-        logger.error(f"AI总结生成失败: {e}")
-        return "无法生成AI总结"
+    对全部记录分批总结后合并出热点话题
 
+    Args:
+        records (iterable): Record列表或生成器
+    """
+    logger.info("======================= 开始生成报告 =======================")
+    logger.info("总结配置：%s" % summarizer)
+    with metrics.timer("summary_seconds"), tracer.span("summary"):
+        summary = summarizer.summarize(records)
+    logger.info("模型调用 %d 次" % summarizer.calls)
+    if summarizer.cache:
+        logger.info("总结缓存命中 %d 次，未命中 %d 次" % (summarizer.cache.hits, summarizer.cache.misses))
+        metrics.set("summary_cache_hits", summarizer.cache.hits)
+        metrics.set("summary_cache_misses", summarizer.cache.misses)
+    logger.info("AI生成的总结:")
+    logger.info(summary)
+    return summary
+
+
+def create_summarizer(config) -> Summarizer:
+    """
+    根据summary配置创建Summarizer
+    """
+    cache = None
+    cache_config = config.get("cache")
+    if cache_config:
+        cache = DiskCache(
+            cache_config.get("path", "data/summary_cache.db"),
+            max_size=cache_config.get("max_size_mb", 64) * 1024 * 1024,
+            max_age=cache_config.get("max_age_days", 7) * 24 * 3600)
+    return Summarizer(
+        model=config.get("model", "qwen3:8b"),
+        host=config.get("host"),
+        chunk_tokens=config.get("chunk_tokens", 3000),
+        record_tokens=config.get("record_tokens", 300),
+        concurrency=config.get("concurrency", 2),
+        cache=cache)
+
+
+def get_record_list(start_time: datetime, end_time: datetime, type, min_id=None):
+    """
+    按(type, time)顺序流式读取记录，读取完毕后输出记录数量
 
-def get_record_list(start_time: datetime, end_time: datetime, type):
+    Args:
+        min_id (int): 只读取id大于该值的记录
+    """
     logger.info("======================= 开始查询 =======================")
     logger.info(f"开始时间：{start_time.date()}")
     logger.info(f"结束时间：{end_time.date()}")
     logger.info(f"类型：{type}")
 
-    result = store_util.get_records(start_time, end_time, type)
+    count = 0
+    for record in store_util.iter_records(start_time, end_time, type, order_by=["type", "time"], min_id=min_id):
+        count += 1
+        yield record
     logger.info("======================= 查询结果 =======================")
-    logger.info(f"查询到 {len(result)} 条记录")
-    return result
+    logger.info(f"查询到 {count} 条记录")
+    metrics.inc("report_records_total", count)
+
+
+def parse_duration(dur_mode) -> datetime.timedelta:
+    """
+    解析时间模式nd/nw（最近n天/n周），格式错误时抛出ValueError
+    """
+    if dur_mode and dur_mode[-1] == 'd':
+        return datetime.timedelta(days=int(dur_mode[:-1]))
+    if dur_mode and dur_mode[-1] == 'w':
+        return datetime.timedelta(weeks=int(dur_mode[:-1]))
+    raise ValueError(f"时间模式错误，使用nd/nw：{dur_mode}")
+
+
+def init_display(config, store=None):
+    """
+    按配置创建存储和总结器，常驻运行时只需调用一次
+
+    Args:
+        config (dict): 配置文件内容
+        store (StoreUtil): 复用的存储实例（如收集阶段的StoreUtil，共用连接池），为None时新建
+    """
+    global store_util, summarizer
+    store_util = store or StoreUtil(config.get('storage'))
+    summarizer = create_summarizer(config.get('summary') or {})
+
+
+def run_display(start_time: datetime, end_time: datetime, type=TYPES, mode=None, output_type="html",
+                incremental=False):
+    """
+    生成一次报告，需要先调用init_display
+
+    Args:
+        mode (str): ai时先生成热点总结
+    """
+    summary = None
+    if mode == 'ai':
+        summary = summary_by_ai(store_util.iter_records(
+            start_time, end_time, type, columns=["id", "type", "time", "title", "content"], order_by=["type", "time"]))
+    display(start_time, end_time, type, summary, output_type, incremental)
+    store_util.PrintPoolStatus()
 
 
 def parse_args():
@@ -93,22 +154,30 @@ def parse_args():
     parser.add_argument('--type', '-t', help='类型')
     parser.add_argument('--mode', '-m', help='模式：展示模式/AI报告模式（默认展示模式）')
     parser.add_argument('--config', '-c', help='配置文件路径')
+    parser.add_argument('--output', '-o', default='html',
+                        help='报告形式：html单页报告/paged分页报告（按类型、按天拆分数据，适合记录较多时）')
+    parser.add_argument('--incremental', '-i', action='store_true',
+                        help='增量生成分页报告，只渲染上次生成之后新增的记录')
+    parser.add_argument('--profile', action='store_true', help='记录各阶段耗时，输出Chrome trace文件到日志目录')
+    parser.add_argument('--profile-sample', action='store_true', help='同时采样调用栈，输出CPU热点的folded文件')
     return parser.parse_args()
 
 
 def main():
+    profiler = None
     try:
         args = parse_args()
+        if args.profile:
+            tracer.enable()
+        if args.profile_sample:
+            profiler = SamplingProfiler()
+            profiler.start()
         start_time = datetime.datetime.today()
         end_time = datetime.datetime.today()
         if args.dur_mode:
-            if args.dur_mode[-1] == 'd':
-                n = int(args.dur_mode[:-1])
-                start_time = start_time - datetime.timedelta(days=n)
-            elif args.dur_mode[-1] == 'w':
-                n = int(args.dur_mode[:-1])
-                start_time = start_time - datetime.timedelta(weeks=n)
-            else:
+            try:
+                start_time = start_time - parse_duration(args.dur_mode)
+            except ValueError:
                 logger.error("时间模式错误，使用nd/nw")
                 return
         elif args.start_time and args.end_time:
@@ -119,26 +188,29 @@ def main():
             logger.error("请输入时间参数")
             return
 
-        type = TYPES
+        type = set(TYPES)
         if args.type:
             type &= set(x.strip() for x in args.type.split(','))
 
         if args.config:
             with open(args.config, encoding='utf-8') as f:
                 config = json.load(f)
-                global store_util
-                store_util = StoreUtil(config.get('storage'))
+                configure_logging(config.get('logging'))
+                init_display(config)
         else:
             logger.error("请输入配置文件路径")
             return
 
-        records = get_record_list(start_time, end_time, type)
-        summary = None
-        if args.mode and args.mode == 'ai':
-            summary = summary_by_ai(records)
-        display(records, summary)
+        run_display(start_time, end_time, type, args.mode, args.output, args.incremental)
+        logger.info("指标快照：%s %s" % metrics.write_snapshot("display"))
+        if args.profile:
+            logger.info("trace文件：%s" % tracer.write("display"))
     except Exception as e:
         logger.error(e)
+    finally:
+        if profiler:
+            profiler.stop()
+            logger.info("采样结果：%s" % profiler.write("display"))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ollama import AsyncClient
+from util.logger import get_logger
+from util.metrics import metrics
+from util.trace_util import tracer
+from util.text_util import estimate_tokens, truncate_tokens
+
+logger = get_logger("display.log")
+
+_MAP_PROMPT = """
+    你是一个专业的新闻分析师，请根据以下{type}类新闻记录分析并总结合并出其中的热点话题 3-5条。请直接以列表的形式输出结果，不要包含任何分析过程或解释性文字，只输出最终的热点总结。
+
+    新闻记录:
+    {records}
+
+    并以json格式返回，格式如下：
+        "topic": [
+            "热点话题1（20字以内）：内容概要（100字以内）",
+            "热点话题2：内容概要",
+            ...
+        ]
+    ...
+    """
+
+_REDUCE_PROMPT = """
+    你是一个专业的新闻分析师，以下是从不同批次新闻中分别总结出的热点话题，请合并相同或相近的话题，总结出当前最重要的热点话题和趋势 {count}条。请直接以列表的形式输出结果，不要包含任何分析过程或解释性文字，只输出最终的热点总结。
+
+    各批次热点:
+    {topics}
+
+    并以json格式返回，格式如下：
+        "topic": [
+            "热点话题1（20字以内）：内容概要（100字以内）",
+            "热点话题2：内容概要",
+            ...
+        ]
+    ...
+    """
+
+
+class SummaryChunk:
+    """
+    一批待总结的记录，同一批次内的记录属于同一类型
+    """
+
+    def __init__(self, type):
+        self.type = type
+        self.lines = []
+        self.tokens = 0
+
+    def __repr__(self) -> str:
+        return f"<SummaryChunk: type={self.type}, records={len(self.lines)}, tokens={self.tokens}>"
+
+    def add(self, line, tokens):
+        self.lines.append(line)
+        self.tokens += tokens
+
+
+class Summarizer:
+    """
+    分层（map-reduce）生成热点总结
+
+    记录按类型、按天分桶，再按token预算划分为多个批次，各批次并发调用模型总结出各自的热点（map），
+    再把各批次的热点按同样的预算分组合并，直到只剩一组，生成最终的热点列表（reduce）。
+    配置了缓存时，每次模型调用的结果按提示词缓存，重叠的时间窗口再次总结时只需要处理新的批次。
+    """
+
+    def __init__(self, model="qwen3:8b", host=None, chunk_tokens=3000, record_tokens=300,
+                 concurrency=2, topic_count="3-5", cache=None):
+        """
+        Args:
+            model (str): ollama模型名
+            host (str): ollama服务地址，默认使用本机
+            chunk_tokens (int): 每次调用中记录或热点部分的token预算
+            record_tokens (int): 单条记录内容的token上限，超过时截断
+            concurrency (int): 同时进行的模型调用数量
+            topic_count (str): 最终输出的热点数量
+            cache (DiskCache): 模型调用结果的缓存
+        """
+        self.model = model
+        self.host = host
+        self.chunk_tokens = chunk_tokens
+        self.record_tokens = record_tokens
+        self.concurrency = concurrency
+        self.topic_count = topic_count
+        self.cache = cache
+        # 本次实际调用模型的次数
+        self.calls = 0
+
+    def __repr__(self) -> str:
+        return (f"<Summarizer: model={self.model}, chunk_tokens={self.chunk_tokens}, "
+                f"concurrency={self.concurrency}, cache={self.cache}>")
+
+    def chunk(self, records) -> list:
+        """
+        将记录划分为批次，records可以是生成器，只保留每条记录用于总结的文本
+
+        同一类型同一天的记录为一个分桶，桶内按id排序后再按token预算切分，批次不跨桶。
+        批次边界只取决于桶内的记录，时间窗口滑动时没有变化的日期仍然生成相同的提示词，可以命中缓存，
+        只有新增记录或窗口边界所在的日期需要重新调用模型。
+
+        Returns:
+            list: SummaryChunk列表，按(类型, 日期)排序
+        """
+        buckets = {}
+        for record in records:
+            content = truncate_tokens(record.content or "", self.record_tokens)
+            line = f"标题: {record.title}\n   类型: {record.type}\n   内容摘要: {content}\n"
+            day = record.time.strftime("%Y%m%d") if record.time else ""
+            buckets.setdefault((record.type or "", day), []).append((record.id or 0, line, estimate_tokens(line)))
+
+        chunks = []
+        for (type, _), items in sorted(buckets.items()):
+            current = None
+            for _, line, tokens in sorted(items, key=lambda item: item[0]):
+                if not current or current.tokens + tokens > self.chunk_tokens:
+                    current = SummaryChunk(type)
+                    chunks.append(current)
+                current.add(line, tokens)
+        return chunks
+
+    def summarize(self, records) -> list:
+        """
+        同步调用入口
+
+        Args:
+            records (iterable): Record列表或生成器，需要包含id、type、time、title、content列
+
+        Returns:
+            list: 热点话题列表，失败时返回None
+        """
+        return asyncio.run(self.summarize_async(self.chunk(records)))
+
+    async def summarize_async(self, chunks) -> list:
+        if not chunks:
+            logger.info("没有记录可供分析")
+            return None
+
+        self.calls = 0
+        client = AsyncClient(host=self.host)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info("共 %d 条记录，分为 %d 批" % (sum(len(c.lines) for c in chunks), len(chunks)))
+
+        prompts = [_MAP_PROMPT.format(type=chunk.type, records="".join(
+            f"{i}. {line}" for i, line in enumerate(chunk.lines, 1))) for chunk in chunks]
+        results = await asyncio.gather(*[self._call(client, semaphore, prompt) for prompt in prompts])
+        topics = [topic for result in results if result for topic in result]
+        if not topics:
+            return None
+        if len(chunks) == 1:
+            return topics
+
+        # 逐层合并，直到所有热点能放进一次调用
+        while True:
+            groups = self._group(topics)
+            if len(groups) == 1:
+                result = await self._call(client, semaphore, _REDUCE_PROMPT.format(
+                    count=self.topic_count, topics="\n".join(groups[0])))
+                if not result:
+                    # 最后一次合并失败时直接给出已有的热点，不丢掉前面各批次的结果
+                    logger.warning("合并热点失败，使用合并前的前 %d 条热点" % self.topic_limit())
+                    return topics[:self.topic_limit()]
+                return result
+            logger.info("合并 %d 条热点，分为 %d 组" % (len(topics), len(groups)))
+            results = await asyncio.gather(*[self._call(client, semaphore, _REDUCE_PROMPT.format(
+                count=self.topic_count, topics="\n".join(group))) for group in groups])
+            merged = [topic for result in results if result for topic in result]
+            # 合并没有减少数量时直接给出最终结果，避免无限循环
+            if not merged or len(merged) >= len(topics):
+                return merged or topics
+            topics = merged
+
+    def topic_limit(self) -> int:
+        """
+        热点数量的上限，topic_count为"3-5"这样的范围时取最大值
+        """
+        numbers = re.findall(r"\d+", str(self.topic_count))
+        return max(int(n) for n in numbers) if numbers else 5
+
+    def _group(self, topics) -> list:
+        groups = [[]]
+        tokens = 0
+        for topic in topics:
+            topic_tokens = estimate_tokens(topic)
+            if groups[-1] and tokens + topic_tokens > self.chunk_tokens:
+                groups.append([])
+                tokens = 0
+            groups[-1].append(topic)
+            tokens += topic_tokens
+        return groups
+
+    def cache_key(self, prompt) -> str:
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    async def _call(self, client, semaphore, prompt) -> list:
+        """
+        调用模型并解析热点列表，失败时返回None
+        """
+        key = self.cache_key(prompt)
+        if self.cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return json.loads(cached)
+
+        try:
+            async with semaphore:
+                self.calls += 1
+                metrics.inc("summary_llm_calls_total")
+                with metrics.timer("summary_llm_seconds"), tracer.span("summary_llm", tokens=estimate_tokens(prompt)):
+                    response = await client.chat(model=self.model, messages=[
+                        {
+                            'role': 'user',
+                            'content': prompt,
+                        }],
+                        format="json"
+                    )
+            topics = json.loads(response['message']['content']).get("topic")
+        except Exception as e:
+            logger.error(f"AI总结生成失败: {e}")
+            return None
+
+        if not isinstance(topics, list):
+            logger.error(f"AI总结格式错误: {topics}")
+            return None
+        if self.cache:
+            await asyncio.to_thread(self.cache.set, key, json.dumps(topics, ensure_ascii=False))
+        return topics
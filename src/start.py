@@ -1,9 +1,20 @@
-import os
+import argparse
+import asyncio
+import datetime
+import json
 import signal
 import sys
-import subprocess
+import time
+import os
+sys.path.append(os.path.dirname(__file__))
 
-print("""
+from collection.main import CollectionImpl, log_run_result, serve_metrics
+from display.main import TYPES, init_display, parse_duration, run_display
+from util.logger import get_logger
+from util.metrics import metrics
+from util.schedule_util import create_schedule
+
+BANNER = """
  $$$$$$\  $$$$$$$\  $$$$$$$$\ $$\   $$\       $$$$$$$$\ $$\     $$\ $$$$$$$$\  $$$$$$\  
 $$  __$$\ $$  __$$\ $$  _____|$$$\  $$ |      $$  _____|\$$\   $$  |$$  _____|$$  __$$\ 
 $$ /  $$ |$$ |  $$ |$$ |      $$$$\ $$ |      $$ |       \$$\ $$  / $$ |      $$ /  \__|
@@ -13,38 +24,164 @@ $$ |  $$ |$$ |      $$ |      $$ |\$$$ |      $$ |          $$ |    $$ |      $$
  $$$$$$  |$$ |      $$$$$$$$\ $$ | \$$ |      $$$$$$$$\     $$ |    $$$$$$$$\ \$$$$$$  |
  \______/ \__|      \________|\__|  \__|      \________|    \__|    \________| \______/ 
 """
-)
 
-# 全局变量存储子进程
-process = None
+logger = get_logger("start.log")
+
+
+class Orchestrator:
+    """
+    在同一进程中依次运行收集和报告生成
+
+    单次运行时完成一轮后退出；常驻运行时按间隔或cron表达式重复，浏览器池、数据库连接池、
+    URL过滤器、近似重复索引和各类缓存在多轮之间保持，不再为每轮重新启动进程、浏览器和连接。
+    收到SIGINT/SIGTERM时取消进行中的一轮（抓取日志保留进度，下次启动时恢复），关闭浏览器和连接后退出，
+    再次按Ctrl+C立即退出。
+    """
+
+    def __init__(self, config_path, schedule=None, display_config=None):
+        """
+        Args:
+            config_path (str): 配置文件路径
+            schedule (CronSchedule | IntervalSchedule): 常驻运行的调度，为None时只运行一轮
+            display_config (dict): 报告参数：duration（nd/nw）、mode（ai）、output（html/paged）、
+                incremental、types，为None时不生成报告
+        """
+        self.impl = CollectionImpl(config_path)
+        self.config = self.impl.config
+        self.schedule = schedule
+        self.display_config = display_config
+        if display_config is not None:
+            # 报告与收集共用同一个StoreUtil和连接池
+            init_display(self.config, self.impl.store_util)
+        self.cycles = 0
+        self.stopping = None
+        self.cycle_task = None
+
+    def __repr__(self) -> str:
+        return f"<Orchestrator: schedule={self.schedule}, display={self.display_config}, cycles={self.cycles}>"
 
-def signal_handler(sig, frame):
-    print('\n接收到中断信号，正在关闭子进程...')
-    if process and process.poll() is None:
-        process.terminate()
+    def stop(self):
+        """
+        请求停止：取消进行中的一轮，并恢复默认的中断处理，再次中断时立即退出
+        """
+        if self.stopping.is_set():
+            return
+        logger.info("收到停止信号，正在结束当前任务...")
+        self.stopping.set()
+        if self.cycle_task and not self.cycle_task.done():
+            self.cycle_task.cancel()
         try:
-            process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            process.kill()
-    print("子进程已关闭，程序退出。")
-    sys.exit(0)
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError):
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+            if sig is None:
+                continue
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:
+                # Windows的事件循环不支持add_signal_handler
+                signal.signal(sig, lambda *args: loop.call_soon_threadsafe(self.stop))
+
+    async def run_cycle(self, browser_pool):
+        """
+        运行一轮：收集所有来源，然后生成报告
+        """
+        self.cycles += 1
+        logger.info("================================ 第 %d 轮：开始收集 ================================" % self.cycles)
+        start = time.time()
+        with self.impl.store_util.unit_of_work():
+            url_status = await self.impl.RunAsync(browser_pool)
+        log_run_result(self.impl, url_status, time.time() - start)
+
+        if self.display_config is not None:
+            logger.info("================================ 第 %d 轮：生成报告 ================================" % self.cycles)
+            end_time = datetime.datetime.today()
+            start_time = end_time - parse_duration(self.display_config.get("duration", "1d"))
+            type = set(self.display_config.get("types") or TYPES)
+            # 报告生成是同步代码（热点总结内部会启动自己的事件循环），放到线程中执行
+            await asyncio.to_thread(run_display, start_time, end_time, type, self.display_config.get("mode"),
+                                    self.display_config.get("output", "html"),
+                                    self.display_config.get("incremental", False))
+        metrics.inc("orchestrator_cycles_total")
+        metrics.set("orchestrator_cycle_seconds", time.time() - start)
+        logger.info("指标快照：%s %s" % metrics.write_snapshot("orchestrator"))
+
+    async def run(self):
+        self.stopping = asyncio.Event()
+        self._install_signal_handlers()
+        serve_metrics(self.config)
+        try:
+            async with self.impl.create_browser_pool() as browser_pool:
+                while not self.stopping.is_set():
+                    started = datetime.datetime.now()
+                    self.cycle_task = asyncio.create_task(self.run_cycle(browser_pool))
+                    try:
+                        await self.cycle_task
+                    except asyncio.CancelledError:
+                        if not self.stopping.is_set():
+                            raise
+                        logger.info("第 %d 轮已取消" % self.cycles)
+                        break
+                    except Exception as e:
+                        # 常驻运行时单轮失败不退出，等待下一轮
+                        logger.exception("第 %d 轮运行失败：%s" % (self.cycles, e))
+                        if not self.schedule:
+                            raise
+                    if not self.schedule:
+                        break
+
+                    next_time = self.schedule.next_time(started)
+                    wait = max(0.0, (next_time - datetime.datetime.now()).total_seconds())
+                    logger.info("下一轮开始时间：%s（%.0f 秒后）" % (next_time.strftime("%Y-%m-%d %H:%M:%S"), wait))
+                    try:
+                        await asyncio.wait_for(self.stopping.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.impl.close()
+            metrics.shutdown()
+            logger.info("================================ 共运行 %d 轮，程序退出 ================================" % self.cycles)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='开眼看世界：在同一进程中收集数据并生成报告')
+    parser.add_argument('--config', '-c', default='configs/collection.json', help='配置文件路径')
+    parser.add_argument('--daemon', action='store_true', help='常驻运行，按schedule配置或--interval/--cron重复执行')
+    parser.add_argument('--interval', type=float, help='常驻运行的间隔分钟数')
+    parser.add_argument('--cron', help='常驻运行的cron表达式（分 时 日 月 星期），如"0 */2 * * *"')
+    parser.add_argument('--no-display', action='store_true', help='只收集，不生成报告')
+    return parser.parse_args()
 
-# 注册信号处理器
-signal.signal(signal.SIGINT, signal_handler)
 
-print("收集中...")
-collection_command = """python src/collection/main.py -c configs/collection.json"""
-print(f"启动指令：{collection_command}")
+def main():
+    print(BANNER)
+    args = parse_args()
+    with open(args.config, encoding='utf-8') as f:
+        config = json.load(f)
 
-# 使用subprocess替代os.system以便更好地控制子进程
-process = subprocess.Popen(collection_command, shell=True)
-process.wait()
+    schedule = None
+    if args.daemon:
+        # 命令行指定了--interval或--cron时整体覆盖配置文件中的schedule
+        if args.interval or args.cron:
+            schedule = create_schedule(args.interval, args.cron)
+        else:
+            schedule_config = config.get("schedule") or {}
+            schedule = create_schedule(schedule_config.get("interval_minutes"), schedule_config.get("cron"))
+        if schedule is None:
+            print("常驻运行需要指定--interval、--cron或配置文件中的schedule")
+            sys.exit(1)
+        print(f"常驻运行：{schedule}")
 
-print("收集完成")
+    display_config = None if args.no_display else dict(config.get("display") or {"duration": "1d", "mode": "ai"})
+    orchestrator = Orchestrator(args.config, schedule, display_config)
+    print(f"配置文件：{args.config}")
+    asyncio.run(orchestrator.run())
+    print("运行结束。")
 
-display_command = """python src\display\main.py -d 1d -m ai -c configs\collection.json"""
-print(f"启动指令：{display_command}")
-process = subprocess.Popen(display_command, shell=True)
-process.wait()
 
-print("展示完成")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
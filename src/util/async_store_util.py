@@ -0,0 +1,212 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from util.logger import get_logger
+from util.metrics import metrics
+from util.store_util import (Base, Fingerprint, Duplicate, fingerprint_rows, duplicate_rows, URL_QUERY_CHUNK_SIZE,
+                             RECORD_STREAM_CHUNK_SIZE, url_hash, record_rows, insert_ignore_stmt, select_records,
+                             select_exist_hashes, log_saved_records, build_connection_string, apply_sqlite_pragmas)
+
+logger = get_logger("store.log")
+
+
+class AsyncStoreUtil:
+    """
+    StoreUtil的异步版本，供运行在asyncio上的收集流水线直接await数据库操作
+
+    提供与StoreUtil相同语义的批量URL判断、批量保存和按时间段查询，表结构迁移仍由StoreUtil负责。
+    """
+
+    def __init__(self, config=None, url_filter=None):
+        """
+        Args:
+            config (dict): 数据库配置信息，与StoreUtil相同，MySQL时async_driver指定异步驱动（默认aiomysql），
+                SQLite时使用aiosqlite
+            url_filter (BloomFilter): 与同步StoreUtil共用的URL过滤器
+        """
+        self.engine = None
+        self.Session = None
+        self.config = config or {}
+        self.url_filter = url_filter
+        self.url_filter_skipped = 0
+
+    async def init(self):
+        """
+        初始化数据库连接，需要在使用它的事件循环中调用，已初始化时直接返回
+        """
+        if self.engine:
+            return
+        try:
+            connection_string = build_connection_string(self.config, async_mode=True)
+            self.engine = create_async_engine(
+                connection_string,
+                echo=False,
+                poolclass=AsyncAdaptedQueuePool,
+                pool_size=self.config.get('pool_size', 5),
+                max_overflow=self.config.get('max_overflow', 10),
+                pool_timeout=self.config.get('pool_timeout', 30),
+                pool_recycle=self.config.get('pool_recycle', 3600),
+                pool_pre_ping=self.config.get('pool_pre_ping', True))
+            apply_sqlite_pragmas(self.engine.sync_engine, self.config)
+            self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            logger.info("异步数据库连接初始化成功")
+        except Exception as e:
+            logger.error(f"异步数据库连接初始化失败: {str(e)}")
+            self.engine = None
+            self.Session = None
+
+    async def close(self):
+        if self.engine:
+            await self.engine.dispose()
+            self.engine = None
+            self.Session = None
+
+    async def get_exist_urls(self, urls) -> set:
+        """
+        批量判断URL是否已存在，语义同StoreUtil.get_exist_urls
+        """
+        urls_by_hash = {}
+        for url in urls:
+            if url:
+                urls_by_hash.setdefault(url_hash(url), []).append(url)
+        hashes = list(urls_by_hash)
+        if self.url_filter:
+            hashes = [h for h in hashes if h in self.url_filter]
+            self.url_filter_skipped += len(urls_by_hash) - len(hashes)
+        exist_urls = set()
+        if not hashes:
+            return exist_urls
+
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return exist_urls
+
+        try:
+            with metrics.timer("db_query_seconds", op="get_exist_urls"):
+                async with self.Session() as session:
+                    for i in range(0, len(hashes), URL_QUERY_CHUNK_SIZE):
+                        chunk = hashes[i:i + URL_QUERY_CHUNK_SIZE]
+                        for row in await session.execute(select_exist_hashes(chunk)):
+                            exist_urls.update(urls_by_hash[row[0]])
+        except Exception as e:
+            logger.error(f"批量判断记录是否存在失败: {str(e)}")
+        return exist_urls
+
+    async def save_records(self, records: list):
+        """
+        批量保存记录，语义同StoreUtil.save_records
+
+        Returns:
+            dict: 包含成功(success)、跳过(skipped)和失败(failed)数量的统计信息
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return {"success": 0, "skipped": 0, "failed": len(records)}
+
+        rows = record_rows(records)
+        if not rows:
+            logger.info("没有需要保存的新记录")
+            return {"success": 0, "skipped": 0, "failed": len(records)}
+
+        try:
+            with metrics.timer("db_write_seconds", op="save_records"):
+                async with self.Session() as session:
+                    async with session.begin():
+                        result = await session.execute(insert_ignore_stmt(rows))
+            if self.url_filter:
+                for row in rows:
+                    self.url_filter.add(row["url_hash"])
+            success_count = result.rowcount
+            skipped_count = len(rows) - success_count
+            failed_count = len(records) - len(rows)
+            metrics.inc("records_stored_total", success_count)
+            metrics.inc("records_skipped_total", skipped_count)
+            log_saved_records(records, success_count, skipped_count, failed_count)
+            return {"success": success_count, "skipped": skipped_count, "failed": failed_count}
+        except Exception as e:
+            logger.error(f"批量保存记录失败: {str(e)}")
+            return {"success": 0, "skipped": 0, "failed": len(records)}
+
+    async def save_fingerprints(self, fingerprints: list) -> bool:
+        """
+        保存文章指纹，语义同StoreUtil.save_fingerprints
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return False
+        if not fingerprints:
+            return True
+
+        try:
+            async with self.Session() as session:
+                async with session.begin():
+                    await session.execute(insert_ignore_stmt(fingerprint_rows(fingerprints), Fingerprint.__table__))
+            return True
+        except Exception as e:
+            logger.error(f"保存文章指纹失败: {str(e)}")
+            return False
+
+    async def save_duplicates(self, duplicates: list) -> bool:
+        """
+        保存近似重复的文章，语义同StoreUtil.save_duplicates
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return False
+        if not duplicates:
+            return True
+
+        rows = duplicate_rows(duplicates)
+        try:
+            with metrics.timer("db_write_seconds", op="save_duplicates"):
+                async with self.Session() as session:
+                    async with session.begin():
+                        await session.execute(insert_ignore_stmt(rows, Duplicate.__table__))
+            if self.url_filter:
+                for row in rows:
+                    self.url_filter.add(row["url_hash"])
+            return True
+        except Exception as e:
+            logger.error(f"保存近似重复文章失败: {str(e)}")
+            return False
+
+    async def get_records(self, start_time, end_time, type=None, columns=None, min_id=None):
+        """
+        获取指定时间段内的新闻记录，参数同StoreUtil.get_records
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return []
+
+        try:
+            async with self.Session() as session:
+                result = await session.execute(select_records(start_time, end_time, type, columns, min_id=min_id))
+                return result.all() if columns else result.scalars().all()
+        except Exception as e:
+            logger.error(f"获取记录失败: {str(e)}")
+            return []
+
+    async def iter_records(self, start_time, end_time, type=None, columns=None, order_by=None,
+                           chunk_size=RECORD_STREAM_CHUNK_SIZE, min_id=None):
+        """
+        流式获取指定时间段内的新闻记录，参数同StoreUtil.iter_records
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return
+
+        try:
+            async with self.Session() as session:
+                stmt = select_records(start_time, end_time, type, columns, order_by, min_id)
+                result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+                async for record in (result if columns else result.scalars()):
+                    yield record
+        except Exception as e:
+            logger.error(f"流式获取记录失败: {str(e)}")
@@ -0,0 +1,110 @@
+import json
+import math
+import os
+import struct
+
+_SNAPSHOT_MAGIC = b"OEBF1"
+
+
+class BloomFilter:
+    """
+    布隆过滤器，用于判断URL是否可能已存储
+
+    只会误判"可能存在"，不会误判"不存在"；位数组大小由容量和误判率在创建时确定，
+    写入超过容量后误判率上升但内存占用不变。
+    """
+
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        """
+        Args:
+            capacity (int): 预期元素数量
+            error_rate (float): 达到预期元素数量时的误判率
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        # 已经加载到过滤器中的最大record.id和duplicate.id
+        self.watermark = 0
+        self.duplicate_watermark = 0
+
+    def __repr__(self) -> str:
+        return f"<BloomFilter: capacity={self.capacity}, error_rate={self.error_rate}, count={self.count}, size={len(self.bits)}B>"
+
+    def _positions(self, key: str):
+        # key是sha256十六进制摘要，直接取两段作为双重哈希的基
+        h1 = int(key[:16], 16)
+        h2 = int(key[16:32], 16) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, file_path):
+        """
+        保存快照，先写临时文件再替换，避免中断时留下不完整的快照
+        """
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        meta = json.dumps({
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "watermark": self.watermark,
+            "duplicate_watermark": self.duplicate_watermark,
+        }).encode("utf-8")
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_SNAPSHOT_MAGIC)
+            f.write(struct.pack(">I", len(meta)))
+            f.write(meta)
+            f.write(self.bits)
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path, capacity=None, error_rate=None):
+        """
+        读取快照
+
+        Args:
+            file_path (str): 快照文件路径
+            capacity (int): 期望的容量，与快照不一致时返回None
+            error_rate (float): 期望的误判率，与快照不一致时返回None
+
+        Returns:
+            BloomFilter: 快照不存在、已损坏或参数不一致时返回None
+        """
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "rb") as f:
+            if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                return None
+            meta_len = struct.unpack(">I", f.read(4))[0]
+            meta = json.loads(f.read(meta_len).decode("utf-8"))
+            bits = f.read()
+        if capacity is not None and meta["capacity"] != capacity:
+            return None
+        if error_rate is not None and meta["error_rate"] != error_rate:
+            return None
+        bloom = cls(meta["capacity"], meta["error_rate"])
+        if len(bits) != len(bloom.bits):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = meta["count"]
+        bloom.watermark = meta["watermark"]
+        bloom.duplicate_watermark = meta.get("duplicate_watermark", 0)
+        return bloom
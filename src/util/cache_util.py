@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import threading
+import time
+
+# 超限淘汰时删到max_size的这个比例，留出余量，避免缓存写满后每次写入都触发淘汰
+_EVICT_TARGET = 0.9
+
+
+class DiskCache:
+    """
+    基于SQLite文件的键值缓存
+
+    按写入时间淘汰超过max_age的条目，总大小超过max_size时按最近访问时间淘汰最旧的条目。
+    总大小在内存中随写入累加，只有超限时才扫描表淘汰，写入的开销与缓存条目数无关。
+    可以在多个线程中共享使用。
+    """
+
+    def __init__(self, path, max_size=512 * 1024 * 1024, max_age=7 * 24 * 3600):
+        """
+        Args:
+            path (str): 缓存文件路径
+            max_size (int): 缓存值的最大总字节数
+            max_age (int): 条目的最长保存秒数
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        # 缓存值的总字节数，打开时和每次淘汰时从表中重新统计
+        self.size = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed)")
+        self._conn.commit()
+        self.evict()
+
+    def __repr__(self) -> str:
+        return f"<DiskCache: path={self.path}, size={self.size}, hits={self.hits}, misses={self.misses}>"
+
+    def get(self, key):
+        """
+        读取缓存，过期条目视为未命中
+
+        Returns:
+            str: 缓存值，未命中时返回None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now))
+            self._conn.commit()
+            self.size += size - (row[0] if row else 0)
+            over_limit = self.size > self.max_size
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """
+        删除过期条目，并在总大小超限时删除最久未访问的条目
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE created < ?", (time.time() - self.max_age,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total > self.max_size:
+                target = self.max_size * _EVICT_TARGET
+                keys = []
+                for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed"):
+                    if total <= target:
+                        break
+                    keys.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM cache WHERE key = ?", keys)
+            self._conn.commit()
+            self.size = total
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,56 +1,10 @@
+import io
 import os
 import datetime
 from collections import defaultdict
 
-
-def generate_html_report(records, filename=None, summary: list=None):
-    """
-    对record的数组，根据time排序，按type分类，用表格展示所有字段，组建html，存储到logs/{today}目录
-    content字段支持展开和收缩
-    
-    Args:
-        records (list): Record对象列表
-        filename (str): 保存的文件名，默认为report_{timestamp}.html
-        summary (list): 摘要信息，在标题下方展示
-    """
-    # 按时间排序
-    sorted_records = sorted(records, key=lambda x: x.time if x.time else datetime.datetime.min)
-    
-    # 按类型分类
-    records_by_type = defaultdict(list)
-    for record in sorted_records:
-        records_by_type[record.type].append(record)
-    
-    # 生成HTML内容
-    html_content = _build_html(records_by_type, summary)
-    
-    # 创建logs目录（如果不存在）
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    logs_dir = os.path.join("logs", today)
-    os.makedirs(logs_dir, exist_ok=True)
-    
-    # 保存文件
-    if not filename:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"report_{timestamp}.html"
-    
-    file_path = os.path.join(logs_dir, filename)
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
-    
-    return file_path
-
-
-def _build_html(records_by_type, summary=None):
-    """
-    构建HTML内容
-    
-    Args:
-        records_by_type (dict): 按类型分类的记录字典
-        summary (list): 摘要信息数组
-    """
-    html = """
+# 报告的页头（样式和标题）与页尾（展开/收起脚本）
+_HTML_HEAD = """
 <!DOCTYPE html>
 <html lang="zh-CN">
 <head>
@@ -171,33 +125,27 @@ def _build_html(records_by_type, summary=None):
     <div class="container">
         <h1>记录报告</h1>
         """
-    
-    # 添加摘要信息
-    if summary:
-        html += '<div class="summary">'
-        # 逐行输出summary数组，左对齐并带序号
-        for i, line in enumerate(summary, 1):
-            # 使用：分割字符串，第一部分加粗显示
-            if '：' in line:
-                parts = line.split('：', 1)
-                key = parts[0]
-                value = parts[1] if len(parts) > 1 else ""
-                html += f'<div class="summary-item"><span class="summary-index">{i}.</span><span class="summary-key">{key}：</span>{value}</div>'
-            else:
-                html += f'<div class="summary-item"><span class="summary-index">{i}.</span>{line}</div>'
-        html += '</div>'
-    
-    # 为每个类型生成表格
-    for record_type, records in records_by_type.items():
-        html += f"""
-        <div class="type-section">
-            <div class="type-header">{record_type or '未分类'}</div>
-        """
-        
-        if not records:
-            html += '<div class="no-records">该分类下暂无记录</div>'
-        else:
-            html += """
+
+_HTML_TAIL = """
+        <script>
+            function toggleContent(id) {
+                var fullContent = document.getElementById(id);
+                var toggleBtn = fullContent.previousElementSibling;
+                
+                if (fullContent.style.display === "none" || fullContent.style.display === "") {
+                    fullContent.style.display = "block";
+                    toggleBtn.textContent = "[收起]";
+                } else {
+                    fullContent.style.display = "none";
+                    toggleBtn.textContent = "[展开]";
+                }
+            }
+        </script>
+    </body>
+</html>
+    """
+
+_TABLE_HEAD = """
             <table>
                 <thead>
                     <tr>
@@ -211,17 +159,100 @@ def _build_html(records_by_type, summary=None):
                 </thead>
                 <tbody>
             """
-            
-            for record in records:
-                # 处理内容的显示，截取前20个字符作为简要内容
-                content = record.content or ""
-                short_content = content[:20] + "..." if len(content) > 20 else content
-                full_content = content if len(content) > 20 else ""
-                
-                # 处理URL
-                url_link = f'<a href="{record.url}" class="url-link" target="_blank">查看</a>' if record.url else "无"
-                
-                html += f"""
+
+# 缓冲多少行后写入一次文件
+FLUSH_ROWS = 200
+
+
+def generate_html_report(records, filename=None, summary: list=None):
+    """
+    对record的数组，根据time排序，按type分类，用表格展示所有字段，组建html，存储到logs/{today}目录
+    content字段支持展开和收缩
+    
+    Args:
+        records (list|iterable): Record对象列表，会先排序分类；也可以是已按(type, time)排序的生成器
+            （如StoreUtil.iter_records），此时边读取边写入文件，不在内存中保留全部记录
+        filename (str): 保存的文件名，默认为report_{timestamp}.html
+        summary (list): 摘要信息，在标题下方展示
+    """
+    # 创建logs目录（如果不存在）
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    logs_dir = os.path.join("logs", today)
+    os.makedirs(logs_dir, exist_ok=True)
+    
+    # 保存文件
+    if not filename:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"report_{timestamp}.html"
+    
+    file_path = os.path.join(logs_dir, filename)
+    
+    with open(file_path, "w", encoding="utf-8") as f:
+        with HtmlReportWriter(f, summary) as writer:
+            if isinstance(records, (list, tuple)):
+                _write_by_type(writer, _group_by_type(records))
+            else:
+                writer.write_records(records)
+    
+    return file_path
+
+
+def _group_by_type(records):
+    """
+    按时间排序后按类型分类
+    """
+    sorted_records = sorted(records, key=lambda x: x.time if x.time else datetime.datetime.min)
+    records_by_type = defaultdict(list)
+    for record in sorted_records:
+        records_by_type[record.type].append(record)
+    return records_by_type
+
+
+def _write_by_type(writer, records_by_type):
+    for record_type, records in records_by_type.items():
+        writer.open_section(record_type)
+        writer.write_records(records)
+        writer.close_section()
+
+
+def _build_html(records_by_type, summary=None):
+    """
+    构建HTML内容
+    
+    Args:
+        records_by_type (dict): 按类型分类的记录字典
+        summary (list): 摘要信息数组
+    """
+    sink = io.StringIO()
+    with HtmlReportWriter(sink, summary) as writer:
+        _write_by_type(writer, records_by_type)
+    return sink.getvalue()
+
+
+def _render_summary(summary):
+    parts = ['<div class="summary">']
+    # 逐行输出summary数组，左对齐并带序号
+    for i, line in enumerate(summary, 1):
+        # 使用：分割字符串，第一部分加粗显示
+        if '：' in line:
+            key, value = line.split('：', 1)
+            parts.append(f'<div class="summary-item"><span class="summary-index">{i}.</span><span class="summary-key">{key}：</span>{value}</div>')
+        else:
+            parts.append(f'<div class="summary-item"><span class="summary-index">{i}.</span>{line}</div>')
+    parts.append('</div>')
+    return "".join(parts)
+
+
+def _render_record(record):
+    # 处理内容的显示，截取前20个字符作为简要内容
+    content = record.content or ""
+    short_content = content[:20] + "..." if len(content) > 20 else content
+    full_content = content if len(content) > 20 else ""
+    
+    # 处理URL
+    url_link = f'<a href="{record.url}" class="url-link" target="_blank">查看</a>' if record.url else "无"
+    
+    row = f"""
                     <tr>
                         <td>{record.time.strftime('%Y-%m-%d') if record.time else 'N/A'}</td>
                         <td>{record.title or 'N/A'}</td>
@@ -230,49 +261,115 @@ def _build_html(records_by_type, summary=None):
                             <div class="content-wrapper">
                                 <span class="short-content">{short_content}</span>
                 """
-                
-                if full_content:
-                    # 生成唯一的ID用于展开/收缩
-                    record_id = f"record_{record.id}"
-                    html += f"""
+    
+    if full_content:
+        # 生成唯一的ID用于展开/收缩
+        record_id = f"record_{record.id}"
+        row += f"""
                                 <span class="toggle-btn" onclick="toggleContent('{record_id}')">[展开]</span>
                                 <div id="{record_id}" class="full-content">{full_content}</div>
                     """
-                
-                html += f"""
+    
+    row += f"""
                             </div>
                         </td>
                         <td>{record.tags or 'N/A'}</td>
                         <td>{url_link}</td>
                     </tr>
                 """
-            
-            html += """
+    return row
+
+
+class HtmlReportWriter:
+    """
+    流式写入HTML报告
+
+    记录需要按(type, time)顺序传入，类型变化时自动结束上一个分类的表格并开始新的表格，
+    每缓冲flush_rows行写入一次文件，内存占用与记录总数无关。
+    """
+
+    def __init__(self, file, summary=None, flush_rows=FLUSH_ROWS):
+        """
+        Args:
+            file: 可写入文本的文件对象
+            summary (list): 摘要信息，在标题下方展示
+            flush_rows (int): 缓冲多少行后写入一次文件
+        """
+        self.file = file
+        self.summary = summary
+        self.flush_rows = flush_rows
+        self.buffer = []
+        self.section_open = False
+        self.section_type = None
+        self.section_rows = 0
+        # 已写入的记录总数
+        self.count = 0
+
+    def __repr__(self) -> str:
+        return f"<HtmlReportWriter: count={self.count}, section={self.section_type}>"
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end()
+
+    def begin(self):
+        self.buffer.append(_HTML_HEAD)
+        # 添加摘要信息
+        if self.summary:
+            self.buffer.append(_render_summary(self.summary))
+        self.flush()
+
+    def open_section(self, record_type):
+        if self.section_open:
+            self.close_section()
+        self.buffer.append(f"""
+        <div class="type-section">
+            <div class="type-header">{record_type or '未分类'}</div>
+        """)
+        self.section_open = True
+        self.section_type = record_type
+        self.section_rows = 0
+
+    def close_section(self):
+        if not self.section_open:
+            return
+        if self.section_rows:
+            self.buffer.append("""
                 </tbody>
             </table>
-            """
-        
-        html += """
+            """)
+        else:
+            self.buffer.append('<div class="no-records">该分类下暂无记录</div>')
+        self.buffer.append("""
         </div>
-        """
-    
-    html += """
-        <script>
-            function toggleContent(id) {
-                var fullContent = document.getElementById(id);
-                var toggleBtn = fullContent.previousElementSibling;
-                
-                if (fullContent.style.display === "none" || fullContent.style.display === "") {
-                    fullContent.style.display = "block";
-                    toggleBtn.textContent = "[收起]";
-                } else {
-                    fullContent.style.display = "none";
-                    toggleBtn.textContent = "[展开]";
-                }
-            }
-        </script>
-    </body>
-</html>
-    """
-    
-    return html
\ No newline at end of file
+        """)
+        self.section_open = False
+        self.flush()
+
+    def write_record(self, record):
+        if not self.section_open or record.type != self.section_type:
+            self.open_section(record.type)
+        if not self.section_rows:
+            self.buffer.append(_TABLE_HEAD)
+        self.buffer.append(_render_record(record))
+        self.section_rows += 1
+        self.count += 1
+        if len(self.buffer) >= self.flush_rows:
+            self.flush()
+
+    def write_records(self, records):
+        for record in records:
+            self.write_record(record)
+
+    def flush(self):
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer = []
+
+    def end(self):
+        self.close_section()
+        self.buffer.append(_HTML_TAIL)
+        self.flush()
@@ -1,51 +1,187 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # 存储已创建的logger实例
 _loggers = {}
+# 单个日志文件的大小上限和保留的历史文件数量
+LOG_MAX_BYTES = 50 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# INFO级别下长文本（抽取结果、配置内容等）保留的字符数，完整内容只在DEBUG级别输出
+LOG_PAYLOAD_CHARS = 500
+# logger的日志级别，configure_logging修改
+_level = logging.INFO
+
+
+class _FileRouter(logging.Handler):
+    """
+    后台线程中按logger名称把日志分发到各自的文件
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.handlers = {}
+
+    def handle(self, record):
+        handler = self.handlers.get(record.name)
+        if handler:
+            handler.handle(record)
+
+    def emit(self, record):
+        self.handle(record)
+
+    def close(self):
+        for handler in self.handlers.values():
+            handler.close()
+        super().close()
+
+
+class _DailyRotatingFileHandler(RotatingFileHandler):
+    """
+    按大小轮转的文件处理器，日期变化时切换到新一天的日志目录logs/{day}
+
+    常驻运行时进程跨越多天，每条日志按产生的日期写入对应目录，与按天分目录的布局保持一致。
+    """
+
+    def __init__(self, filename, **kwargs):
+        self.filename = filename
+        self.day = datetime.now().strftime('%Y-%m-%d')
+        super().__init__(os.path.join(get_log_dir(self.day), filename), **kwargs)
+
+    def emit(self, record):
+        day = datetime.fromtimestamp(record.created).strftime('%Y-%m-%d')
+        if day != self.day:
+            self.day = day
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(os.path.join(get_log_dir(day), self.filename))
+        super().emit(record)
+
+
+# 所有logger共用一个队列，写文件在后台线程中完成，调用方只需把日志放入队列
+_queue = queue.SimpleQueue()
+_router = _FileRouter()
+_listener = None
+_lock = threading.Lock()
+
+
+def _start_listener():
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = QueueListener(_queue, _router)
+            _listener.start()
+
+
+def stop_logging():
+    """
+    写完队列中剩余的日志并停止后台线程，进程退出时自动调用
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+    for handler in _router.handlers.values():
+        handler.flush()
+
+
+atexit.register(stop_logging)
+
+
+def get_log_dir(day=None):
+    """
+    获取日志目录logs/{day}，不存在时创建
+
+    Args:
+        day (str): 日期，格式为%Y-%m-%d，默认为当天
+
+    Returns:
+        str: 日志目录路径
+    """
+    day = day or datetime.now().strftime('%Y-%m-%d')
+    log_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'logs', day))
+    os.makedirs(log_dir, exist_ok=True)
+    return log_dir
+
 
 def get_logger(filename='app.log'):
     """
     获取logger实例
-    
+
+    日志先放入队列，由后台线程写入按大小轮转的文件，不阻塞抓取和事件循环；
+    日期变化后写入新一天的目录。
+
     Args:
         filename (str): 日志文件名，默认为'app.log'
-        
+
     Returns:
         logging.Logger: 配置好的logger实例
     """
     if filename in _loggers:
         return _loggers[filename]
-    
+
     # 创建logger实例
     logger_name = f'OpenEyes_{filename}' if filename != 'app.log' else 'OpenEyes'
     logger = logging.getLogger(logger_name)
-    logger.setLevel(logging.INFO)
-    
+    logger.setLevel(_level)
+
     # 避免重复添加处理器
     if not logger.handlers:
-        # 创建带日期的目录结构
-        today = datetime.now().strftime('%Y-%m-%d')
-        log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs', today)
-        os.makedirs(log_dir, exist_ok=True)
-        
-        # 创建文件处理器
-        log_file_path = os.path.join(log_dir, filename)
-        # if os.path.exists(log_file_path):
-        #     os.remove(log_file_path)
-        file_handler = logging.FileHandler(log_file_path, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        
+        # 创建文件处理器，写入带日期的目录，超过大小上限时轮转
+        file_handler = _DailyRotatingFileHandler(filename, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                                 encoding='utf-8')
+
         # 创建格式化器并添加到处理器
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
-        
-        # 将处理器添加到logger
-        logger.addHandler(file_handler)
-    
+
+        # 文件处理器由后台线程调用，logger只添加队列处理器
+        _router.handlers[logger_name] = file_handler
+        logger.addHandler(QueueHandler(_queue))
+        _start_listener()
+
     _loggers[filename] = logger
     return logger
 
+
+def configure_logging(config=None):
+    """
+    按配置文件的logging块调整日志级别和轮转参数，对已创建和之后创建的logger都生效
+
+    Args:
+        config (dict): {"level": "INFO", "max_mb": 50, "backup_count": 5}
+    """
+    global LOG_MAX_BYTES, LOG_BACKUP_COUNT, _level
+    config = config or {}
+    level = logging.getLevelName(str(config.get("level", "INFO")).upper())
+    _level = level if isinstance(level, int) else logging.INFO
+    LOG_MAX_BYTES = int(config.get("max_mb", LOG_MAX_BYTES / 1024 / 1024) * 1024 * 1024)
+    LOG_BACKUP_COUNT = config.get("backup_count", LOG_BACKUP_COUNT)
+    for logger in _loggers.values():
+        logger.setLevel(_level)
+    for handler in _router.handlers.values():
+        handler.maxBytes = LOG_MAX_BYTES
+        handler.backupCount = LOG_BACKUP_COUNT
+
+
+def abbreviate(text, limit=LOG_PAYLOAD_CHARS):
+    """
+    截断日志中的长文本，保留开头并注明总长度
+
+    Returns:
+        str: 不超过limit个字符时原样返回
+    """
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return "%s ...（共 %d 字符）" % (text[:limit], len(text))
+
+
 # 默认logger实例，保持向后兼容性
-logger = get_logger()
\ No newline at end of file
+logger = get_logger()
@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from util.logger import get_log_dir
+
+# 指标名前缀，输出Prometheus文本格式时使用
+METRIC_PREFIX = "openeyes_"
+# 耗时类直方图的默认分桶（秒）
+SECONDS_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# token数直方图的分桶
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class Histogram:
+    """
+    分桶直方图，同时记录次数、总和、最小值和最大值
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def __repr__(self) -> str:
+        return f"<Histogram: count={self.count}, sum={self.sum:.3f}, min={self.min}, max={self.max}>"
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.sum / self.count if self.count else None,
+            "buckets": dict(zip([str(b) for b in self.buckets], self.bucket_counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    进程内的指标收集：计数器（counter）、瞬时值（gauge）、直方图（histogram）和计时器（timer）
+
+    每个指标由名称和标签（如source）区分，可以在多个线程中使用。
+    运行结束时写出JSON和Prometheus文本格式的快照，长时间运行时也可以通过HTTP端点实时查看。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.helps = {}
+        self.started = time.time()
+        self._server = None
+
+    def __repr__(self) -> str:
+        return (f"<MetricsRegistry: counters={len(self.counters)}, gauges={len(self.gauges)}, "
+                f"histograms={len(self.histograms)}>")
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name, help):
+        """
+        设置指标说明，输出Prometheus格式时作为HELP
+        """
+        self.helps[name] = help
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(buckets)
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        记录代码块的耗时（秒）到直方图，异常退出时同样记录
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get(self, name, **labels):
+        """
+        Returns:
+            计数器或瞬时值的当前值，直方图返回Histogram，不存在时返回None
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            if key in self.counters:
+                return self.counters[key]
+            if key in self.gauges:
+                return self.gauges[key]
+            return self.histograms.get(key)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        def entry(key, value):
+            name, labels = key
+            return {"name": name, "labels": dict(labels), "value": value}
+
+        with self._lock:
+            return {
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "uptime": time.time() - self.started,
+                "counters": [entry(k, v) for k, v in sorted(self.counters.items())],
+                "gauges": [entry(k, v) for k, v in sorted(self.gauges.items())],
+                "histograms": [entry(k, v.to_dict()) for k, v in sorted(self.histograms.items())],
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Prometheus文本格式
+        """
+        def labels_text(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                                  for k, v in items) + "}"
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name in typed:
+                return
+            typed.add(name)
+            if name in self.helps:
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {self.helps[name]}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                header(name, "counter")
+                lines.append(f"{METRIC_PREFIX}{name}{labels_text(labels)} {value}")
+            for (name, labels), value in sorted(self.gauges.items()):
+                header(name, "gauge")
+                lines.append(f"{METRIC_PREFIX}{name}{labels_text(labels)} {value}")
+            for (name, labels), hist in sorted(self.histograms.items()):
+                header(name, "histogram")
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{labels_text(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{labels_text(labels, [('le', '+Inf')])} {hist.count}")
+                lines.append(f"{METRIC_PREFIX}{name}_sum{labels_text(labels)} {hist.sum}")
+                lines.append(f"{METRIC_PREFIX}{name}_count{labels_text(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, prefix):
+        """
+        将快照写入日志目录：{prefix}_metrics_{time}.json和.prom
+
+        Returns:
+            tuple: (json文件路径, prom文件路径)
+        """
+        base = os.path.join(get_log_dir(), f"{prefix}_metrics_{datetime.now().strftime('%H%M%S')}")
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        with open(base + ".prom", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return base + ".json", base + ".prom"
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        在后台线程中启动HTTP端点：/metrics返回Prometheus文本，/metrics.json返回JSON快照
+        """
+        if self._server:
+            return self._server
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.to_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.snapshot(), ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def shutdown(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# 进程内共用的指标实例
+metrics = MetricsRegistry()
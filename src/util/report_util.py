@@ -0,0 +1,482 @@
+import os
+import json
+import shutil
+import datetime
+
+# 分片文件是一行js：OpenEyesReport.load("<key>", <json>);
+# 通过<script>标签加载，直接双击打开（file://）时也能读取，不受fetch跨域限制
+_SHARD_PREFIX = 'OpenEyesReport.load('
+_SHARD_SUFFIX = ');\n'
+# 列表行中简要内容的长度，与单页报告一致
+SHORT_CONTENT_LEN = 20
+
+_SHELL_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>记录报告</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 0; padding: 0; background-color: #f5f5f5; }
+        .container { width: 100%; background-color: white; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        h1 { color: #333; text-align: center; padding: 20px 0; margin: 0; }
+        .generated { text-align: center; color: #666; font-size: 12px; margin-bottom: 10px; }
+        .summary { text-align: left; padding: 10px 20px; margin: 0 20px 20px 20px; background-color: #e9f7ef;
+                   border-left: 4px solid #4CAF50; font-size: 16px; line-height: 1.5; }
+        .summary-item { margin: 5px 0; }
+        .summary-index, .summary-key { font-weight: bold; }
+        .summary-index { margin-right: 10px; }
+        .type-section { border: 1px solid #ddd; border-radius: 5px; overflow: hidden; margin: 20px; }
+        .type-header { background-color: #4CAF50; color: white; padding: 15px; font-size: 1.2em; font-weight: bold; }
+        .row { display: grid; grid-template-columns: 100px 3fr 1fr 3fr 1fr 60px; height: 44px; box-sizing: border-box;
+               border-bottom: 1px solid #ddd; align-items: center; }
+        .row > div { padding: 0 12px; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+        .row-head { background-color: #f2f2f2; font-weight: bold; }
+        .viewport { overflow-y: auto; position: relative; }
+        .spacer { position: relative; }
+        .spacer .row { position: absolute; left: 0; right: 0; }
+        .spacer .row:hover, .row.active { background-color: #f5f5f5; }
+        .placeholder { color: #aaa; }
+        .toggle-btn { color: #1E90FF; cursor: pointer; font-weight: bold; margin-left: 10px; }
+        .toggle-btn:hover, .url-link:hover { text-decoration: underline; }
+        .url-link { color: #1E90FF; text-decoration: none; }
+        .full-content { display: none; margin: 10px; padding: 10px; background-color: #f9f9f9; border: 1px solid #ddd;
+                        border-radius: 4px; white-space: pre-wrap; line-height: 1.5; }
+        .full-content .detail-title { font-weight: bold; margin-bottom: 8px; }
+        .no-records { text-align: center; color: #666; font-style: italic; padding: 20px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>记录报告</h1>
+        <div id="app"></div>
+    </div>
+    <script>
+        var ROW_HEIGHT = 44;
+        var VISIBLE_ROWS = 15;
+        var OVERSCAN = 10;
+
+        // 分片加载：脚本加载完成后调用OpenEyesReport.load(key, data)
+        var OpenEyesReport = window.OpenEyesReport = {
+            data: {},
+            pending: {},
+            load: function (key, data) {
+                this.data[key] = data;
+                var callbacks = this.pending[key] || [];
+                delete this.pending[key];
+                callbacks.forEach(function (cb) { cb(data); });
+            },
+            fetch: function (key, path) {
+                var self = this;
+                if (key in self.data) {
+                    return Promise.resolve(self.data[key]);
+                }
+                return new Promise(function (resolve, reject) {
+                    var first = !self.pending[key];
+                    (self.pending[key] = self.pending[key] || []).push(resolve);
+                    if (first) {
+                        var script = document.createElement("script");
+                        script.src = path;
+                        script.onerror = function () { reject(new Error("加载失败：" + path)); };
+                        document.head.appendChild(script);
+                    }
+                });
+            }
+        };
+
+        function el(tag, className, text) {
+            var node = document.createElement(tag);
+            if (className) node.className = className;
+            if (text !== undefined && text !== null) node.textContent = text;
+            return node;
+        }
+
+        function renderSummary(app, summary) {
+            if (!summary || !summary.length) return;
+            var box = el("div", "summary");
+            summary.forEach(function (line, i) {
+                var item = el("div", "summary-item");
+                item.appendChild(el("span", "summary-index", (i + 1) + "."));
+                var pos = line.indexOf("：");
+                if (pos >= 0) {
+                    item.appendChild(el("span", "summary-key", line.slice(0, pos + 1)));
+                    item.appendChild(document.createTextNode(line.slice(pos + 1)));
+                } else {
+                    item.appendChild(document.createTextNode(line));
+                }
+                box.appendChild(item);
+            });
+            app.appendChild(box);
+        }
+
+        // 一个类型的记录列表，只渲染可见范围内的行，按需加载行分片
+        function Section(app, type) {
+            var self = this;
+            self.type = type;
+            self.offsets = [];
+            self.total = 0;
+            type.shards.forEach(function (shard) {
+                self.offsets.push(self.total);
+                self.total += shard.count;
+            });
+
+            var section = el("div", "type-section");
+            section.appendChild(el("div", "type-header", (type.name || "未分类") + "（" + self.total + "）"));
+            app.appendChild(section);
+            if (!self.total) {
+                section.appendChild(el("div", "no-records", "该分类下暂无记录"));
+                return;
+            }
+
+            var head = el("div", "row row-head");
+            ["时间", "标题", "来源", "内容", "标签", "链接"].forEach(function (name) {
+                head.appendChild(el("div", null, name));
+            });
+            section.appendChild(head);
+
+            self.viewport = el("div", "viewport");
+            self.viewport.style.height = Math.min(self.total, VISIBLE_ROWS) * ROW_HEIGHT + "px";
+            self.spacer = el("div", "spacer");
+            self.spacer.style.height = self.total * ROW_HEIGHT + "px";
+            self.viewport.appendChild(self.spacer);
+            section.appendChild(self.viewport);
+            self.detail = el("div", "full-content");
+            section.appendChild(self.detail);
+            self.detailId = null;
+
+            var scheduled = false;
+            self.viewport.addEventListener("scroll", function () {
+                if (scheduled) return;
+                scheduled = true;
+                window.requestAnimationFrame(function () {
+                    scheduled = false;
+                    self.render();
+                });
+            });
+            self.render();
+        }
+
+        Section.prototype.shardAt = function (index) {
+            var lo = 0, hi = this.offsets.length - 1;
+            while (lo < hi) {
+                var mid = (lo + hi + 1) >> 1;
+                if (this.offsets[mid] <= index) lo = mid; else hi = mid - 1;
+            }
+            return lo;
+        };
+
+        Section.prototype.render = function () {
+            var self = this;
+            var first = Math.max(0, Math.floor(self.viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+            var last = Math.min(self.total, first + VISIBLE_ROWS + 2 * OVERSCAN);
+            var fragment = document.createDocumentFragment();
+            var missing = {};
+            for (var i = first; i < last; i++) {
+                var s = self.shardAt(i);
+                var shard = self.type.shards[s];
+                var rows = OpenEyesReport.data["rows/" + shard.key];
+                if (!rows) {
+                    missing[s] = shard;
+                }
+                var row = self.renderRow(rows ? rows[i - self.offsets[s]] : null, shard);
+                row.style.top = i * ROW_HEIGHT + "px";
+                fragment.appendChild(row);
+            }
+            self.spacer.replaceChildren(fragment);
+            Object.keys(missing).forEach(function (s) {
+                var shard = missing[s];
+                OpenEyesReport.fetch("rows/" + shard.key, "data/rows/" + shard.key + ".js")
+                    .then(function () { self.render(); });
+            });
+        };
+
+        Section.prototype.renderRow = function (record, shard) {
+            var self = this;
+            var row = el("div", "row");
+            if (!record) {
+                row.appendChild(el("div", "placeholder", "加载中..."));
+                return row;
+            }
+            if (record.id === self.detailId) row.classList.add("active");
+            row.appendChild(el("div", null, record.time || "N/A"));
+            row.appendChild(el("div", null, record.title || "N/A"));
+            row.appendChild(el("div", null, record.source || "N/A"));
+            var content = el("div", null, record.short);
+            if (record.more) {
+                var btn = el("span", "toggle-btn", record.id === self.detailId ? "[收起]" : "[展开]");
+                btn.addEventListener("click", function () { self.toggle(record, shard); });
+                content.appendChild(btn);
+            }
+            row.appendChild(content);
+            row.appendChild(el("div", null, record.tags || "N/A"));
+            var link = el("div");
+            if (record.url) {
+                var a = el("a", "url-link", "查看");
+                a.href = record.url;
+                a.target = "_blank";
+                link.appendChild(a);
+            } else {
+                link.textContent = "无";
+            }
+            row.appendChild(link);
+            return row;
+        };
+
+        // 展开时才加载该行所在分片的全文
+        Section.prototype.toggle = function (record, shard) {
+            var self = this;
+            if (self.detailId === record.id) {
+                self.detailId = null;
+                self.detail.style.display = "none";
+                self.render();
+                return;
+            }
+            self.detailId = record.id;
+            self.render();
+            OpenEyesReport.fetch("content/" + shard.key, "data/content/" + shard.key + ".js").then(function (contents) {
+                if (self.detailId !== record.id) return;
+                self.detail.replaceChildren(el("div", "detail-title", record.title || ""),
+                                            document.createTextNode(contents[record.id] || ""));
+                self.detail.style.display = "block";
+            });
+        };
+
+        OpenEyesReport.fetch("manifest", "data/manifest.js").then(function (manifest) {
+            var app = document.getElementById("app");
+            app.appendChild(el("div", "generated", "生成时间：" + manifest.generated));
+            renderSummary(app, manifest.summary);
+            manifest.types.forEach(function (type) { new Section(app, type); });
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+def write_shard(path, key, data):
+    """
+    将数据写成js分片文件，先写临时文件再替换，避免浏览器读到写了一半的文件
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_SHARD_PREFIX)
+        f.write(json.dumps(key))
+        f.write(", ")
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        f.write(_SHARD_SUFFIX)
+    os.replace(tmp_path, path)
+
+
+def read_shard(path):
+    """
+    读取write_shard写入的分片，文件不存在时返回None
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    body = text[len(_SHARD_PREFIX):-len(_SHARD_SUFFIX)]
+    # 去掉开头的key
+    _, data = body.split(", ", 1)
+    return json.loads(data)
+
+
+def generate_paged_report(records, dirname="report", summary: list=None):
+    """
+    生成分页报告：一个很小的HTML页面加上按类型、按天拆分的数据分片，存储到logs/{today}/{dirname}目录
+
+    页面只渲染可见范围内的行，滚动到哪一天才加载那一天的行分片，展开某一行时才加载全文分片。
+
+    Args:
+        records (list|iterable): Record对象列表，或已按(type, time)排序的生成器
+        dirname (str): 报告目录名
+        summary (list): 摘要信息，在标题下方展示
+
+    Returns:
+        str: 报告页面index.html的路径
+    """
+    if isinstance(records, (list, tuple)):
+        records = sorted(records, key=lambda x: (x.type or "", x.time or datetime.datetime.min))
+
+    writer = open_paged_report(dirname, summary)
+    writer.write_records(records)
+    return writer.close()
+
+
+def open_paged_report(dirname="report", summary: list=None, incremental=False, query=None, start_time=None,
+                      end_time=None):
+    """
+    打开logs/{today}/{dirname}目录下的分页报告用于写入
+
+    增量模式下，如果上次生成时的查询条件query与本次相同，且本次的时间窗口没有向前扩大、结束时间没有提前，
+    则保留已有分片，调用方只需查询id大于writer.watermark的记录写入，新记录合并到对应类型、对应日期的分片中；
+    否则清空后全量生成（窗口向前扩大时，id不大于watermark的更早记录也需要写入）。
+
+    Args:
+        dirname (str): 报告目录名
+        summary (list): 摘要信息，为None时增量模式下保留上次的摘要
+        incremental (bool): 是否增量生成
+        query (dict): 查询条件，如{"types": [...]}，变化时需要全量生成
+        start_time (datetime): 时间窗口的开始时间
+        end_time (datetime): 时间窗口的结束时间
+
+    Returns:
+        PagedReportWriter
+    """
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    report_dir = os.path.join("logs", today, dirname)
+    start = start_time.strftime("%Y-%m-%d %H:%M:%S") if start_time else ""
+    end = end_time.strftime("%Y-%m-%d %H:%M:%S") if end_time else ""
+    manifest = None
+    if incremental:
+        manifest = read_shard(os.path.join(report_dir, "data", "manifest.js"))
+        if manifest and (manifest.get("query") != query or start < manifest.get("start", "")
+                         or end < manifest.get("end", "")):
+            manifest = None
+    if not manifest:
+        # 全量生成时清空上次的分片
+        shutil.rmtree(os.path.join(report_dir, "data"), ignore_errors=True)
+        manifest = {"types": [], "query": query}
+    manifest["start"] = start
+    manifest["end"] = end
+    return PagedReportWriter(report_dir, summary, manifest)
+
+
+class PagedReportWriter:
+    """
+    流式写入分页报告
+
+    记录按(type, time)顺序传入，同一类型同一天的记录组成一个分片：
+    data/rows/<key>.js保存列表需要的字段，data/content/<key>.js保存全文，
+    data/manifest.js记录每个类型有哪些分片以及每个分片的行数。
+    同一时刻内存中只保留当前分片，写入已存在的分片时追加到原有数据之后（跳过已有的记录）。
+    清单中的watermark记录已写入的最大记录id，增量生成时从这里继续。
+    """
+
+    def __init__(self, report_dir, summary=None, manifest=None):
+        """
+        Args:
+            report_dir (str): 报告目录
+            summary (list): 摘要信息
+            manifest (dict): 已有的清单，在此基础上追加记录
+        """
+        self.report_dir = report_dir
+        self.rows_dir = os.path.join(report_dir, "data", "rows")
+        self.content_dir = os.path.join(report_dir, "data", "content")
+        os.makedirs(self.rows_dir, exist_ok=True)
+        os.makedirs(self.content_dir, exist_ok=True)
+        self.manifest = manifest or {"types": []}
+        if summary is not None:
+            self.manifest["summary"] = summary
+        # 类型名 -> 清单中的类型项
+        self.types = {item["name"]: item for item in self.manifest["types"]}
+        self.shard = None
+        # 已写入的记录总数
+        self.count = 0
+
+    def __repr__(self) -> str:
+        return f"<PagedReportWriter: dir={self.report_dir}, types={len(self.types)}, count={self.count}, watermark={self.watermark}>"
+
+    @property
+    def watermark(self) -> int:
+        """
+        已写入报告的最大记录id，没有记录时为0
+        """
+        return self.manifest.get("watermark", 0)
+
+    def _type(self, name):
+        if name not in self.types:
+            item = {"name": name, "key": f"t{len(self.manifest['types'])}", "shards": []}
+            self.manifest["types"].append(item)
+            self.types[name] = item
+        return self.types[name]
+
+    def write_record(self, record):
+        type_item = self._type(record.type)
+        day = record.time.strftime("%Y%m%d") if record.time else "unknown"
+        key = f"{type_item['key']}_{day}"
+        if not self.shard or self.shard["key"] != key:
+            self._flush_shard()
+            self.shard = {"key": key, "day": day, "type": type_item, "rows": [], "contents": {}}
+
+        content = record.content or ""
+        self.shard["rows"].append({
+            "id": record.id,
+            "time": record.time.strftime('%Y-%m-%d') if record.time else None,
+            "title": record.title,
+            "source": record.source,
+            "tags": record.tags,
+            "url": record.url,
+            "short": content[:SHORT_CONTENT_LEN] + "..." if len(content) > SHORT_CONTENT_LEN else content,
+            "more": len(content) > SHORT_CONTENT_LEN,
+        })
+        if len(content) > SHORT_CONTENT_LEN:
+            self.shard["contents"][str(record.id)] = content
+        self.count += 1
+        if record.id and record.id > self.watermark:
+            self.manifest["watermark"] = record.id
+
+    def write_records(self, records):
+        for record in records:
+            self.write_record(record)
+
+    def _flush_shard(self):
+        shard = self.shard
+        self.shard = None
+        if not shard:
+            return
+        key = shard["key"]
+        rows_path = os.path.join(self.rows_dir, f"{key}.js")
+        content_path = os.path.join(self.content_dir, f"{key}.js")
+        shards = shard["type"]["shards"]
+        entry = next((item for item in shards if item["key"] == key), None)
+
+        rows, contents = shard["rows"], shard["contents"]
+        if entry:
+            old_rows = read_shard(rows_path) or []
+            ids = set(row["id"] for row in old_rows)
+            rows = old_rows + [row for row in rows if row["id"] not in ids]
+            contents = dict(read_shard(content_path) or {}, **contents)
+        else:
+            entry = {"key": key, "day": shard["day"], "count": 0}
+            shards.append(entry)
+            shards.sort(key=lambda item: item["day"])
+        entry["count"] = len(rows)
+
+        write_shard(rows_path, "rows/" + key, rows)
+        write_shard(content_path, "content/" + key, contents)
+
+    def prune(self, start_time):
+        """
+        删除start_time所在日期之前的分片，增量生成时统计窗口向后移动后调用
+
+        分片按天划分，start_time当天的分片中还有窗口内的记录，整片保留。
+        """
+        self._flush_shard()
+        first_day = start_time.strftime("%Y%m%d")
+        for type_item in self.manifest["types"]:
+            kept = []
+            for entry in type_item["shards"]:
+                if entry["day"] != "unknown" and entry["day"] < first_day:
+                    for directory in (self.rows_dir, self.content_dir):
+                        path = os.path.join(directory, f"{entry['key']}.js")
+                        if os.path.exists(path):
+                            os.remove(path)
+                else:
+                    kept.append(entry)
+            type_item["shards"] = kept
+
+    def close(self):
+        """
+        写入最后一个分片、清单和页面
+
+        Returns:
+            str: index.html的路径
+        """
+        self._flush_shard()
+        self.manifest["generated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        write_shard(os.path.join(self.report_dir, "data", "manifest.js"), "manifest", self.manifest)
+        index_path = os.path.join(self.report_dir, "index.html")
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(_SHELL_HTML)
+        return index_path
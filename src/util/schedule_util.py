@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+# cron各字段的取值范围：分、时、日、月、星期（0和7都表示星期日）
+_CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+# 查找下次运行时间时最多向后查找的天数，超过时认为表达式不会触发（如2月30日）
+_MAX_SEARCH_DAYS = 366 * 5
+
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"cron步长必须大于0：{text}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(x) for x in part.split("-", 1))
+        else:
+            start = int(part)
+            # 5/15 表示从5开始每15个单位
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron字段超出范围{low}-{high}：{text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    标准5段cron表达式：分 时 日 月 星期，支持*、列表(1,2)、范围(1-5)和步长(*/15)
+
+    日和星期都不是*时，两者满足其一即触发，与crontab一致。
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron表达式需要5个字段：{expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, _CRON_FIELDS))
+        # 统一为datetime.weekday()的取值：0为星期一
+        self.weekdays = set((day - 1) % 7 for day in weekdays)
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def __repr__(self) -> str:
+        return f"<CronSchedule: {self.expression}>"
+
+    def _day_matches(self, time):
+        day = time.day in self.days
+        weekday = time.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_time(self, after):
+        """
+        Returns:
+            datetime: after之后（不含）第一个满足表达式的整分钟
+        """
+        time = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = time + timedelta(days=_MAX_SEARCH_DAYS)
+        while time < limit:
+            if time.month not in self.months or not self._day_matches(time):
+                time = time.replace(hour=0, minute=0) + timedelta(days=1)
+            elif time.hour not in self.hours:
+                time = time.replace(minute=0) + timedelta(hours=1)
+            elif time.minute not in self.minutes:
+                time += timedelta(minutes=1)
+            else:
+                return time
+        raise ValueError(f"cron表达式不会触发：{self.expression}")
+
+
+class IntervalSchedule:
+    """
+    固定间隔：每轮开始后间隔一定时间再开始下一轮，上一轮超时时立即开始
+    """
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError(f"运行间隔必须大于0：{seconds}")
+        self.seconds = seconds
+
+    def __repr__(self) -> str:
+        return f"<IntervalSchedule: seconds={self.seconds}>"
+
+    def next_time(self, after):
+        return after + timedelta(seconds=self.seconds)
+
+
+def create_schedule(interval_minutes=None, cron=None):
+    """
+    Args:
+        interval_minutes (float): 运行间隔分钟数
+        cron (str): cron表达式，同时指定时优先使用
+
+    Returns:
+        CronSchedule或IntervalSchedule，均未指定时返回None
+    """
+    if cron:
+        return CronSchedule(cron)
+    if interval_minutes:
+        return IntervalSchedule(interval_minutes * 60)
+    return None
@@ -1,8 +1,18 @@
 import json
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+from util.bloom_filter import BloomFilter
 from util.logger import get_logger
+from util.metrics import metrics
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import create_engine, event, inspect, insert, update, select, union, bindparam, text, Column, Index, Integer, String, Text, DateTime
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -10,9 +20,78 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 logger = get_logger("store.log")
 
+# 批量查询URL时，每条IN语句包含的URL数量
+URL_QUERY_CHUNK_SIZE = 500
+# 旧表补全url_hash时，每批处理的记录数量
+URL_HASH_BACKFILL_BATCH = 1000
+# 从数据库预热URL过滤器时，每批读取的记录数量
+URL_FILTER_WARM_BATCH = 5000
+# 流式查询记录时，每批从数据库读取的记录数量
+RECORD_STREAM_CHUNK_SIZE = 500
+
 Base = declarative_base()
 
 
+def normalize_url(url: str) -> str:
+    """
+    规范化URL：去除首尾空白和锚点，scheme和域名转小写，去除路径末尾的/
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def url_hash(url: str) -> str:
+    """
+    规范化URL的sha256摘要，用作record表的唯一键
+    """
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+class PoolMetrics:
+    """
+    连接池统计：新建连接、借出、归还次数，当前和峰值借出数，以及因连接池耗尽而等待的次数和时长
+    """
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def __repr__(self) -> str:
+        return (f"<PoolMetrics: connects={self.connects}, checkouts={self.checkouts}, checkins={self.checkins}, "
+                f"checked_out={self.checked_out}, peak={self.peak_checked_out}, "
+                f"waits={self.waits}, wait_seconds={self.wait_seconds:.3f}>")
+
+
+class MeteredQueuePool(QueuePool):
+    """
+    记录等待次数的QueuePool：借出连接时若没有空闲连接且溢出连接已用完，计为一次等待
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        exhausted = self.checkedin() == 0 and self.overflow() >= self._max_overflow
+        start = time.perf_counter()
+        conn = super()._do_get()
+        if exhausted:
+            self.metrics.waits += 1
+            self.metrics.wait_seconds += time.perf_counter() - start
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
 class Record(Base):
     __tablename__ = 'record'
 
@@ -24,6 +103,12 @@ class Record(Base):
     tags = Column(String(255))
     type = Column(String(50))
     url = Column(String(255))
+    url_hash = Column(String(64))
+
+    __table_args__ = (
+        Index('uq_record_url_hash', 'url_hash', unique=True),
+        Index('idx_record_time_type', 'time', 'type'),
+    )
 
     def __repr__(self):
         return "<Record(id='%s', time='%s', title='%s', source='%s', content len='%d', tags='%s', type='%s', url='%s')>" % (
@@ -42,6 +127,190 @@ class Record(Base):
         }
 
 
+class Fingerprint(Base):
+    """
+    文章正文的SimHash指纹，用于发现不同来源转载的近似重复文章
+    """
+    __tablename__ = 'fingerprint'
+
+    url_hash = Column(String(64), primary_key=True)
+    # 64位指纹的16进制表示
+    simhash = Column(String(16))
+    time = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_fingerprint_time', 'time'),
+    )
+
+    def __repr__(self):
+        return "<Fingerprint(url_hash='%s', simhash='%s', time='%s')>" % (self.url_hash, self.simhash, self.time)
+
+
+class Duplicate(Base):
+    """
+    近似重复的文章：不单独保存记录，作为已有记录（canonical_hash）的另一个来源
+
+    url_hash与record表一起参与URL去重，之后的运行不会再抓取这篇文章。
+    """
+    __tablename__ = 'duplicate'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url_hash = Column(String(64))
+    url = Column(String(255))
+    source = Column(String(100))
+    # 被重复的已有记录的url_hash
+    canonical_hash = Column(String(64))
+    time = Column(DateTime)
+
+    __table_args__ = (
+        Index('uq_duplicate_url_hash', 'url_hash', unique=True),
+        Index('idx_duplicate_canonical_hash', 'canonical_hash'),
+    )
+
+    def __repr__(self):
+        return "<Duplicate(url='%s', source='%s', canonical_hash='%s', time='%s')>" % (
+            self.url, self.source, self.canonical_hash, self.time)
+
+
+def fingerprint_rows(fingerprints):
+    """
+    将(url_hash, simhash)列表转换为fingerprint表的插入行
+    """
+    now = datetime.now()
+    return [{"url_hash": key, "simhash": format(value, "016x"), "time": now} for key, value in fingerprints]
+
+
+def duplicate_rows(duplicates):
+    """
+    将(url, source, canonical_hash)列表转换为duplicate表的插入行
+    """
+    now = datetime.now()
+    return [{"url_hash": url_hash(url), "url": url, "source": source, "canonical_hash": canonical_hash, "time": now}
+            for url, source, canonical_hash in duplicates]
+
+
+# SQLite模式下默认的连接参数：WAL允许读写并发，NORMAL同步级别在WAL下不会损坏数据
+DEFAULT_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+
+def build_connection_string(config, async_mode=False):
+    """
+    根据storage配置生成数据库连接串
+
+    Args:
+        config (dict): storage配置，backend为mysql（默认）或sqlite
+        async_mode (bool): 是否使用异步驱动
+    """
+    if config.get('backend', 'mysql') == 'sqlite':
+        path = config.get('path', 'data/openeyes.db')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        driver = "sqlite+aiosqlite" if async_mode else "sqlite"
+        return f"{driver}:///{path}"
+
+    host = config.get('host', 'localhost')
+    port = config.get('port', 3306)
+    username = config.get('username', 'root')
+    password = config.get('password', '')
+    database = config.get('database', 'openeyes')
+    driver = config.get('async_driver', 'aiomysql') if async_mode else 'pymysql'
+    return f"mysql+{driver}://{username}:{password}@{host}:{port}/{database}?charset=utf8mb4"
+
+
+def apply_sqlite_pragmas(engine, config):
+    """
+    每个新建的SQLite连接执行PRAGMA，storage.pragmas可以覆盖默认值
+    """
+    if config.get('backend', 'mysql') != 'sqlite':
+        return
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    pragmas.update(config.get('pragmas') or {})
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def record_rows(records):
+    """
+    将Record对象转换为批量插入用的字典列表，跳过没有url的记录
+    """
+    return [{
+        "time": record.time,
+        "title": record.title,
+        "source": record.source,
+        "content": record.content,
+        "tags": record.tags,
+        "type": record.type,
+        "url": record.url,
+        "url_hash": url_hash(record.url),
+    } for record in records if record.url]
+
+
+def log_saved_records(records, success_count, skipped_count, failed_count):
+    """
+    记录批量保存的结果：INFO级别只输出数量，DEBUG级别附带完整记录
+    """
+    logger.info("批量保存记录：成功 %d 条，跳过 %d 条重复记录，失败 %d 条" % (
+        success_count, skipped_count, failed_count))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("批量保存的记录：\n %s" % json.dumps(
+            [v.to_dict() for v in records], ensure_ascii=False, indent=2))
+
+
+def insert_ignore_stmt(rows, table=None):
+    """
+    多行INSERT语句，唯一索引冲突的行被忽略，默认写入record表
+    """
+    return (insert(Record.__table__ if table is None else table)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+            .values(rows))
+
+
+def select_exist_hashes(hashes):
+    """
+    构建查询已存在url_hash的select语句：record表中的记录，以及所指记录已存储的近似重复文章
+    """
+    return union(
+        select(Record.url_hash).where(Record.url_hash.in_(hashes)),
+        select(Duplicate.url_hash)
+        .join(Record, Record.url_hash == Duplicate.canonical_hash)
+        .where(Duplicate.url_hash.in_(hashes)))
+
+
+def select_records(start_time, end_time, type=None, columns=None, order_by=None, min_id=None):
+    """
+    构建按时间段和类型查询记录的select语句，参数含义同StoreUtil.get_records
+    """
+    if columns:
+        stmt = select(*[getattr(Record, column) for column in columns])
+    else:
+        stmt = select(Record)
+    stmt = stmt.where(Record.time > start_time, Record.time <= end_time)
+    if min_id:
+        stmt = stmt.where(Record.id > min_id)
+    if type:
+        if isinstance(type, (list, set)):
+            stmt = stmt.where(Record.type.in_(type))
+        else:
+            stmt = stmt.where(Record.type == type)
+    if order_by:
+        stmt = stmt.order_by(*[getattr(Record, column) for column in order_by])
+    return stmt
+
+
 class StoreUtil:
     def __init__(self, config=None):
         """
@@ -53,40 +322,242 @@ class StoreUtil:
         self.engine = None
         self.Session = None
         self.config = config or {}
+        self.url_filter = None
+        # unit_of_work期间按线程复用的session
+        self._uow_sessions = None
+        self._uow_lock = threading.Lock()
+        # URL过滤器判定为一定不存在、无需查询数据库的URL数量
+        self.url_filter_skipped = 0
 
         if config:
             self._init_database()
+            self._init_url_filter()
 
     def _init_database(self):
         """
         初始化数据库连接
         """
         try:
-            host = self.config.get('host', 'localhost')
-            port = self.config.get('port', 3306)
-            username = self.config.get('username', 'root')
-            password = self.config.get('password', '')
-            database = self.config.get('database', 'openeyes')
-
             # 创建数据库引擎
-            connection_string = f"mysql+pymysql://{username}:{password}@{host}:{port}/{database}?charset=utf8mb4"
-            self.engine = create_engine(connection_string, echo=False)
+            connection_string = build_connection_string(self.config)
+            self.engine = create_engine(
+                connection_string,
+                echo=False,
+                poolclass=MeteredQueuePool,
+                pool_size=self.config.get('pool_size', 5),
+                max_overflow=self.config.get('max_overflow', 10),
+                pool_timeout=self.config.get('pool_timeout', 30),
+                pool_recycle=self.config.get('pool_recycle', 3600),
+                pool_pre_ping=self.config.get('pool_pre_ping', True))
+            apply_sqlite_pragmas(self.engine, self.config)
+            self._init_pool_metrics()
 
             # 创建Session类
-            self.Session = sessionmaker(bind=self.engine)
+            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
 
             # 创建表
             Base.metadata.create_all(self.engine)
+            self._migrate_schema()
 
             logger.info("数据库连接初始化成功")
         except Exception as e:
             logger.error(f"数据库连接初始化失败: {str(e)}")
 
+    def _init_pool_metrics(self):
+        metrics = self.engine.pool.metrics
+
+        @event.listens_for(self.engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            metrics.connects += 1
+
+        @event.listens_for(self.engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            metrics.checkouts += 1
+            metrics.checked_out += 1
+            metrics.peak_checked_out = max(metrics.peak_checked_out, metrics.checked_out)
+
+        @event.listens_for(self.engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            metrics.checkins += 1
+            metrics.checked_out -= 1
+
+    @contextmanager
+    def session_scope(self):
+        """
+        获取session，正常退出时提交，异常时回滚
+
+        在unit_of_work中调用时复用当前线程的session且不关闭，否则退出时关闭session、归还连接。
+        """
+        session, owned = self._get_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            if owned:
+                session.close()
+
+    def _get_session(self):
+        with self._uow_lock:
+            if self._uow_sessions is None:
+                return self.Session(), True
+            ident = threading.get_ident()
+            if ident not in self._uow_sessions:
+                self._uow_sessions[ident] = self.Session()
+            return self._uow_sessions[ident], False
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        一次收集运行内复用session和连接，退出时关闭期间创建的所有session
+
+        Example:
+            with store_util.unit_of_work():
+                store_util.get_exist_urls(urls)
+                store_util.save_records(records)
+        """
+        with self._uow_lock:
+            nested = self._uow_sessions is not None
+            if not nested:
+                self._uow_sessions = {}
+        try:
+            yield self
+        finally:
+            if not nested:
+                with self._uow_lock:
+                    sessions, self._uow_sessions = self._uow_sessions, None
+                for session in sessions.values():
+                    session.close()
+
+    def PrintPoolStatus(self):
+        """
+        打印连接池状态和统计
+        """
+        if not self.engine:
+            return
+        logger.info(f"Pool Status: {self.engine.pool.status()}")
+        logger.info(f"Pool Metrics: {self.engine.pool.metrics}")
+
+    def _migrate_schema(self):
+        """
+        为旧版本创建的record表补充url_hash列、唯一索引和查询索引
+
+        已存在的重复URL只保留id最小一条的url_hash，其余保持为NULL，不影响唯一索引的创建。
+        """
+        inspector = inspect(self.engine)
+        columns = [column["name"] for column in inspector.get_columns(Record.__tablename__)]
+        if "url_hash" not in columns:
+            logger.info("record表增加url_hash列")
+            with self.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE record ADD COLUMN url_hash VARCHAR(64)"))
+
+        index_names = [index["name"] for index in inspector.get_indexes(Record.__tablename__)]
+        for index in Record.__table__.indexes:
+            if index.name not in index_names and not index.unique:
+                logger.info(f"创建索引：{index.name}")
+                index.create(self.engine)
+        if "uq_record_url_hash" in index_names:
+            return
+
+        logger.info("补全url_hash并创建唯一索引")
+        seen_hashes = set()
+        last_id = 0
+        with self.engine.begin() as conn:
+            while True:
+                rows = conn.execute(
+                    text("SELECT id, url FROM record WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                    {"last_id": last_id, "limit": URL_HASH_BACKFILL_BATCH}).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                params = []
+                for row in rows:
+                    if not row.url:
+                        continue
+                    h = url_hash(row.url)
+                    if h in seen_hashes:
+                        continue
+                    seen_hashes.add(h)
+                    params.append({"_id": row.id, "_hash": h})
+                if params:
+                    conn.execute(
+                        update(Record.__table__)
+                        .where(Record.__table__.c.id == bindparam("_id"))
+                        .values(url_hash=bindparam("_hash")),
+                        params)
+        for index in Record.__table__.indexes:
+            if index.name == "uq_record_url_hash":
+                index.create(self.engine)
+
+    def _init_url_filter(self):
+        """
+        初始化已存储URL的布隆过滤器
+
+        配置storage.url_filter后启用：优先从快照文件加载，再从数据库补充快照之后新增的记录。
+        """
+        filter_config = self.config.get("url_filter")
+        if not filter_config or not self.Session:
+            return
+
+        capacity = filter_config.get("capacity", 1000000)
+        error_rate = filter_config.get("error_rate", 0.001)
+        snapshot = filter_config.get("snapshot")
+        try:
+            if snapshot:
+                self.url_filter = BloomFilter.load(snapshot, capacity, error_rate)
+            if self.url_filter:
+                logger.info(f"从快照加载URL过滤器：{snapshot} {self.url_filter}")
+            else:
+                self.url_filter = BloomFilter(capacity, error_rate)
+            self._warm_url_filter()
+            logger.info(f"URL过滤器初始化成功：{self.url_filter}")
+        except Exception as e:
+            logger.error(f"URL过滤器初始化失败: {str(e)}")
+            self.url_filter = None
+
+    def _warm_url_filter(self):
+        """
+        将id大于过滤器水位的记录和近似重复文章加入过滤器
+        """
+        with self.session_scope() as session:
+            for model, watermark in ((Record, "watermark"), (Duplicate, "duplicate_watermark")):
+                while True:
+                    rows = session.query(model.id, model.url_hash).filter(
+                        model.id > getattr(self.url_filter, watermark)
+                    ).order_by(model.id).limit(URL_FILTER_WARM_BATCH).all()
+                    if not rows:
+                        break
+                    for row in rows:
+                        if row.url_hash:
+                            self.url_filter.add(row.url_hash)
+                    setattr(self.url_filter, watermark, rows[-1].id)
+
+    def save_url_filter(self):
+        """
+        保存URL过滤器快照，用于下次启动时快速加载
+        """
+        snapshot = (self.config.get("url_filter") or {}).get("snapshot")
+        if not self.url_filter or not snapshot:
+            return
+        try:
+            # 先推进水位，下次启动只需补充快照之后新增的记录
+            self._warm_url_filter()
+            self.url_filter.save(snapshot)
+            logger.info(f"URL过滤器快照已保存：{snapshot} {self.url_filter}，本次跳过 {self.url_filter_skipped} 次数据库查询")
+        except Exception as e:
+            logger.error(f"URL过滤器快照保存失败: {str(e)}")
+
     def PrintStoreConfig(self):
         """
         打印存储配置信息
         """
-        if self.config:
+        if self.config and self.config.get('backend') == 'sqlite':
+            logger.info("Store Config:")
+            logger.info("  Backend: sqlite")
+            logger.info(f"  Path: {self.config.get('path', 'data/openeyes.db')}")
+        elif self.config:
             logger.info("Store Config:")
             logger.info(f"  Host: {self.config.get('host', 'localhost')}")
             logger.info(f"  Port: {self.config.get('port', 3306)}")
@@ -100,48 +571,45 @@ class StoreUtil:
         """
         批量保存记录到数据库
 
+        使用一条多行INSERT IGNORE语句写入，url_hash重复的记录由唯一索引跳过，
+        多个收集程序同时写入时也不会产生重复记录。
+
         Args:
             records (list): 记录对象列表
 
         Returns:
-            dict: 包含成功和失败数量的统计信息
+            dict: 包含成功(success)、跳过(skipped)和失败(failed)数量的统计信息
         """
         if not self.Session:
             logger.error("数据库未初始化")
-            return {"success": 0, "failed": len(records)}
+            return {"success": 0, "skipped": 0, "failed": len(records)}
 
         if not isinstance(records, list):
             logger.error("参数必须是记录对象列表")
-            return {"success": 0, "failed": 0}
-
-        # 过滤掉已存在的记录
-        filtered_records = []
-        fail_store_records = []
-        for record in records:
-            if self.judge_url_contains(record.url):
-                fail_store_records.append(record)
-            else:
-                filtered_records.append(record)
+            return {"success": 0, "skipped": 0, "failed": 0}
 
-        if not filtered_records:
+        rows = record_rows(records)
+        if not rows:
             logger.info("没有需要保存的新记录")
-            return {"success": 0, "failed": len(records)}
+            return {"success": 0, "skipped": 0, "failed": len(records)}
 
         try:
-            session = self.Session()
-            session.add_all(filtered_records)
-            session.commit()
-            success_count = len(filtered_records)
-            logger.info("成功批量保存 %d 条记录 \n %s" % (success_count, json.dumps([v.to_dict() for v in filtered_records], ensure_ascii=False, indent=2)))
-            failed_count = len(fail_store_records)
-            logger.info("无需保存 %d 条记录 \n %s" % (failed_count, json.dumps([v.to_dict() for v in fail_store_records], ensure_ascii=False, indent=2)))
-            session.close()
-            return {"success": success_count, "failed": failed_count}
+            stmt = insert_ignore_stmt(rows)
+            with metrics.timer("db_write_seconds", op="save_records"), self.session_scope() as session:
+                result = session.execute(stmt)
+            if self.url_filter:
+                for row in rows:
+                    self.url_filter.add(row["url_hash"])
+            success_count = result.rowcount
+            skipped_count = len(rows) - success_count
+            failed_count = len(records) - len(rows)
+            metrics.inc("records_stored_total", success_count)
+            metrics.inc("records_skipped_total", skipped_count)
+            log_saved_records(records, success_count, skipped_count, failed_count)
+            return {"success": success_count, "skipped": skipped_count, "failed": failed_count}
         except Exception as e:
             logger.error(f"批量保存记录失败: {str(e)}")
-            session.rollback()
-            session.close()
-            return {"success": 0, "failed": len(records)}
+            return {"success": 0, "skipped": 0, "failed": len(records)}
 
     def save_record(self, record: Record):
         """
@@ -153,42 +621,136 @@ class StoreUtil:
         Returns:
             bool: 保存是否成功
         """
+        ans = self.save_records([record])
+        if ans.get("skipped"):
+            logger.warn(f"记录已存在： {record}")
+        return ans.get("success") == 1
+
+    def judge_url_contains(self, url) -> bool:
+        """
+        判断记录是否已存在
+        :param record: 记录对象
+        :return: True表示已存在，False表示不存在
+        """
+        h = url_hash(url)
+        if self.url_filter and h not in self.url_filter:
+            self.url_filter_skipped += 1
+            return False
+        try:
+            with self.session_scope() as session:
+                return session.execute(select_exist_hashes([h])).first() is not None
+        except Exception as e:
+            logger.error(f"判断记录是否存在失败: {str(e)}")
+            return False
+
+    def get_exist_urls(self, urls) -> set:
+        """
+        批量判断URL是否已存在，按URL_QUERY_CHUNK_SIZE分块对url_hash执行IN查询，已记录的近似重复文章也视为已存在
+
+        Args:
+            urls (list): URL列表
+
+        Returns:
+            set: 数据库中已存在的URL集合（规范化后相同即视为已存在）
+        """
+        urls_by_hash = {}
+        for url in urls:
+            if url:
+                urls_by_hash.setdefault(url_hash(url), []).append(url)
+        hashes = list(urls_by_hash)
+        if self.url_filter:
+            # 过滤器判定不存在的URL一定不在数据库中，只查询可能存在的URL
+            hashes = [h for h in hashes if h in self.url_filter]
+            self.url_filter_skipped += len(urls_by_hash) - len(hashes)
+        exist_urls = set()
+        if not hashes:
+            return exist_urls
+
         if not self.Session:
             logger.error("数据库未初始化")
-            return False
+            return exist_urls
 
-        if self.judge_url_contains(record.url):
-            logger.warn(f"记录已存在： {record}")
+        try:
+            with metrics.timer("db_query_seconds", op="get_exist_urls"), self.session_scope() as session:
+                for i in range(0, len(hashes), URL_QUERY_CHUNK_SIZE):
+                    chunk = hashes[i:i + URL_QUERY_CHUNK_SIZE]
+                    for row in session.execute(select_exist_hashes(chunk)):
+                        exist_urls.update(urls_by_hash[row[0]])
+        except Exception as e:
+            logger.error(f"批量判断记录是否存在失败: {str(e)}")
+        return exist_urls
+
+    def save_fingerprints(self, fingerprints: list) -> bool:
+        """
+        保存文章指纹，已存在的忽略
+
+        Args:
+            fingerprints (list): (url_hash, simhash)列表
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
             return False
+        if not fingerprints:
+            return True
 
         try:
-            session = self.Session()
-            session.add(record)
-            session.commit()
-            logger.info(f"记录保存成功: {record}")
-            session.close()
+            with self.session_scope() as session:
+                session.execute(insert_ignore_stmt(fingerprint_rows(fingerprints), Fingerprint.__table__))
             return True
         except Exception as e:
-            logger.error(f"记录保存失败: {str(e)}")
-            session.rollback()
-            session.close()
+            logger.error(f"保存文章指纹失败: {str(e)}")
             return False
-    def judge_url_contains(self, url) -> bool:
+
+    def save_duplicates(self, duplicates: list) -> bool:
         """
-        判断记录是否已存在
-        :param record: 记录对象
-        :return: True表示已存在，False表示不存在
+        保存近似重复的文章，已存在的忽略
+
+        Args:
+            duplicates (list): (url, source, canonical_hash)列表
         """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return False
+        if not duplicates:
+            return True
+
+        rows = duplicate_rows(duplicates)
         try:
-            session = self.Session()
-            query = session.query(Record).filter(Record.url == url)
-            exists = query.first() is not None
-            session.close()
-            return exists
+            with metrics.timer("db_write_seconds", op="save_duplicates"), self.session_scope() as session:
+                session.execute(insert_ignore_stmt(rows, Duplicate.__table__))
+            if self.url_filter:
+                for row in rows:
+                    self.url_filter.add(row["url_hash"])
+            return True
         except Exception as e:
-            logger.error(f"判断记录是否存在失败: {str(e)}")
+            logger.error(f"保存近似重复文章失败: {str(e)}")
             return False
-    def get_records(self, start_time, end_time, type=None):
+
+    def get_fingerprints(self, since=None) -> list:
+        """
+        获取文章指纹，用于启动时构建近似重复索引
+
+        Args:
+            since (datetime): 只获取该时间之后保存的指纹
+
+        Returns:
+            list: (url_hash, simhash)列表
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return []
+
+        try:
+            stmt = select(Fingerprint.url_hash, Fingerprint.simhash)
+            if since:
+                stmt = stmt.where(Fingerprint.time > since)
+            with self.session_scope() as session:
+                return [(row.url_hash, int(row.simhash, 16)) for row in session.execute(stmt)]
+        except Exception as e:
+            logger.error(f"获取文章指纹失败: {str(e)}")
+            return []
+
+    def get_records(self, start_time, end_time, type=None, columns=None, min_id=None):
         """
         获取指定时间段内的新闻记录
         
@@ -196,6 +758,8 @@ class StoreUtil:
             start_time: 开始时间（不包含）
             end_time: 结束时间（包含）
             type: 新闻类型，可以是字符串、列表或集合，如果为None则获取所有类型的新闻
+            columns (list): 只查询指定的列，如["id", "time", "title"]，此时返回的是行而非Record对象
+            min_id (int): 只查询id大于该值的记录，用于增量读取
             
         Returns:
             list: 符合条件的新闻记录对象列表
@@ -205,26 +769,42 @@ class StoreUtil:
             return []
         
         try:
-            session = self.Session()
-            query = session.query(Record).filter(
-                Record.time > start_time,
-                Record.time <= end_time
-            )
-            
-            # 如果指定了类型，则添加类型筛选条件
-            if type:
-                if isinstance(type, (list, set)):
-                    # 如果type是列表或集合，则查找所有在其中的类型
-                    query = query.filter(Record.type.in_(type))
-                else:
-                    # 如果type是字符串，则精确匹配类型
-                    query = query.filter(Record.type == type)
-            
-            records = query.all()
-            session.close()
+            with self.session_scope() as session:
+                result = session.execute(select_records(start_time, end_time, type, columns, min_id=min_id))
+                records = result.all() if columns else result.scalars().all()
             
             # 直接返回记录对象列表
             return records
         except Exception as e:
             logger.error(f"获取记录失败: {str(e)}")
             return []
+
+    def iter_records(self, start_time, end_time, type=None, columns=None, order_by=None,
+                     chunk_size=RECORD_STREAM_CHUNK_SIZE, min_id=None):
+        """
+        流式获取指定时间段内的新闻记录，使用服务端游标按批读取，内存占用与记录总数无关
+
+        Args:
+            start_time: 开始时间（不包含）
+            end_time: 结束时间（包含）
+            type: 新闻类型，可以是字符串、列表或集合，如果为None则获取所有类型的新闻
+            columns (list): 只查询指定的列，列表页可以不查content
+            order_by (list): 排序的列名，如["type", "time"]
+            chunk_size (int): 每批读取的记录数量
+            min_id (int): 只查询id大于该值的记录，用于增量读取
+
+        Yields:
+            Record或行对象，均可以用属性访问列
+        """
+        if not self.Session:
+            logger.error("数据库未初始化")
+            return
+
+        try:
+            with self.session_scope() as session:
+                stmt = select_records(start_time, end_time, type, columns, order_by, min_id)
+                result = session.execute(stmt.execution_options(yield_per=chunk_size))
+                for record in (result if columns else result.scalars()):
+                    yield record
+        except Exception as e:
+            logger.error(f"流式获取记录失败: {str(e)}")
@@ -0,0 +1,64 @@
+import hashlib
+import re
+
+# 中日韩文字及全角标点，qwen等模型的分词器中大致一字一个token
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+# 其他文字（英文、数字、符号）大致四个字符一个token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估计文本的token数，不依赖具体模型的分词器，用于划分批次和控制预算
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    将文本截断到大约max_tokens个token
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text
+    # 二分查找满足预算的最长前缀
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
+
+
+# SimHash指纹位数
+SIMHASH_BITS = 64
+# 计算指纹前去掉链接、空白和标点，只保留文字
+_SIMHASH_NOISE = re.compile(r"https?://\S+|[\W_]+")
+
+
+def simhash(text: str, shingle=3) -> int:
+    """
+    以连续shingle个字符为特征计算64位SimHash，内容相近的文本指纹的汉明距离小
+
+    按字符而不是按词切分，中文不需要分词
+    """
+    text = _SIMHASH_NOISE.sub("", text or "")
+    features = {}
+    for i in range(max(1, len(text) - shingle + 1)):
+        feature = text[i:i + shingle]
+        features[feature] = features.get(feature, 0) + 1
+
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if h >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+
+from util.logger import get_log_dir
+
+
+def _current_track():
+    """
+    当前span所在的轨道：asyncio任务各自一条轨道，否则按线程区分
+    """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return ("task", id(task)), task.get_name()
+    thread = threading.current_thread()
+    return ("thread", thread.ident), thread.name
+
+
+class Tracer:
+    """
+    记录嵌套的耗时区间（span），导出为Chrome/Perfetto可以打开的trace json
+
+    并发的asyncio任务各占一条轨道，同一任务内的span按调用关系嵌套，
+    在chrome://tracing或ui.perfetto.dev中可以直接看到各阶段的重叠和空闲。
+    未启用时span不做任何记录。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.tracks = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def __repr__(self) -> str:
+        return f"<Tracer: enabled={self.enabled}, events={len(self.events)}, tracks={len(self.tracks)}>"
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self.tracks = {}
+        self._origin = time.perf_counter()
+
+    def _tid(self):
+        key, name = _current_track()
+        with self._lock:
+            if key not in self.tracks:
+                self.tracks[key] = (len(self.tracks) + 1, name)
+            return self.tracks[key][0]
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1e6
+
+    @contextmanager
+    def span(self, name, **args):
+        """
+        记录代码块的开始时间和耗时
+
+        Args:
+            name (str): span名称，如"fetch"
+            args: 附加信息，如source、url，显示在trace的详情中
+        """
+        if not self.enabled:
+            yield
+            return
+        tid = self._tid()
+        start = self._now()
+        try:
+            yield
+        finally:
+            event = {"name": name, "ph": "X", "ts": start, "dur": self._now() - start,
+                     "pid": self._pid, "tid": tid}
+            if args:
+                event["args"] = {k: str(v) for k, v in args.items()}
+            with self._lock:
+                self.events.append(event)
+
+    def instant(self, name, **args):
+        """
+        记录一个时间点事件，如限流退避
+        """
+        if not self.enabled:
+            return
+        event = {"name": name, "ph": "i", "s": "t", "ts": self._now(), "pid": self._pid, "tid": self._tid()}
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        with self._lock:
+            self.events.append(event)
+
+    def write(self, prefix):
+        """
+        将trace写入日志目录：{prefix}_trace_{time}.json
+
+        Returns:
+            str: 文件路径，未启用时返回None
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+                        for tid, name in self.tracks.values()]
+            events = metadata + list(self.events)
+        path = os.path.join(get_log_dir(), f"{prefix}_trace_{datetime.now().strftime('%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return path
+
+
+class SamplingProfiler:
+    """
+    采样分析CPU热点
+
+    后台线程按固定间隔抓取所有线程的调用栈并计数，输出folded格式（每行"栈;栈;栈 次数"），
+    可以用flamegraph.pl或speedscope生成火焰图。
+    """
+
+    def __init__(self, interval=0.005):
+        """
+        Args:
+            interval (float): 采样间隔秒数
+        """
+        self.interval = interval
+        self.samples = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self) -> str:
+        return f"<SamplingProfiler: interval={self.interval}, stacks={len(self.samples)}>"
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = ";".join(f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+                                 for entry in traceback.extract_stack(frame))
+                key = f"{names.get(ident, ident)};{stack}"
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write(self, prefix):
+        """
+        将采样结果写入日志目录：{prefix}_profile_{time}.folded
+
+        Returns:
+            str: 文件路径
+        """
+        path = os.path.join(get_log_dir(), f"{prefix}_profile_{datetime.now().strftime('%H%M%S')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+# 进程内共用的tracer实例
+tracer = Tracer()
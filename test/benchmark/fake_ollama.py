@@ -0,0 +1,221 @@
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from util.text_util import estimate_tokens
+
+_TAG_PATTERN = "<{0}>\\s*(.*?)\\s*</{0}>"
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\((\S+?)(?:\s+\"[^\"]*\")?\)")
+_DATE = re.compile(r"(20\d{2})[/-](\d{2})[/-](\d{2})")
+_TITLE_LINE = re.compile(r"^\s*(?:\d+\.\s*)?标题[:：]\s*(.+)$", re.M)
+
+
+def _tag(text, name):
+    match = re.search(_TAG_PATTERN.format(name), text, re.S)
+    return match.group(1) if match else None
+
+
+def _unescape(text):
+    # crawl4ai放入提示词前对页面内容做了json字符串转义
+    try:
+        return json.loads('"%s"' % text)
+    except ValueError:
+        return text
+
+
+class FakeOllama:
+    """
+    模拟ollama服务，按提示词中的schema返回固定规则生成的抽取结果，用于离线基准测试
+
+    支持/api/generate（litellm的ollama/前缀）和/api/chat（ollama客户端，热点总结），
+    每次请求按 latency + token_latency × 提示词千token数 + 随机抖动 延迟后返回，
+    parallel限制同时处理的请求数，模拟单机推理服务的排队；error_rate按比例返回500，用于覆盖重试。
+    """
+
+    def __init__(self, latency=0.5, token_latency=0.0, jitter=0.0, parallel=1, error_rate=0.0,
+                 host="127.0.0.1", port=0, seed=0):
+        """
+        Args:
+            latency (float): 每次请求的固定延迟秒数
+            token_latency (float): 提示词每1000 token增加的延迟秒数
+            jitter (float): 随机增加的最大延迟秒数
+            parallel (int): 同时处理的请求数，超出的请求排队等待
+            error_rate (float): 返回错误的比例
+            host (str): 监听地址
+            port (int): 端口，0表示自动分配
+            seed (int): 抖动和错误的随机种子
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.parallel = parallel
+        self.error_rate = error_rate
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.busy_seconds = 0.0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(parallel)
+        self._server = None
+
+    def __repr__(self) -> str:
+        return (f"<FakeOllama: url={self.base_url}, latency={self.latency}, parallel={self.parallel}, "
+                f"requests={self.requests}>")
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "busy_seconds": self.busy_seconds,
+        }
+
+    def respond(self, prompt, json_format=False):
+        """
+        根据提示词生成回复文本
+
+        抽取提示词：解析<schema_block>，schema含url字段时返回页面中的文章链接列表，
+        否则按字段名生成一条文章摘要；json格式的对话（热点总结）返回记录标题组成的热点列表。
+        """
+        schema = _tag(prompt, "schema_block")
+        if schema is not None:
+            try:
+                properties = json.loads(schema).get("properties", {})
+            except ValueError:
+                properties = {}
+            url = _tag(prompt, "url") or ""
+            content = _unescape(_tag(prompt, "url_content") or "")
+            if "url" in properties:
+                blocks = [{"url": href, "title": text.strip()} for text, href in _MARKDOWN_LINK.findall(content)
+                          if len(text.strip()) >= 6 and _DATE.search(href)]
+            else:
+                blocks = [self._record(properties, url, content)]
+            return "<blocks>%s</blocks>\n<score>5</score>" % json.dumps(blocks, ensure_ascii=False)
+
+        if json_format:
+            # 热点总结：map提示词按记录标题生成热点，reduce提示词直接取各批次热点
+            topics = ["%s：%s" % (title[:20], title) for title in _TITLE_LINE.findall(prompt)]
+            if not topics and "各批次热点:" in prompt:
+                section = prompt.split("各批次热点:", 1)[1].split("并以json格式返回", 1)[0]
+                topics = [line.strip() for line in section.splitlines() if line.strip()]
+            return json.dumps({"topic": topics[:5] or ["无热点：没有可总结的内容"]}, ensure_ascii=False)
+        return "ok"
+
+    @staticmethod
+    def _record(properties, url, content):
+        # crawl4ai会把页面内容的换行压缩为空格，标题取第一个片段
+        text = content.strip().lstrip("#").strip()
+        parts = text.split(None, 1)
+        title = parts[0] if parts and len(parts[0]) >= 6 else text[:60]
+        date = _DATE.search(url) or _DATE.search(content)
+        values = {
+            "title": title,
+            "content": text[len(title):].strip()[:400],
+            "tags": "基准测试",
+            "time": "%s-%s-%s" % date.groups() if date else datetime.today().strftime("%Y-%m-%d"),
+        }
+        return {name: values.get(name, "") for name in properties}
+
+    def _delay(self, tokens):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            failed = self._rng.random() < self.error_rate
+        return self.latency + self.token_latency * tokens / 1000 + jitter, failed
+
+    def _handle(self, prompt, json_format):
+        """
+        Returns:
+            tuple: (回复文本, 提示词token数)，模拟错误时回复为None
+        """
+        tokens = estimate_tokens(prompt)
+        delay, failed = self._delay(tokens)
+        with self._slots:
+            time.sleep(delay)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += tokens
+            self.busy_seconds += delay
+            if failed:
+                self.errors += 1
+        return (None if failed else self.respond(prompt, json_format)), tokens
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, data):
+                body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    self._send(200, {"version": "0.0.0-fake"})
+                elif self.path == "/api/tags":
+                    self._send(200, {"models": [{"name": "qwen3:8b", "model": "qwen3:8b"}]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if self.path == "/api/generate":
+                    prompt = request.get("prompt", "")
+                elif self.path == "/api/chat":
+                    prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+                else:
+                    self._send(404, {"error": "not found"})
+                    return
+                text, tokens = fake._handle(prompt, bool(request.get("format")))
+                if text is None:
+                    self._send(500, {"error": "fake ollama: injected error"})
+                    return
+                result = {
+                    "model": request.get("model", ""),
+                    "created_at": datetime.utcnow().isoformat() + "Z",
+                    "done": True,
+                    "done_reason": "stop",
+                    "prompt_eval_count": tokens,
+                    "eval_count": estimate_tokens(text),
+                }
+                if self.path == "/api/generate":
+                    result["response"] = text
+                else:
+                    result["message"] = {"role": "assistant", "content": text}
+                self._send(200, result)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,165 @@
+import html
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# 语料目录中的来源清单
+CORPUS_MANIFEST = "corpus.json"
+
+_TOPICS = {
+    "时政": ["外交部", "国际会议", "双边关系", "地区局势", "选举", "联合国", "贸易谈判", "边境安全"],
+    "财经": ["央行", "利率", "股市", "债券", "通胀", "汇率", "上市公司", "财报", "消费", "楼市"],
+    "科技": ["芯片", "大模型", "开源", "云计算", "智能手机", "数据中心", "操作系统", "网络安全"],
+    "AI": ["大模型", "推理", "智能体", "多模态", "训练集群", "算力", "开源模型", "对齐"],
+    "智驾": ["自动驾驶", "激光雷达", "城市领航", "端到端", "智能座舱", "新能源车", "车路协同", "芯片"],
+}
+_VERBS = ["发布", "宣布", "推进", "扩大", "下调", "上调", "启动", "完成", "暂停", "加快", "回应", "披露"]
+_OBJECTS = ["新一轮计划", "年度报告", "合作协议", "监管新规", "技术路线", "投资项目", "市场预期", "试点方案",
+            "季度数据", "产品更新", "战略调整", "行业标准"]
+_FILLERS = ["业内人士认为", "分析人士指出", "据知情人士透露", "相关负责人表示", "数据显示", "市场普遍预计",
+            "从长期来看", "与此同时", "值得注意的是", "在此背景下"]
+_ENDINGS = ["这一变化将对行业格局产生深远影响", "后续进展仍有待观察", "相关细则预计将在近期公布",
+            "多家机构已经上调了全年预期", "市场对此反应平稳", "这也是今年以来的第三次调整",
+            "有关方面表示将持续跟进", "部分企业已经提前做好了准备"]
+
+_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+<header>
+<nav>{nav}</nav>
+</header>
+<main>
+{main}
+</main>
+<footer>
+<p>{site_name}版权所有 © 2025 未经授权禁止转载。本站所有内容仅供参考，不构成任何投资建议。</p>
+<nav><a href="{base}/about/">关于我们</a> <a href="{base}/contact/">联系我们</a> <a href="{base}/privacy/">隐私政策</a></nav>
+</footer>
+</body>
+</html>
+"""
+
+
+class CorpusSite:
+    """
+    语料中的一个来源：一个主页和若干文章页
+    """
+
+    def __init__(self, source, type, path):
+        self.source = source
+        self.type = type
+        # 主页相对于语料根目录的路径，如site0/
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"<CorpusSite: source={self.source}, type={self.type}, path={self.path}>"
+
+    def to_dict(self):
+        return {"source": self.source, "type": self.type, "path": self.path}
+
+
+def _sentence(rng, topics):
+    return "%s，%s%s%s，%s。" % (rng.choice(_FILLERS), rng.choice(topics), rng.choice(_VERBS),
+                               rng.choice(_OBJECTS), rng.choice(_ENDINGS))
+
+
+def _paragraph(rng, topics):
+    return "".join(_sentence(rng, topics) for _ in range(rng.randint(3, 6)))
+
+
+def _nav(base, type):
+    links = ["首页", type, "国际", "财经", "科技", "评论", "视频"]
+    paths = [""] + ["category/%d/" % i for i in range(1, len(links))]
+    items = ['<a href="%s/%s">%s</a>' % (base, path, text) for path, text in zip(paths, links)]
+    items.append('<a href="%s/en/">English</a>' % base)
+    return " ".join(items)
+
+
+def _write(root, path, text):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def generate_corpus(root, sites=4, articles=30, duplicate_ratio=0.1, paragraphs=(8, 14), seed=0):
+    """
+    在root下生成可重复的模拟语料：每个来源一个主页和若干文章页
+
+    文章页带有相同的页头页尾、导航和相关文章列表，用于覆盖正文预处理；
+    按duplicate_ratio把部分文章改写自其他来源的文章（只替换一段），用于覆盖近似重复检测。
+    相同参数生成的语料完全相同。
+
+    Args:
+        root (str): 语料根目录
+        sites (int): 来源数量
+        articles (int): 每个来源的文章数量
+        duplicate_ratio (float): 近似重复文章的比例
+        paragraphs (tuple): 每篇文章段落数的范围
+        seed (int): 随机种子
+
+    Returns:
+        list: CorpusSite列表，同时写入root/corpus.json
+    """
+    rng = random.Random(seed)
+    types = list(_TOPICS)
+    result = []
+    bodies = []
+    published = date(2025, 10, 1)
+    for i in range(sites):
+        type = types[i % len(types)]
+        topics = _TOPICS[type]
+        site = CorpusSite("基准来源%d" % i, type, "site%d/" % i)
+        base = "/site%d" % i
+        site_name = "基准新闻%d" % i
+        nav = _nav(base, type)
+
+        links = []
+        for j in range(articles):
+            day = published - timedelta(days=j % 7)
+            path = "site%d/%s/%d.html" % (i, day.strftime("%Y/%m/%d"), 100000 + i * 1000 + j)
+            title = "%s%s%s：%s" % (rng.choice(topics), rng.choice(_VERBS), rng.choice(_OBJECTS), rng.choice(_ENDINGS))
+            if bodies and rng.random() < duplicate_ratio:
+                # 转载：复用已有文章的正文，只改写其中一段
+                body = list(rng.choice(bodies))
+                body[rng.randrange(len(body))] = _paragraph(rng, topics)
+            else:
+                body = [_paragraph(rng, topics) for _ in range(rng.randint(*paragraphs))]
+                bodies.append(body)
+            links.append(("/" + path, title))
+
+            related = "".join('<li><a href="/%s">%s</a></li>' % (
+                "site%d/%s/%d.html" % (i, day.strftime("%Y/%m/%d"), 100000 + i * 1000 + k), "相关阅读%d" % k)
+                for k in rng.sample(range(articles), min(5, articles)))
+            main = "<article>\n<h1>%s</h1>\n<p class=\"meta\">%s 发布时间：%s</p>\n%s\n</article>\n" \
+                   "<aside><h3>相关阅读</h3><ul>%s</ul></aside>" % (
+                       html.escape(title), site_name, day.isoformat(),
+                       "\n".join("<p>%s</p>" % html.escape(p) for p in body), related)
+            _write(root, path, _PAGE.format(title=html.escape(title), nav=nav, main=main, site_name=site_name,
+                                            base=base))
+
+        items = "\n".join('<li><a href="%s">%s</a></li>' % (url, html.escape(title)) for url, title in links)
+        main = "<h2>最新文章</h2>\n<ul>\n%s\n</ul>\n<p><a href=\"%s/page/2/\">下一页</a></p>" % (items, base)
+        _write(root, site.path + "index.html",
+               _PAGE.format(title=site_name, nav=nav, main=main, site_name=site_name, base=base))
+        result.append(site)
+
+    with open(os.path.join(root, CORPUS_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump([site.to_dict() for site in result], f, ensure_ascii=False, indent=4)
+    return result
+
+
+def load_corpus(root):
+    """
+    读取语料目录的来源清单，保存的真实页面也可以按同样的格式放入语料目录
+
+    Returns:
+        list: CorpusSite列表
+    """
+    with open(os.path.join(root, CORPUS_MANIFEST), "r", encoding="utf-8") as f:
+        return [CorpusSite(**item) for item in json.load(f)]
@@ -0,0 +1,222 @@
+import argparse
+import json
+import math
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.append(os.path.dirname(__file__))
+# litellm导入时默认会联网下载模型价格表，离线环境中会卡住首次LLM调用
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from fake_ollama import FakeOllama
+from fixtures import generate_corpus, load_corpus
+from site_server import SiteServer
+from collection.main import CollectionImpl
+from util.logger import get_log_dir
+from util.metrics import metrics
+from util.trace_util import tracer
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(__file__), '..', '..', 'configs', 'benchmark.json')
+# 报告中各阶段的顺序，对应collection中的tracer span
+STAGES = ("source", "homepage", "homepage_fetch", "homepage_llm_extract", "article_fetch", "preprocess", "dedup",
+          "article_llm_extract", "store")
+
+
+def percentile(values, p):
+    """
+    最近秩法计算百分位数，values需已排序
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100.0 * len(values)) - 1)]
+
+
+def stage_latency(events):
+    """
+    按span名称统计耗时（秒）：次数、总和、平均、p50、p95、最大
+    """
+    durations = {}
+    for event in events:
+        if event.get("ph") == "X":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1e6)
+    result = {}
+    for name in sorted(durations, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)):
+        values = sorted(durations[name])
+        result[name] = {
+            "count": len(values),
+            "total": sum(values),
+            "avg": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+        }
+    return result
+
+
+def article_counts(snapshot):
+    """
+    汇总各来源的articles_total计数：status -> 篇数
+    """
+    counts = {}
+    for counter in snapshot["counters"]:
+        if counter["name"] == "articles_total":
+            status = counter["labels"].get("status")
+            counts[status] = counts.get(status, 0) + counter["value"]
+    return counts
+
+
+def build_config(args, corpus, site_server, fake_ollama, work_dir):
+    """
+    以基准配置为模板，填入语料来源、模拟ollama地址和临时数据库路径，写入工作目录
+
+    Returns:
+        str: 配置文件路径
+    """
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["crawls"] = [{
+        "source": site.source,
+        "type": site.type,
+        "url": site_server.url(site.path),
+        "link_extractor": args.link_extractor,
+    } for site in corpus]
+    config["llm"] = dict(config.get("llm") or {}, base_url=fake_ollama.base_url)
+    storage = config.setdefault("storage", {})
+    if storage.get("backend") == "sqlite":
+        storage["path"] = args.db or os.path.join(work_dir, "benchmark.db")
+    for name in ("journal", "extraction_cache"):
+        if config.get(name):
+            config[name]["path"] = os.path.join(work_dir, os.path.basename(config[name]["path"]))
+    path = os.path.join(work_dir, "config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+    return path
+
+
+def run(args):
+    work_dir = tempfile.mkdtemp(prefix="openeyes_benchmark_")
+    try:
+        if args.corpus:
+            corpus_dir = args.corpus
+            corpus = load_corpus(corpus_dir)
+        else:
+            corpus_dir = os.path.join(work_dir, "corpus")
+            corpus = generate_corpus(corpus_dir, sites=args.sites, articles=args.articles,
+                                     duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+
+        fake_ollama = FakeOllama(latency=args.llm_latency, token_latency=args.llm_token_latency,
+                                 jitter=args.llm_jitter, parallel=args.llm_parallel,
+                                 error_rate=args.llm_error_rate, seed=args.seed)
+        with SiteServer(corpus_dir) as site_server, fake_ollama:
+            config_path = build_config(args, corpus, site_server, fake_ollama, work_dir)
+            metrics.reset()
+            tracer.enable()
+            if args.tracemalloc:
+                tracemalloc.start()
+
+            impl = CollectionImpl(config_path)
+            start = time.perf_counter()
+            url_status = impl.Run()
+            elapsed = time.perf_counter() - start
+
+            traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+            if args.tracemalloc:
+                tracemalloc.stop()
+            llm_stats = fake_ollama.stats()
+
+        snapshot = metrics.snapshot()
+        stored = sum(status[3] for status in url_status.values() if status)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "params": vars(args),
+            "sources": len(corpus),
+            "failed_sources": [source for source, status in url_status.items() if status is False],
+            "elapsed_seconds": elapsed,
+            "stored": stored,
+            "records_per_second": stored / elapsed if elapsed else 0,
+            "articles": article_counts(snapshot),
+            "llm": llm_stats,
+            "stages": stage_latency(tracer.events),
+            "memory": {
+                # Linux下ru_maxrss单位为KB
+                "max_rss_mb": usage.ru_maxrss / 1024,
+                "children_max_rss_mb": children.ru_maxrss / 1024,
+                "tracemalloc_peak_mb": traced_peak / 1024 / 1024 if traced_peak is not None else None,
+            },
+            "cpu_seconds": usage.ru_utime + usage.ru_stime,
+            "trace": tracer.write("benchmark"),
+            "work_dir": work_dir if args.keep else None,
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def print_report(result):
+    print("=" * 78)
+    print("来源 %d 个（失败 %d 个），耗时 %.2f 秒，存储 %d 条，吞吐 %.2f 条/秒" % (
+        result["sources"], len(result["failed_sources"]), result["elapsed_seconds"], result["stored"],
+        result["records_per_second"]))
+    print("文章：%s" % ", ".join("%s %d" % item for item in sorted(result["articles"].items())))
+    llm = result["llm"]
+    print("LLM：请求 %d 次，错误 %d 次，提示词 %d token，模拟推理 %.2f 秒" % (
+        llm["requests"], llm["errors"], llm["prompt_tokens"], llm["busy_seconds"]))
+    print("-" * 78)
+    print("%-22s %6s %9s %8s %8s %8s %8s" % ("阶段", "次数", "总计", "平均", "p50", "p95", "最大"))
+    for name, stage in result["stages"].items():
+        print("%-22s %6d %9.2f %8.3f %8.3f %8.3f %8.3f" % (
+            name, stage["count"], stage["total"], stage["avg"], stage["p50"], stage["p95"], stage["max"]))
+    print("-" * 78)
+    memory = result["memory"]
+    print("内存：进程峰值 %.1f MB，子进程峰值 %.1f MB%s，CPU %.2f 秒" % (
+        memory["max_rss_mb"], memory["children_max_rss_mb"],
+        "，Python分配峰值 %.1f MB" % memory["tracemalloc_peak_mb"] if memory["tracemalloc_peak_mb"] is not None else "",
+        result["cpu_seconds"]))
+    print("=" * 78)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='离线基准测试：本地语料 + 模拟ollama，端到端运行数据收集')
+    parser.add_argument('--config', '-c', default=DEFAULT_CONFIG, help='基准配置文件路径')
+    parser.add_argument('--corpus', help='已有的语料目录（包含corpus.json），不指定时生成模拟语料')
+    parser.add_argument('--sites', type=int, default=4, help='模拟语料的来源数量')
+    parser.add_argument('--articles', type=int, default=30, help='模拟语料每个来源的文章数量')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='模拟语料中近似重复文章的比例')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--link-extractor', default='auto', choices=('heuristic', 'llm', 'auto'),
+                        help='主页链接抽取方式')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='模拟ollama每次请求的固定延迟秒数')
+    parser.add_argument('--llm-token-latency', type=float, default=0.0, help='模拟ollama每1000 token增加的延迟秒数')
+    parser.add_argument('--llm-jitter', type=float, default=0.0, help='模拟ollama随机增加的最大延迟秒数')
+    parser.add_argument('--llm-parallel', type=int, default=1, help='模拟ollama同时处理的请求数')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0, help='模拟ollama返回错误的比例')
+    parser.add_argument('--db', help='sqlite数据库路径，默认在临时目录中新建')
+    parser.add_argument('--tracemalloc', action='store_true', help='统计Python内存分配峰值（会降低运行速度）')
+    parser.add_argument('--keep', action='store_true', help='保留临时目录（语料、配置、数据库）')
+    parser.add_argument('--output', '-o', help='结果json路径，默认写入日志目录')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = run(args)
+    print_report(result)
+    output = args.output or os.path.join(get_log_dir(), "benchmark_result_%s.json" % datetime.now().strftime('%H%M%S'))
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print("结果：%s" % output)
+    print("trace：%s" % result["trace"])
+    if result["work_dir"]:
+        print("临时目录：%s" % result["work_dir"])
+
+
+if __name__ == '__main__':
+    main()
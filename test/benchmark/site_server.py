@@ -0,0 +1,62 @@
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def end_headers(self):
+        # 页面内容固定，避免浏览器缓存影响多轮测试的结果
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+
+class SiteServer:
+    """
+    在本机后台线程中提供语料目录下的静态页面，代替真实网站
+
+    主页地址为 {base_url}/{site.path}，文章页中的链接使用以/开头的相对路径，均指向本服务。
+    """
+
+    def __init__(self, root, host="127.0.0.1", port=0):
+        """
+        Args:
+            root (str): 语料根目录
+            host (str): 监听地址
+            port (int): 端口，0表示自动分配
+        """
+        self.root = root
+        self.host = host
+        self.port = port
+        self._server = None
+
+    def __repr__(self) -> str:
+        return f"<SiteServer: root={self.root}, url={self.base_url}>"
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def url(self, path):
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def start(self):
+        handler = functools.partial(_QuietHandler, directory=self.root)
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name="site-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.bloom_filter import BloomFilter
+
+
+def _key(i):
+    return hashlib.sha256(("https://example.com/news/%d.html" % i).encode("utf-8")).hexdigest()
+
+
+def test_added_keys_are_always_found():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [_key(i) for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert bloom.count <= 1000
+
+
+def test_false_positive_rate_within_bound():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(_key(i))
+    trials = 20000
+    false_positives = sum(_key(i) in bloom for i in range(2000, 2000 + trials))
+    # 达到容量时误判率应接近设定值，留出统计波动的余量
+    assert false_positives / trials < 0.01 * 2
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(capacity=100, error_rate=0.001)
+    assert not any(_key(i) in bloom for i in range(100))
+
+
+def test_snapshot_round_trip(tmp_path):
+    bloom = BloomFilter(capacity=500, error_rate=0.001)
+    for i in range(300):
+        bloom.add(_key(i))
+    bloom.watermark = 42
+    path = str(tmp_path / "sub" / "url_filter.bin")
+    bloom.save(path)
+
+    loaded = BloomFilter.load(path, capacity=500, error_rate=0.001)
+    assert loaded is not None
+    assert loaded.bits == bloom.bits
+    assert loaded.count == bloom.count
+    assert loaded.watermark == 42
+    assert all(_key(i) in loaded for i in range(300))
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_load_rejects_mismatched_or_broken_snapshot(tmp_path):
+    path = str(tmp_path / "url_filter.bin")
+    assert BloomFilter.load(path) is None
+
+    BloomFilter(capacity=500, error_rate=0.001).save(path)
+    assert BloomFilter.load(path, capacity=1000) is None
+    assert BloomFilter.load(path, error_rate=0.01) is None
+
+    with open(path, "r+b") as f:
+        f.write(b"XXXXX")
+    assert BloomFilter.load(path) is None
+
+    BloomFilter(capacity=500, error_rate=0.001).save(path)
+    with open(path, "ab") as f:
+        f.write(b"\0")
+    assert BloomFilter.load(path) is None
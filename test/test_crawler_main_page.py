@@ -0,0 +1,56 @@
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collection.crawler_main_page import MainPageCrawler, MainPageCrawlerConfig
+from collection.retry import CrawlError, ERROR_LLM
+
+PAGE_URL = "https://www.example.com.cn/"
+ERROR_BLOCK = {"index": 0, "error": True, "tags": ["error"], "content": "connection refused"}
+
+
+def _crawler(monkeypatch, links, extracted):
+    crawler = MainPageCrawler(MainPageCrawlerConfig("示例", "科技", PAGE_URL))
+
+    async def fetch(config):
+        return SimpleNamespace(links=links, markdown=SimpleNamespace(raw_markdown="主页内容"))
+
+    async def arun(url, sections):
+        return extracted
+
+    monkeypatch.setattr(crawler, "_MainPageCrawler__fetch", fetch)
+    monkeypatch.setattr(crawler.crawler_config.extraction_strategy, "arun", arun)
+    return crawler
+
+
+def _links(count):
+    return {"internal": [{"href": "https://www.example.com.cn/news/2025/09/05/%d.html" % (100000 + i),
+                          "text": "第%d篇新闻标题，内容足够长可以识别" % i} for i in range(count)],
+            "external": []}
+
+
+def test_llm_fallback_drops_error_blocks(monkeypatch):
+    item = {"url": "https://www.example.com.cn/a.html", "title": "标题"}
+    crawler = _crawler(monkeypatch, _links(2), [item, ERROR_BLOCK])
+    assert json.loads(asyncio.run(crawler.Run())) == [item]
+    assert crawler.used_llm
+
+
+def test_llm_fallback_error_keeps_heuristic_links(monkeypatch):
+    crawler = _crawler(monkeypatch, _links(2), [ERROR_BLOCK])
+    result = json.loads(asyncio.run(crawler.Run()))
+    assert [item["url"] for item in result] == [link["href"] for link in _links(2)["internal"]]
+
+
+def test_llm_fallback_error_without_links_raises(monkeypatch):
+    crawler = _crawler(monkeypatch, {}, [ERROR_BLOCK])
+    with pytest.raises(CrawlError) as info:
+        asyncio.run(crawler.Run())
+    assert info.value.kind == ERROR_LLM
+    # LLM正常返回空列表时不是错误
+    assert asyncio.run(_crawler(monkeypatch, {}, []).Run()) == "[]"
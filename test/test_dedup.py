@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collection.dedup import NearDuplicateIndex
+from util.text_util import SIMHASH_BITS, hamming_distance
+
+BASE = 0x0123456789ABCDEF
+
+
+def _flip(fingerprint, *bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_band_values_cover_all_bits():
+    index = NearDuplicateIndex(threshold=6)
+    assert index.bands == 7
+    values = index._band_values(BASE)
+    rebuilt = 0
+    for i, value in enumerate(values):
+        rebuilt |= value << (i * index.band_bits)
+    assert rebuilt == BASE
+    # 最后一段包含除不尽的剩余位
+    assert index._band_values(1 << (SIMHASH_BITS - 1))[-1] == 1 << (SIMHASH_BITS - 1 - index.band_bits * 6)
+
+
+def test_find_within_threshold():
+    index = NearDuplicateIndex(threshold=6)
+    index.add("a", BASE)
+    # 6位不同、分布在6个分段中，只剩一段相同时也能找到
+    assert index.find(_flip(BASE, *[i * index.band_bits for i in range(6)])) == "a"
+    assert index.find(_flip(BASE, 0, 1, 2, 3, 4, 5)) == "a"
+    # 超过阈值
+    assert index.find(_flip(BASE, *[i * index.band_bits for i in range(7)])) is None
+    assert index.find(_flip(BASE, 0, 1, 2, 3, 4, 5, 6)) is None
+
+
+def test_find_never_misses_random_neighbours():
+    rng = random.Random(0)
+    index = NearDuplicateIndex(threshold=6)
+    fingerprints = {str(i): rng.getrandbits(SIMHASH_BITS) for i in range(200)}
+    for key, fingerprint in fingerprints.items():
+        index.add(key, fingerprint)
+    for key, fingerprint in fingerprints.items():
+        distance = rng.randint(0, 6)
+        query = _flip(fingerprint, *rng.sample(range(SIMHASH_BITS), distance))
+        found = index.find(query)
+        assert found is not None
+        assert hamming_distance(query, fingerprints[found]) <= distance
+
+
+def test_find_returns_closest():
+    index = NearDuplicateIndex(threshold=6)
+    index.add("far", _flip(BASE, 1, 2, 3, 4))
+    index.add("near", _flip(BASE, 1))
+    assert index.find(BASE) == "near"
+
+
+def test_find_excludes_self():
+    index = NearDuplicateIndex(threshold=6)
+    index.add("self", BASE)
+    assert index.find(BASE, exclude="self") is None
+    index.add("other", _flip(BASE, 3))
+    assert index.find(BASE, exclude="self") == "other"
+
+
+def test_remove():
+    index = NearDuplicateIndex(threshold=6)
+    index.add("a", BASE)
+    index.add("b", _flip(BASE, 2))
+    index.remove("a")
+    assert len(index) == 1
+    assert index.find(BASE) == "b"
+    index.remove("b")
+    index.remove("missing")
+    assert len(index) == 0
+    assert index.find(BASE) is None
+    # 删除后不留下空的分段
+    assert all(not table for table in index.tables)
+
+
+def test_add_existing_key_replaces_fingerprint():
+    index = NearDuplicateIndex(threshold=6)
+    index.add("a", BASE)
+    index.add("a", ~BASE & ((1 << SIMHASH_BITS) - 1))
+    assert len(index) == 1
+    assert index.find(BASE) is None
+    assert sum(len(keys) for table in index.tables for keys in table.values()) == index.bands
+
+
+def test_fingerprint_skips_short_text():
+    index = NearDuplicateIndex(min_length=200)
+    assert index.fingerprint("") is None
+    assert index.fingerprint("短文本" * 10) is None
+    text = "".join("第%d段新闻正文，记者报道了当地的最新进展。" % i for i in range(20))
+    edited = text.replace("第3段", "第三段")
+    assert hamming_distance(index.fingerprint(text), index.fingerprint(edited)) <= index.threshold
@@ -0,0 +1,86 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collection.link_extractor import MIN_ARTICLE_LINKS, _site_domain, extract_article_links
+
+PAGE_URL = "https://www.example.com.cn/"
+
+
+def _anchor(href, text):
+    return {"href": href, "text": text}
+
+
+def _homepage(articles, header=None, footer=None):
+    header = header if header is not None else [
+        _anchor("https://www.example.com.cn/", "首页"),
+        _anchor("https://www.example.com.cn/category/world/", "国际新闻频道"),
+        _anchor("https://www.example.com.cn/en/", "English"),
+    ]
+    footer = footer if footer is not None else [
+        _anchor("https://www.example.com.cn/about/", "关于我们"),
+        _anchor("https://www.example.com.cn/tag/economy", "经济话题与评论汇总"),
+    ]
+    return {"internal": header + articles + footer, "external": []}
+
+
+def _articles(count):
+    return [_anchor("https://www.example.com.cn/news/2025/09/%02d/%d.html" % (i % 28 + 1, 100000 + i),
+                    "第%d篇新闻标题，内容足够长可以识别" % i) for i in range(count)]
+
+
+def test_site_domain():
+    assert _site_domain("www.example.com.cn") == "example.com.cn"
+    assert _site_domain("news.example.com:8080") == "example.com"
+    assert _site_domain("example.org") == "example.org"
+
+
+def test_picks_article_links_in_page_order():
+    articles = _articles(12)
+    items, confidence = extract_article_links(_homepage(articles), PAGE_URL)
+    assert [item["url"] for item in items] == [a["href"] for a in articles]
+    assert items[0]["title"] == articles[0]["text"]
+    assert confidence == 1.0
+
+
+def test_skips_navigation_lists_language_and_other_sites():
+    links = _homepage(_articles(12))
+    links["internal"] += [
+        _anchor("https://www.example.com.cn/news/2025/09/05/logo.jpg", "新闻图片的替代文字很长很长"),
+        _anchor("javascript:void(0)", "打开菜单并显示全部栏目"),
+    ]
+    links["external"] = [_anchor("https://other.com/news/2025/09/05/123456.html", "其他网站的新闻标题足够长")]
+    items, _ = extract_article_links(links, PAGE_URL)
+    urls = {item["url"] for item in items}
+    assert len(urls) == 12
+    assert all(url.startswith("https://www.example.com.cn/news/") and url.endswith(".html") for url in urls)
+
+
+def test_keeps_longest_text_for_duplicate_links():
+    url = "https://www.example.com.cn/news/2025/09/05/123456.html"
+    articles = _articles(12) + [_anchor(url + "#comments", "评论区"), _anchor(url, "这是同一篇文章更完整的标题")]
+    items, _ = extract_article_links(_homepage(articles), PAGE_URL)
+    matched = [item for item in items if item["url"] == url]
+    assert len(matched) == 1
+    assert matched[0]["title"] == "这是同一篇文章更完整的标题"
+
+
+def test_few_links_lower_confidence():
+    items, confidence = extract_article_links(_homepage(_articles(5)), PAGE_URL)
+    assert len(items) == 5
+    assert confidence == 5 / MIN_ARTICLE_LINKS
+
+
+def test_weak_url_patterns_lower_confidence():
+    # 没有日期或ID，靠页面后缀、路径层级和较长文字达到阈值，但不是强特征
+    weak = [_anchor("https://www.example.com.cn/world/story-%s.html" % name, "没有日期和编号的文章标题%s" % name)
+            for name in "abcdefghijkl"]
+    items, confidence = extract_article_links(_homepage(_articles(12) + weak), PAGE_URL)
+    assert len(items) == 24
+    assert confidence == 0.5
+
+
+def test_no_links():
+    assert extract_article_links({}, PAGE_URL) == ([], 0.0)
+    assert extract_article_links(None, PAGE_URL) == ([], 0.0)
+    assert extract_article_links(_homepage([]), PAGE_URL) == ([], 0.0)
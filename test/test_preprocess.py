@@ -0,0 +1,82 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from collection.preprocess import ContentPreprocessor
+
+HEADER = "欢迎访问示例新闻网，本站所有内容均受版权保护，未经授权不得转载。"
+FOOTER = "联系我们：newsroom@example.com，地址：北京市某区某路1号。"
+
+
+def _page(i):
+    return "%s\n\n第%d篇文章的正文第一段，讲述了当天发生的事情。\n\n第%d篇文章的正文第二段，补充了更多细节。\n\n%s" % (
+        HEADER, i, i, FOOTER)
+
+
+def _url(i):
+    return "https://news.example.com/2025/09/05/%d.html" % i
+
+
+def test_boilerplate_removed_after_min_pages():
+    preprocessor = ContentPreprocessor(boilerplate_min_pages=3)
+    first = preprocessor.process(_url(1), _page(1))
+    assert HEADER in first
+    preprocessor.process(_url(2), _page(2))
+    third = preprocessor.process(_url(3), _page(3))
+    assert HEADER not in third and FOOTER not in third
+    assert "第3篇文章的正文第一段" in third
+
+
+def test_retry_does_not_count_twice():
+    preprocessor = ContentPreprocessor(boilerplate_min_pages=3)
+    for _ in range(3):
+        body = preprocessor.process(_url(1), _page(1))
+    assert HEADER in body
+
+
+def test_snapshot_keeps_output_stable_across_restarts(tmp_path):
+    path = str(tmp_path / "data" / "boilerplate.json")
+    preprocessor = ContentPreprocessor(boilerplate_min_pages=3, snapshot=path)
+    for i in range(1, 4):
+        preprocessor.process(_url(i), _page(i))
+    expected = preprocessor.process(_url(4), _page(4))
+    preprocessor.save()
+
+    restarted = ContentPreprocessor(boilerplate_min_pages=3, snapshot=path)
+    assert restarted.process(_url(4), _page(4)) == expected
+    assert restarted.process(_url(5), _page(5)) == expected.replace("第4篇", "第5篇")
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_missing_or_broken_snapshot(tmp_path):
+    path = str(tmp_path / "boilerplate.json")
+    preprocessor = ContentPreprocessor(snapshot=path)
+    assert preprocessor.domains == {}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{broken")
+    assert not preprocessor.load(path)
+    assert ContentPreprocessor(snapshot=path).domains == {}
+
+
+def test_same_url_not_counted_again_after_restart(tmp_path):
+    path = str(tmp_path / "boilerplate.json")
+    for _ in range(4):
+        # 每次运行都是新进程，重新处理同一页面时正文不能被当作模板内容去掉
+        preprocessor = ContentPreprocessor(boilerplate_min_pages=3, snapshot=path)
+        body = preprocessor.process(_url(1), _page(1))
+        preprocessor.save()
+        assert "第1篇文章的正文第一段" in body
+    assert HEADER in body
+
+
+def test_snapshot_urls_are_bounded(tmp_path, monkeypatch):
+    import collection.preprocess as preprocess_module
+    monkeypatch.setattr(preprocess_module, "MAX_DOMAIN_URLS", 3)
+    path = str(tmp_path / "boilerplate.json")
+    preprocessor = ContentPreprocessor(boilerplate_min_pages=10, snapshot=path)
+    for i in range(1, 6):
+        preprocessor.process(_url(i), _page(i))
+    preprocessor.save()
+    restarted = ContentPreprocessor(boilerplate_min_pages=10, snapshot=path)
+    assert len(restarted.domains["news.example.com"].urls) == 3
+    assert restarted.domains["news.example.com"].counts == preprocessor.domains["news.example.com"].counts
@@ -0,0 +1,98 @@
+import datetime
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.report_util import PagedReportWriter, open_paged_report, read_shard
+
+
+def _record(id, time, type="科技"):
+    return SimpleNamespace(id=id, type=type, time=time, title="标题%d" % id, source="来源", tags="",
+                           url="https://example.com/%d.html" % id, content="内容%d" % id)
+
+
+def _shard_keys(writer):
+    return {entry["key"]: entry["count"] for item in writer.manifest["types"] for entry in item["shards"]}
+
+
+def test_prune_keeps_start_day_shard(tmp_path):
+    start_time = datetime.datetime(2025, 9, 5, 10, 0)
+    writer = PagedReportWriter(str(tmp_path))
+    writer.write_records([
+        _record(1, datetime.datetime(2025, 9, 4, 23, 0)),
+        _record(2, start_time + datetime.timedelta(minutes=5)),
+        _record(3, datetime.datetime(2025, 9, 6, 8, 0)),
+        _record(4, datetime.datetime(2025, 9, 4, 12, 0), type="财经"),
+        _record(5, None, type="财经"),
+    ])
+    writer.prune(start_time)
+    writer.close()
+
+    assert _shard_keys(writer) == {"t0_20250905": 1, "t0_20250906": 1, "t1_unknown": 1}
+    assert [row["id"] for row in read_shard(os.path.join(writer.rows_dir, "t0_20250905.js"))] == [2]
+    assert not os.path.exists(os.path.join(writer.rows_dir, "t0_20250904.js"))
+    assert not os.path.exists(os.path.join(writer.rows_dir, "t1_20250904.js"))
+    assert not os.path.exists(os.path.join(writer.content_dir, "t0_20250904.js"))
+
+
+def test_prune_at_midnight_keeps_start_day(tmp_path):
+    start_time = datetime.datetime(2025, 9, 5)
+    writer = PagedReportWriter(str(tmp_path))
+    writer.write_records([
+        _record(1, datetime.datetime(2025, 9, 4, 23, 59)),
+        _record(2, datetime.datetime(2025, 9, 5, 0, 1)),
+    ])
+    writer.prune(start_time)
+    assert _shard_keys(writer) == {"t0_20250905": 1}
+
+
+def test_incremental_write_merges_into_boundary_shard(tmp_path):
+    start_time = datetime.datetime(2025, 9, 5, 10, 0)
+    writer = PagedReportWriter(str(tmp_path))
+    writer.write_records([_record(1, start_time + datetime.timedelta(minutes=5))])
+    writer.close()
+
+    # 窗口向后移动一小时，同一天的新记录合并到已有分片，已有记录不会被删除
+    writer = PagedReportWriter(str(tmp_path), manifest=writer.manifest)
+    writer.write_records([_record(1, start_time + datetime.timedelta(minutes=5)),
+                          _record(2, start_time + datetime.timedelta(hours=2))])
+    writer.prune(start_time + datetime.timedelta(hours=1))
+    writer.close()
+
+    assert writer.watermark == 2
+    assert _shard_keys(writer) == {"t0_20250905": 2}
+    assert [row["id"] for row in read_shard(os.path.join(writer.rows_dir, "t0_20250905.js"))] == [1, 2]
+
+
+def _generate(records, start_time, end_time, incremental):
+    # 与display.main.display中分页报告的流程相同
+    writer = open_paged_report("report", None, incremental, {"types": ["科技"]}, start_time, end_time)
+    writer.write_records(r for r in records if start_time < r.time <= end_time and r.id > writer.watermark)
+    writer.prune(start_time)
+    writer.close()
+    return sum(_shard_keys(writer).values())
+
+
+def test_incremental_rebuilds_when_window_widens(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    now = datetime.datetime(2025, 9, 10, 12, 0)
+    records = [_record(i + 1, now - datetime.timedelta(days=i, hours=1)) for i in range(6)]
+
+    assert _generate(records, now - datetime.timedelta(days=1), now, incremental=True) == 1
+    # 窗口扩大到7天，更早的记录id不大于watermark，也要全部写入
+    assert _generate(records, now - datetime.timedelta(days=7), now, incremental=True) == 6
+    # 窗口不变或向后移动时继续增量生成
+    records.append(_record(7, now + datetime.timedelta(minutes=30)))
+    assert _generate(records, now - datetime.timedelta(days=7), now + datetime.timedelta(hours=1),
+                     incremental=True) == 7
+
+
+def test_incremental_rebuilds_when_end_moves_back(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    now = datetime.datetime(2025, 9, 10, 12, 0)
+    records = [_record(i + 1, now - datetime.timedelta(days=i, hours=1)) for i in range(6)]
+
+    assert _generate(records, now - datetime.timedelta(days=7), now, incremental=True) == 6
+    assert _generate(records, now - datetime.timedelta(days=7), now - datetime.timedelta(days=2),
+                     incremental=True) == 4
@@ -0,0 +1,85 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from util.schedule_util import CronSchedule, IntervalSchedule, create_schedule
+
+
+def _next(expression, after):
+    return CronSchedule(expression).next_time(after)
+
+
+def test_every_quarter_hour():
+    assert _next("*/15 * * * *", datetime(2025, 9, 5, 10, 7, 30)) == datetime(2025, 9, 5, 10, 15)
+    # 不包含after本身
+    assert _next("*/15 * * * *", datetime(2025, 9, 5, 10, 15)) == datetime(2025, 9, 5, 10, 30)
+    assert _next("*/15 * * * *", datetime(2025, 9, 5, 23, 50)) == datetime(2025, 9, 6, 0, 0)
+
+
+def test_step_with_start():
+    assert _next("5/20 * * * *", datetime(2025, 9, 5, 10, 0)) == datetime(2025, 9, 5, 10, 5)
+    assert _next("5/20 * * * *", datetime(2025, 9, 5, 10, 5)) == datetime(2025, 9, 5, 10, 25)
+    assert _next("5/20 * * * *", datetime(2025, 9, 5, 10, 45)) == datetime(2025, 9, 5, 11, 5)
+
+
+def test_hour_step_rolls_over_day_and_year():
+    assert _next("0 */2 * * *", datetime(2025, 9, 5, 23, 30)) == datetime(2025, 9, 6, 0, 0)
+    assert _next("0 */2 * * *", datetime(2025, 12, 31, 23, 0)) == datetime(2026, 1, 1, 0, 0)
+
+
+def test_weekdays_range():
+    # 2025-09-05是星期五
+    assert _next("30 9 * * 1-5", datetime(2025, 9, 5, 10, 0)) == datetime(2025, 9, 8, 9, 30)
+    assert _next("30 9 * * 1-5", datetime(2025, 9, 5, 9, 0)) == datetime(2025, 9, 5, 9, 30)
+
+
+def test_sunday_is_zero_or_seven():
+    after = datetime(2025, 9, 5, 12, 0)
+    assert _next("0 8 * * 0", after) == datetime(2025, 9, 7, 8, 0)
+    assert _next("0 8 * * 7", after) == datetime(2025, 9, 7, 8, 0)
+
+
+def test_day_of_month_or_weekday():
+    # 日和星期都指定时满足其一即可：每月13日或每个星期五
+    assert _next("0 0 13 * 5", datetime(2025, 9, 6)) == datetime(2025, 9, 12)
+    assert _next("0 0 13 * 5", datetime(2025, 9, 12)) == datetime(2025, 9, 13)
+    # 只指定日时星期不起作用
+    assert _next("0 0 13 * *", datetime(2025, 9, 6)) == datetime(2025, 9, 13)
+    # 与crontab一致，以*开头的字段（如*/10）按未指定处理，此时日和星期需要同时满足
+    assert _next("0 0 */10 * 5", datetime(2025, 9, 6)) == datetime(2025, 10, 31)
+
+
+def test_months_and_leap_day():
+    assert _next("0 0 31 * *", datetime(2025, 9, 1)) == datetime(2025, 10, 31)
+    assert _next("0 6 1 1,7 *", datetime(2025, 9, 5)) == datetime(2026, 1, 1, 6, 0)
+    assert _next("0 0 29 2 *", datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        _next("0 0 30 2 *", datetime(2025, 9, 5))
+
+
+@pytest.mark.parametrize("expression", ["* * *", "61 * * * *", "* 24 * * *", "*/0 * * * *", "0 0 0 * *",
+                                        "0 0 * 13 *", "0 0 * * 8", "10-5 * * * *", "a * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_interval_schedule():
+    after = datetime(2025, 9, 5, 10, 0)
+    assert IntervalSchedule(90).next_time(after) == after + timedelta(seconds=90)
+    with pytest.raises(ValueError):
+        IntervalSchedule(0)
+
+
+def test_create_schedule():
+    assert create_schedule() is None
+    assert isinstance(create_schedule(interval_minutes=30), IntervalSchedule)
+    assert create_schedule(interval_minutes=30).seconds == 1800
+    assert isinstance(create_schedule(cron="0 * * * *"), CronSchedule)
+    assert isinstance(create_schedule(interval_minutes=30, cron="0 * * * *"), CronSchedule)
@@ -0,0 +1,134 @@
+import datetime
+import json
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import display.summarizer as summarizer_module
+from display.summarizer import Summarizer
+from util.cache_util import DiskCache
+
+DAY = datetime.datetime(2025, 9, 1, 8, 0)
+
+
+class FakeClient:
+    """
+    代替ollama.AsyncClient，记录收到的提示词，每个批次返回一条热点
+    """
+    prompts = []
+
+    def __init__(self, host=None):
+        pass
+
+    async def chat(self, model, messages, format=None):
+        prompt = messages[0]["content"]
+        FakeClient.prompts.append(prompt)
+        topic = "热点%d" % len(FakeClient.prompts)
+        return {"message": {"content": json.dumps({"topic": [topic]}, ensure_ascii=False)}}
+
+
+def _records(days, per_day=6, types=("科技", "财经")):
+    records = []
+    for type in types:
+        for day in days:
+            for i in range(per_day):
+                id = (day * 100 + i) * 10 + types.index(type)
+                records.append(SimpleNamespace(
+                    id=id, type=type, time=DAY + datetime.timedelta(days=day, hours=i),
+                    title="%s第%d天新闻%d" % (type, day, i), content="内容" * 5))
+    return records
+
+
+def _map_prompts():
+    return [prompt for prompt in FakeClient.prompts if "新闻记录:" in prompt]
+
+
+def test_chunks_do_not_cross_type_or_day():
+    summarizer = Summarizer(chunk_tokens=150)
+    chunks = summarizer.chunk(_records(range(3)))
+    assert len(chunks) > 6
+    for chunk in chunks:
+        days = set(line.split("第")[1].split("天")[0] for line in chunk.lines)
+        assert len(days) == 1
+        assert all(chunk.type in line for line in chunk.lines)
+
+
+def test_chunks_ignore_input_order():
+    summarizer = Summarizer(chunk_tokens=150)
+    records = _records(range(3))
+    shuffled = sorted(records, key=lambda r: (-r.id % 7, r.title))
+    assert [c.lines for c in summarizer.chunk(records)] == [c.lines for c in summarizer.chunk(shuffled)]
+
+
+def test_overlapping_windows_reuse_cached_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(summarizer_module, "AsyncClient", FakeClient)
+    FakeClient.prompts = []
+    cache = DiskCache(str(tmp_path / "summary_cache.db"))
+    summarizer = Summarizer(chunk_tokens=150, cache=cache)
+
+    assert summarizer.summarize(_records(range(0, 5)))
+    assert cache.hits == 0
+    unchanged = len(summarizer.chunk(_records(range(1, 5))))
+
+    # 窗口向后滑动到第0天中午：第0天只剩部分记录，新增第5天，第1~4天的批次不变
+    FakeClient.prompts = []
+    second = [r for r in _records(range(0, 6)) if r.time > DAY + datetime.timedelta(hours=2)]
+    assert summarizer.summarize(second)
+    changed = len(summarizer.chunk([r for r in second if r.time.day in (DAY.day, DAY.day + 5)]))
+    # 第0天剩余记录组成的批次可能恰好与上次相同，也会命中缓存
+    assert len(_map_prompts()) <= changed
+    assert cache.hits >= unchanged
+    assert len(_map_prompts()) + cache.hits == len(summarizer.chunk(second))
+
+    # 同一窗口再次总结时所有调用都命中缓存
+    FakeClient.prompts = []
+    assert summarizer.summarize(second)
+    assert FakeClient.prompts == []
+    assert summarizer.calls == 0
+    cache.close()
+
+
+def test_new_records_only_miss_their_own_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(summarizer_module, "AsyncClient", FakeClient)
+    FakeClient.prompts = []
+    cache = DiskCache(str(tmp_path / "summary_cache.db"))
+    summarizer = Summarizer(chunk_tokens=150, cache=cache)
+
+    records = _records(range(3), types=("科技",))
+    summarizer.summarize(records)
+
+    FakeClient.prompts = []
+    late = SimpleNamespace(id=99999, type="科技", time=DAY + datetime.timedelta(days=1, hours=23),
+                           title="科技第1天新闻晚到", content="内容")
+    summarizer.summarize(records + [late])
+    map_prompts = _map_prompts()
+    # 只有第1天最后一个批次变化
+    assert len(map_prompts) == 1
+    assert "晚到" in map_prompts[0]
+    cache.close()
+
+
+class FailingReduceClient(FakeClient):
+    """
+    批次总结正常返回，合并热点时返回无法解析的内容
+    """
+
+    async def chat(self, model, messages, format=None):
+        if "各批次热点:" in messages[0]["content"]:
+            FakeClient.prompts.append(messages[0]["content"])
+            return {"message": {"content": "not json"}}
+        return await super().chat(model, messages, format)
+
+
+def test_failed_reduce_falls_back_to_batch_topics(monkeypatch):
+    monkeypatch.setattr(summarizer_module, "AsyncClient", FailingReduceClient)
+    FakeClient.prompts = []
+    summarizer = Summarizer(chunk_tokens=150, topic_count="3-5")
+
+    topics = summarizer.summarize(_records(range(3)))
+    assert any("各批次热点:" in prompt for prompt in FakeClient.prompts)
+    assert topics == ["热点%d" % i for i in range(1, 6)]
+    assert summarizer.topic_limit() == 5
+    assert Summarizer(topic_count="3").topic_limit() == 3
+    assert Summarizer(topic_count="若干").topic_limit() == 5